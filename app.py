@@ -3,29 +3,33 @@ from flask_cors import CORS
 from config import Config
 from db import db
 from utils.jwt_handler import jwt
+from app.utils import logging_config
 from flask_jwt_extended import jwt_required
 from routes.auth_routes import auth_bp
 from routes.blood_routes import blood_bp
 from routes.hospital_routes import hospital_bp
-import psycopg2
+import logging
 from werkzeug.security import check_password_hash
 
+logger = logging.getLogger(__name__)
+
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
 
+    logging_config.init_app(app)
     db.init_app(app)
     jwt.init_app(app)
 
     # 🔧 Enhanced JWT error handlers with better debugging
     @jwt.expired_token_loader
     def expired_token_callback(jwt_header, jwt_payload):
-        print(f"[JWT] Token expired for user: {jwt_payload.get('sub')}")
+        logger.info("Token expired for user %s", jwt_payload.get('sub'))
         return jsonify({'status': 'error', 'message': 'Token has expired'}), 401
 
     @jwt.invalid_token_loader
     def invalid_token_callback(error):
-        print(f"[JWT] Invalid token: {error}")
+        logger.info("Invalid token: %s", error)
         if "Subject must be a string" in str(error):
             return jsonify({
                 'status': 'error', 
@@ -35,13 +39,13 @@ def create_app():
 
     @jwt.unauthorized_loader
     def missing_token_callback(error):
-        print(f"[JWT] Unauthorized: {error}")
+        logger.debug("Unauthorized: %s", error)
         return jsonify({'status': 'error', 'message': 'Authorization token is missing'}), 401
 
     # 🔧 Add token verification handlers
     @jwt.token_verification_failed_loader
     def token_verification_failed_callback(jwt_header, jwt_payload):
-        print(f"[JWT] Token verification failed: user_id={jwt_payload.get('sub')}")
+        logger.info("Token verification failed for user %s", jwt_payload.get('sub'))
         return jsonify({'status': 'error', 'message': 'Token verification failed'}), 401
     
     # Updated CORS configuration - more permissive for development
@@ -53,7 +57,7 @@ def create_app():
         allow_headers=["Content-Type", "Authorization"]
     )
     
-    print("✅ CORS configured for origins:", ["http://localhost:5173", "http://localhost:3000", "http://127.0.0.1:5173", "http://127.0.0.1:3000"])
+    logger.info("CORS configured for origins: %s", ["http://localhost:5173", "http://localhost:3000", "http://127.0.0.1:5173", "http://127.0.0.1:3000"])
 
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix='/auth')
@@ -92,7 +96,7 @@ def create_app():
             if not data:
                 return jsonify({"error": "No data provided"}), 400
             
-            print(f"Test endpoint received data: {data}")
+            logger.debug("Test blood request: %s", data)
             
             # Import models
             from models.lookup import LookupBloodGroup
@@ -103,7 +107,7 @@ def create_app():
             blood_groups = LookupBloodGroup.query.all()
             if blood_groups:
                 valid_blood_group_id = blood_groups[0].blood_group_id
-                print(f"Using existing blood group ID: {valid_blood_group_id}")
+                logger.debug("Using existing blood group %s", valid_blood_group_id)
             else:
                 # Create O+ blood group if none exist
                 new_blood_group = LookupBloodGroup(
@@ -113,7 +117,7 @@ def create_app():
                 db.session.add(new_blood_group)
                 db.session.flush()
                 valid_blood_group_id = new_blood_group.blood_group_id
-                print(f"Created new blood group O+ with ID: {valid_blood_group_id}")
+                logger.debug("Created blood group O+ with id %s", valid_blood_group_id)
             
             # Create blood request
             blood_request = BloodRequest(
@@ -134,7 +138,7 @@ def create_app():
             db.session.add(blood_request)
             db.session.commit()
             
-            print(f"✅ Successfully created blood request with ID: {blood_request.blood_request_id}")
+            logger.info("Created test blood request %s", blood_request.blood_request_id)
             
             return jsonify({
                 "success": True,
@@ -152,9 +156,7 @@ def create_app():
             
         except Exception as e:
             db.session.rollback()
-            print(f"Test endpoint error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Test blood request failed")
             return jsonify({
                 "error": f"Failed to create test blood request: {str(e)}",
                 "success": False
@@ -215,20 +217,14 @@ def create_app():
     def debug_blood_request():
         """Debug endpoint to test manual form submission"""
         try:
-            print("\n" + "="*50)
-            print("DEBUG BLOOD REQUEST ENDPOINT CALLED")
-            print("="*50)
-            
             data = request.get_json()
-            print(f"[DEBUG] Received data: {data}")
-            print(f"[DEBUG] Headers: {dict(request.headers)}")
+            logger.debug("Debug blood request: %s", data)
             
             if not data:
                 return jsonify({"error": "No data provided"}), 400
             
             # Check if this looks like manual form data vs test data
             if 'patient_name' in data and 'hospital_id' in data:
-                print("[DEBUG] This appears to be manual form data")
                 
                 # Import models
                 from models.lookup import LookupBloodGroup
@@ -237,11 +233,10 @@ def create_app():
                 
                 # Handle blood group conversion - check what exists in database
                 blood_group_type = data.get('blood_group_type')
-                print(f"[DEBUG] Blood group type: {blood_group_type} (type: {type(blood_group_type)})")
+                logger.debug("Blood group type: %r", blood_group_type)
                 
                 # Check what blood groups exist in database
                 existing_blood_groups = LookupBloodGroup.query.all()
-                print(f"[DEBUG] Existing blood groups: {[(bg.blood_group_id, bg.blood_group_name) for bg in existing_blood_groups]}")
                 
                 valid_blood_group_id = None
                 
@@ -250,19 +245,17 @@ def create_app():
                     bg = LookupBloodGroup.query.get(blood_group_type)
                     if bg:
                         valid_blood_group_id = blood_group_type
-                        print(f"[DEBUG] Found existing blood group ID: {valid_blood_group_id}")
                     else:
-                        print(f"[DEBUG] Blood group ID {blood_group_type} doesn't exist, will create or use existing")
+                        logger.debug("Blood group %s does not exist, using a fallback", blood_group_type)
                 
                 # If we don't have a valid ID yet, try to find or create blood groups
                 if valid_blood_group_id is None:
                     if existing_blood_groups:
                         # Use the first existing blood group
                         valid_blood_group_id = existing_blood_groups[0].blood_group_id
-                        print(f"[DEBUG] Using first existing blood group ID: {valid_blood_group_id}")
                     else:
                         # Create the standard blood groups
-                        print("[DEBUG] No blood groups exist, creating them...")
+                        logger.debug("No blood groups exist, creating them")
                         blood_groups_to_create = [
                             {'name': 'A+', 'id': 1},
                             {'name': 'A-', 'id': 2},
@@ -281,7 +274,6 @@ def create_app():
                             )
                             db.session.add(new_bg)
                             db.session.flush()  # Get the auto-generated ID
-                            print(f"[DEBUG] Created blood group {bg_data['name']} with ID: {new_bg.blood_group_id}")
                         
                         db.session.commit()
                         
@@ -289,20 +281,17 @@ def create_app():
                         o_plus = LookupBloodGroup.query.filter_by(blood_group_name='O+').first()
                         if o_plus:
                             valid_blood_group_id = o_plus.blood_group_id
-                            print(f"[DEBUG] Using newly created O+ blood group ID: {valid_blood_group_id}")
                         else:
                             # Fallback to first available
                             first_bg = LookupBloodGroup.query.first()
                             valid_blood_group_id = first_bg.blood_group_id if first_bg else 1
-                            print(f"[DEBUG] Fallback to first blood group ID: {valid_blood_group_id}")
                 
-                print(f"[DEBUG] Final blood group ID to use: {valid_blood_group_id}")
+                logger.debug("Using blood group %s", valid_blood_group_id)
                 
                 # Convert hospital_id to integer if it's a string
                 hospital_id = data['hospital_id']
                 if isinstance(hospital_id, str):
                     hospital_id = int(hospital_id)
-                print(f"[DEBUG] Hospital ID: {hospital_id}")
                 
                 # Create blood request with user_id 36 (same as test)
                 blood_request = BloodRequest(
@@ -323,7 +312,7 @@ def create_app():
                 db.session.add(blood_request)
                 db.session.commit()
                 
-                print(f"✅ Successfully created debug blood request with ID: {blood_request.blood_request_id}")
+                logger.info("Created debug blood request %s", blood_request.blood_request_id)
                 
                 return jsonify({
                     "success": True,
@@ -343,29 +332,19 @@ def create_app():
                 
         except Exception as e:
             db.session.rollback()
-            print(f"Debug endpoint error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Debug blood request failed")
             return jsonify({
                 "error": f"Failed to create debug blood request: {str(e)}",
                 "success": False
             }), 500
-        finally:
-            print("="*50)
-            print("DEBUG BLOOD REQUEST ENDPOINT FINISHED")
-            print("="*50 + "\n")
 
     # Add a non-authenticated version of the blood request endpoint for development
     @app.route('/blood/request/no-auth', methods=['POST'])
     def create_blood_request_no_auth():
         """Create blood request without authentication (for development/testing)"""
         try:
-            print("\n" + "="*50)
-            print("NO-AUTH BLOOD REQUEST ENDPOINT CALLED")
-            print("="*50)
-            
             data = request.get_json()
-            print(f"[NO-AUTH] Received data: {data}")
+            logger.debug("No-auth blood request: %s", data)
             
             if not data:
                 return jsonify({"error": "No data provided"}), 400
@@ -399,7 +378,7 @@ def create_app():
                 first_bg = LookupBloodGroup.query.first()
                 valid_blood_group_id = first_bg.blood_group_id if first_bg else 1
             
-            print(f"[NO-AUTH] Using blood group ID: {valid_blood_group_id}")
+            logger.debug("Using blood group %s", valid_blood_group_id)
             
             # Create blood request (using user_id 36 like the test endpoints)
             blood_request = BloodRequest(
@@ -420,7 +399,7 @@ def create_app():
             db.session.add(blood_request)
             db.session.commit()
             
-            print(f"✅ Successfully created no-auth blood request with ID: {blood_request.blood_request_id}")
+            logger.info("Created no-auth blood request %s", blood_request.blood_request_id)
             
             # Return response in same format as authenticated endpoint
             return jsonify({
@@ -438,17 +417,11 @@ def create_app():
             
         except Exception as e:
             db.session.rollback()
-            print(f"No-auth endpoint error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("No-auth blood request failed")
             return jsonify({
                 "error": f"Failed to create blood request: {str(e)}",
                 "success": False
             }), 500
-        finally:
-            print("="*50)
-            print("NO-AUTH BLOOD REQUEST ENDPOINT FINISHED")
-            print("="*50 + "\n")
 
     # Add a simple non-auth version that works exactly like the debug endpoint
     @app.route('/blood/request/simple', methods=['POST'])
@@ -459,7 +432,7 @@ def create_app():
             if not data:
                 return jsonify({"error": "No data provided"}), 400
             
-            print(f"[SIMPLE] Creating blood request: {data}")
+            logger.debug("Simple blood request: %s", data)
             
             # Import models
             from models.lookup import LookupBloodGroup
@@ -493,7 +466,7 @@ def create_app():
                     db.session.flush()
                     valid_blood_group_id = new_bg.blood_group_id
             
-            print(f"[SIMPLE] Using blood group ID: {valid_blood_group_id}")
+            logger.debug("Using blood group %s", valid_blood_group_id)
             
             # Create blood request
             blood_request = BloodRequest(
@@ -514,7 +487,7 @@ def create_app():
             db.session.add(blood_request)
             db.session.commit()
             
-            print(f"✅ Successfully created simple blood request with ID: {blood_request.blood_request_id}")
+            logger.info("Created simple blood request %s", blood_request.blood_request_id)
             
             # Return in standard format
             return jsonify({
@@ -532,9 +505,7 @@ def create_app():
             
         except Exception as e:
             db.session.rollback()
-            print(f"Simple endpoint error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Simple blood request failed")
             return jsonify({
                 "error": f"Failed to create blood request: {str(e)}",
                 "success": False
@@ -547,9 +518,9 @@ if __name__ == '__main__':
     with app.app_context():
         try:
             db.create_all()
-            print("✅ Database tables created successfully")
-        except Exception as e:
-            print(f"❌ Error creating database tables: {e}")
+            logger.info("Database tables created")
+        except Exception:
+            logger.exception("Error creating database tables")
     
-    print("🚀 Starting Flask server on http://localhost:5000")
+    logger.info("Starting Flask server on http://localhost:5000")
     app.run(debug=True, host='0.0.0.0', port=5000)
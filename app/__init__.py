@@ -4,6 +4,9 @@ from flask_migrate import Migrate
 from config import config
 from models import db
 from app.utils.jwt_handler import jwt
+from app.utils import (auth_utils, db_pool, db_routing, geo_index, hospital_stats, json_provider, lookup_cache,
+                       logging_config, metrics, password_hashing, query_stats, request_events)
+from app.controllers import donor_matching
 
 def create_app(config_name='default'):
     """Application factory"""
@@ -14,9 +17,22 @@ def create_app(config_name='default'):
     config[config_name].init_app(app)
     
     # Initialize extensions
+    logging_config.init_app(app)
+    json_provider.init_app(app)
     db.init_app(app)
     jwt.init_app(app)
     migrate = Migrate(app, db)
+    db_pool.init_app(app)
+    db_routing.init_app(app)
+    query_stats.init_app(app)
+    metrics.init_app(app)
+    auth_utils.init_app(app)
+    password_hashing.init_app(app)
+    geo_index.init_app(app)
+    lookup_cache.init_app(app)
+    hospital_stats.init_app(app)
+    request_events.init_app(app)
+    donor_matching.init_app(app)
     
     # Configure CORS
     CORS(app, resources={
@@ -32,10 +48,14 @@ def create_app(config_name='default'):
     from app.routes.auth_routes import auth_bp
     from app.routes.hospital_routes import hospital_bp
     from app.routes.blood_routes import blood_bp
+    from app.routes.health_routes import health_bp
+    from app.routes.analytics_routes import analytics_bp
     
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(hospital_bp, url_prefix='/hospital')
     app.register_blueprint(blood_bp, url_prefix='/blood')
+    app.register_blueprint(health_bp, url_prefix='/health')
+    app.register_blueprint(analytics_bp, url_prefix='/analytics')
     
     # Root-level routes for frontend compatibility
     @app.route('/blood-requests', methods=['POST'])
@@ -0,0 +1,114 @@
+from datetime import date, datetime
+from models import db, Hospital, HospitalBloodAvailability
+from app.utils.hospital_stats import note_units
+from app.utils.lookup_cache import get_lookup_cache
+from app.utils.upsert import insert_for
+
+def _parse_row(index, row, default_hospital_id):
+    """Validate one payload row; returns (entry, error)"""
+    if not isinstance(row, dict):
+        return None, 'Row must be an object'
+    try:
+        hospital_id = int(row.get('hospital_id', default_hospital_id))
+    except (TypeError, ValueError):
+        return None, 'Invalid or missing hospital_id'
+    blood_group_key = row.get('blood_group_id', row.get('blood_group'))
+    if blood_group_key is None:
+        return None, 'Missing blood_group_id'
+    try:
+        no_of_units = int(row.get('no_of_units'))
+    except (TypeError, ValueError):
+        return None, 'Invalid or missing no_of_units'
+    if no_of_units < 0:
+        return None, 'no_of_units cannot be negative'
+    return {'index': index, 'hospital_id': hospital_id, 'blood_group': blood_group_key,
+            'no_of_units': no_of_units}, None
+
+def row_hospital_ids(rows, default_hospital_id=None):
+    """Hospitals a bulk payload would write to; rows without a usable hospital_id write nothing"""
+    hospital_ids = set()
+    for row in rows:
+        if isinstance(row, dict):
+            try:
+                hospital_ids.add(int(row.get('hospital_id', default_hospital_id)))
+            except (TypeError, ValueError):
+                pass
+    return hospital_ids
+
+def bulk_update_availability(rows, default_hospital_id=None):
+    """
+    Validate and apply many (hospital, blood group, units) rows at once.
+
+    Hospitals are checked, and their existing availability rows found, in
+    one query; blood groups come from the lookup cache. Every valid row is
+    then written by a single multi-row INSERT ... ON CONFLICT DO UPDATE in
+    the caller's transaction. Invalid rows are skipped and reported.
+
+    Returns one result dict per input row, in order, with ``status`` set to
+    'created', 'updated' or 'error'.
+    """
+    results = []
+    entries = []
+    for index, row in enumerate(rows):
+        entry, error = _parse_row(index, row, default_hospital_id)
+        if error:
+            results.append({'index': index, 'status': 'error', 'error': error})
+            continue
+        blood_group = get_lookup_cache().blood_group(entry['blood_group'])
+        if not blood_group:
+            results.append({'index': index, 'status': 'error', 'error': 'Blood group not found'})
+            continue
+        entry['blood_group_id'] = blood_group['blood_group_id']
+        results.append(None)
+        entries.append(entry)
+
+    hospital_ids = {entry['hospital_id'] for entry in entries}
+    known_hospitals = set()
+    existing = set()
+    if hospital_ids:
+        found = db.session.execute(
+            db.select(Hospital.hospital_id, HospitalBloodAvailability.blood_group_id)
+            .outerjoin(HospitalBloodAvailability, HospitalBloodAvailability.hospital_id == Hospital.hospital_id)
+            .where(Hospital.hospital_id.in_(hospital_ids))
+        ).all()
+        for hospital_id, blood_group_id in found:
+            known_hospitals.add(hospital_id)
+            if blood_group_id is not None:
+                existing.add((hospital_id, blood_group_id))
+
+    # ON CONFLICT cannot touch the same row twice in one statement, so a
+    # repeated (hospital, blood group) keeps its last value
+    values = {}
+    for entry in entries:
+        key = (entry['hospital_id'], entry['blood_group_id'])
+        if entry['hospital_id'] not in known_hospitals:
+            results[entry['index']] = {'index': entry['index'], 'status': 'error', 'error': 'Hospital not found'}
+            continue
+        if key in values:
+            earlier = values[key]
+            results[earlier['index']] = {'index': earlier['index'], 'status': 'error',
+                                         'error': 'Superseded by a later row for the same hospital and blood group'}
+        values[key] = entry
+        results[entry['index']] = {
+            'index': entry['index'],
+            'hospital_id': entry['hospital_id'],
+            'blood_group_id': entry['blood_group_id'],
+            'no_of_units': entry['no_of_units'],
+            'status': 'updated' if key in existing else 'created',
+        }
+
+    if values:
+        now = datetime.utcnow()
+        stmt = insert_for(HospitalBloodAvailability).values([
+            {'hospital_id': hospital_id, 'blood_group_id': blood_group_id,
+             'no_of_units': entry['no_of_units'], 'from_date': date.today(), 'to_date': None, 'updated_at': now}
+            for (hospital_id, blood_group_id), entry in values.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['hospital_id', 'blood_group_id'],
+            set_={'no_of_units': stmt.excluded.no_of_units, 'to_date': None, 'updated_at': stmt.excluded.updated_at}
+        )
+        db.session.execute(stmt)
+        for (hospital_id, blood_group_id), entry in values.items():
+            note_units(db.session(), hospital_id, blood_group_id, entry['no_of_units'])
+    return results
@@ -0,0 +1,60 @@
+from datetime import date, datetime
+from models import db, BloodRequest, BloodRequestResponse
+from app.utils.request_events import note_response
+from app.utils.upsert import insert_for, inserted_flag
+
+# The unique index the upsert resolves conflicts on
+CONFLICT_COLUMNS = ('blood_request_id', 'user_id')
+
+def upsert_response(blood_request_id, user_id, update=(), **values):
+    """
+    Insert a donor's response to a blood request, or return the one they
+    already made, in a single INSERT ... ON CONFLICT ... RETURNING (on
+    SQLite, a response that already exists takes a second statement).
+
+    ``update`` names the columns of ``values`` that overwrite an existing
+    response (``updated_at`` is refreshed with them); when empty the existing
+    row is returned unchanged. Returns ``(response, created)``. Concurrent
+    submissions for the same donor and request are serialized by the unique
+    index, so exactly one of them sees ``created``.
+    """
+    now = datetime.utcnow()
+    row = {'from_date': date.today(), 'responded_date': date.today(), **values}
+    row.update(blood_request_id=blood_request_id, user_id=int(user_id), created_at=now, updated_at=now)
+
+    insert = insert_for(BloodRequestResponse).values(**row)
+    if update:
+        set_ = {column: insert.excluded[column] for column in update}
+        set_['updated_at'] = insert.excluded.updated_at
+    else:
+        # A no-op assignment so RETURNING still yields the existing row
+        set_ = {'blood_request_id': insert.excluded.blood_request_id}
+    stmt = insert.on_conflict_do_update(index_elements=list(CONFLICT_COLUMNS), set_=set_)
+
+    inserted = inserted_flag(BloodRequestResponse)
+    if inserted is not None:
+        response, created = db.session.execute(
+            stmt.returning(BloodRequestResponse, inserted),
+            execution_options={'populate_existing': True}
+        ).one()
+    else:
+        # No insert/update marker in RETURNING: try a plain insert first, and
+        # only a row that already existed falls through to the upsert
+        response = db.session.scalars(
+            insert.on_conflict_do_nothing(index_elements=list(CONFLICT_COLUMNS)).returning(BloodRequestResponse),
+            execution_options={'populate_existing': True}
+        ).one_or_none()
+        created = response is not None
+        if not created:
+            response = db.session.scalars(
+                stmt.returning(BloodRequestResponse),
+                execution_options={'populate_existing': True}
+            ).one()
+    if created or update:
+        # Callers have already loaded the request, so this is an identity map hit
+        blood_request = db.session.get(BloodRequest, blood_request_id)
+        if blood_request is not None:
+            # Its responses_count changed, so delta sync has to pick the request up again
+            blood_request.updated_at = datetime.utcnow()
+            note_response(db.session(), blood_request, user_id, response.response_status)
+    return response, created
@@ -0,0 +1,217 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from flask import current_app
+
+DONOR_ROLE_ID = 3
+
+# Donor groups whose red cells each recipient group can receive, best match first.
+# Universal O- donors are kept last so they are not used up on easy matches.
+COMPATIBLE_DONORS = {
+    'O-': ['O-'],
+    'O+': ['O+', 'O-'],
+    'A-': ['A-', 'O-'],
+    'A+': ['A+', 'A-', 'O+', 'O-'],
+    'B-': ['B-', 'O-'],
+    'B+': ['B+', 'B-', 'O+', 'O-'],
+    'AB-': ['AB-', 'A-', 'B-', 'O-'],
+    'AB+': ['AB+', 'AB-', 'A+', 'A-', 'B+', 'B-', 'O+', 'O-'],
+}
+
+# How many leading PIN code digits a donor shares with the hospital
+PROXIMITY_LABELS = {6: 'same_pincode', 3: 'same_district', 2: 'same_region', 1: 'same_zone', 0: 'other'}
+
+def normalize_blood_group(value):
+    """Map free-text blood groups such as 'o +ve' or 'AB Negative' to 'O+' / 'AB-'"""
+    if not value:
+        return None
+    text = str(value).upper().replace(' ', '').replace('0', 'O')
+    for word, sign in (('POSITIVE', '+'), ('NEGATIVE', '-'), ('POS', '+'), ('NEG', '-'), ('VE', '')):
+        text = text.replace(word, sign)
+    return text if text in COMPATIBLE_DONORS else None
+
+def normalize_pincode(value):
+    """Keep only the digits of a PIN code; '' if there are none"""
+    if value is None:
+        return ''
+    return ''.join(ch for ch in str(value) if ch.isdigit())
+
+class DonorBuckets:
+    """
+    Per-blood-group donor buckets sorted by PIN code.
+
+    Each bucket is a sorted list of (pincode, user_id), so donors sharing
+    any PIN prefix with the hospital form a contiguous slice found by
+    bisection. Matching reads at most ``limit`` donors per prefix level
+    instead of scanning the users table.
+    """
+
+    def __init__(self, ttl_seconds=300):
+        self.ttl_seconds = ttl_seconds
+        self._buckets = {group: [] for group in COMPATIBLE_DONORS}
+        self._donors = {}
+        self._lock = threading.RLock()
+        self._built_at = None
+
+    def __len__(self):
+        return len(self._donors)
+
+    def is_stale(self):
+        """Check if the buckets were never built or have outlived their TTL"""
+        if self._built_at is None:
+            return True
+        return bool(self.ttl_seconds) and time.monotonic() - self._built_at > self.ttl_seconds
+
+    def build(self, rows):
+        """Replace the buckets with (user_id, blood_group, pincode) rows"""
+        buckets = {group: [] for group in COMPATIBLE_DONORS}
+        donors = {}
+        for user_id, blood_group, pincode in rows:
+            group = normalize_blood_group(blood_group)
+            if group is None:
+                continue
+            pincode = normalize_pincode(pincode)
+            buckets[group].append((pincode, user_id))
+            donors[user_id] = (group, pincode)
+        for bucket in buckets.values():
+            bucket.sort()
+        with self._lock:
+            self._buckets = buckets
+            self._donors = donors
+            self._built_at = time.monotonic()
+
+    def add(self, user_id, blood_group, pincode):
+        """Insert or move a single donor"""
+        with self._lock:
+            self.remove(user_id)
+            group = normalize_blood_group(blood_group)
+            if group is None:
+                return
+            pincode = normalize_pincode(pincode)
+            insort(self._buckets[group], (pincode, user_id))
+            self._donors[user_id] = (group, pincode)
+
+    def remove(self, user_id):
+        """Drop a donor from the buckets if present"""
+        with self._lock:
+            entry = self._donors.pop(user_id, None)
+            if entry is None:
+                return
+            bucket = self._buckets[entry[0]]
+            position = bisect_left(bucket, (entry[1], user_id))
+            if position < len(bucket) and bucket[position] == (entry[1], user_id):
+                del bucket[position]
+
+    def candidates(self, recipient_group, pincode, exclude=(), limit=50):
+        """
+        Rank compatible donors for a recipient.
+
+        Returns (user_id, donor_group, shared_prefix_len) tuples, nearest
+        PIN prefix first and, within a prefix level, exact group matches
+        before substitutes.
+        """
+        recipient_group = normalize_blood_group(recipient_group)
+        if recipient_group is None:
+            return []
+        pincode = normalize_pincode(pincode)
+        prefix_lengths = sorted({n for n in (len(pincode), 3, 2, 1, 0) if n <= len(pincode)}, reverse=True)
+
+        seen = set(exclude)
+        result = []
+        with self._lock:
+            for prefix_len in prefix_lengths:
+                prefix = pincode[:prefix_len]
+                for group in COMPATIBLE_DONORS[recipient_group]:
+                    bucket = self._buckets[group]
+                    start = bisect_left(bucket, (prefix,))
+                    end = bisect_left(bucket, (prefix + '\uffff',))
+                    for position in range(start, end):
+                        user_id = bucket[position][1]
+                        if user_id in seen:
+                            continue
+                        seen.add(user_id)
+                        result.append((user_id, group, prefix_len))
+                        if len(result) >= limit:
+                            return result
+        return result
+
+def init_app(app):
+    """Attach empty donor buckets to the app; they are filled on first use"""
+    app.extensions['donor_buckets'] = DonorBuckets(ttl_seconds=app.config.get('DONOR_BUCKETS_TTL', 300))
+
+def get_donor_buckets():
+    """Get the donor buckets for the current app, (re)building them when stale"""
+    from models import db, User
+
+    buckets = current_app.extensions['donor_buckets']
+    if buckets.is_stale():
+        rows = db.session.query(User.user_id, User.blood_group, User.pincode).filter(
+            User.user_role_id == DONOR_ROLE_ID,
+            User.to_date.is_(None),
+            User.blood_group.isnot(None)
+        ).all()
+        buckets.build(rows)
+    return buckets
+
+def find_candidates(blood_request, limit=50):
+    """
+    Ranked candidate donors for a blood request, skipping its requester and
+    anyone who has already responded to it.
+    """
+    from models import db, User, BloodRequestResponse
+
+    if not blood_request.blood_group:
+        return []
+    recipient_group = normalize_blood_group(blood_request.blood_group.blood_group_name)
+
+    responded = db.session.query(BloodRequestResponse.user_id).filter(
+        BloodRequestResponse.blood_request_id == blood_request.blood_request_id
+    )
+    exclude = {row.user_id for row in responded}
+    exclude.add(blood_request.user_id)
+
+    pincode = blood_request.hospital.hospital_pincode if blood_request.hospital else None
+    ranked = get_donor_buckets().candidates(recipient_group, pincode, exclude=exclude, limit=limit)
+    if not ranked:
+        return []
+
+    users = User.query.filter(User.user_id.in_([user_id for user_id, _, _ in ranked])).all()
+    users_by_id = {user.user_id: user for user in users}
+    result = []
+    for user_id, donor_group, prefix_len in ranked:
+        user = users_by_id.get(user_id)
+        if not user:
+            continue
+        result.append({
+            'user_id': user.user_id,
+            'user_name': user.user_name,
+            'blood_group': donor_group,
+            'pincode': user.pincode,
+            'match': 'exact' if donor_group == recipient_group else 'compatible',
+            'proximity': PROXIMITY_LABELS.get(prefix_len, 'same_pincode'),
+        })
+    return result
+
+def alert_recipients(blood_request_ids, limit=2000):
+    """
+    {blood_request_id: [donor user_id, ...]} for new-request push alerts,
+    nearest compatible donors first. The requests are loaded in one query;
+    ranking comes from the in-memory buckets.
+    """
+    from sqlalchemy.orm import joinedload
+    from models import BloodRequest
+
+    requests = BloodRequest.query.options(
+        joinedload(BloodRequest.hospital), joinedload(BloodRequest.blood_group)
+    ).filter(BloodRequest.blood_request_id.in_(list(blood_request_ids))).all()
+    buckets = get_donor_buckets()
+    result = {}
+    for blood_request in requests:
+        if not blood_request.blood_group:
+            result[blood_request.blood_request_id] = []
+            continue
+        pincode = blood_request.hospital.hospital_pincode if blood_request.hospital else None
+        ranked = buckets.candidates(blood_request.blood_group.blood_group_name, pincode,
+                                    exclude={blood_request.user_id}, limit=limit)
+        result[blood_request.blood_request_id] = [user_id for user_id, _, _ in ranked]
+    return result
@@ -0,0 +1,47 @@
+from models import db, Notification
+from app.utils.outbox import DONOR_ALERT, enqueue
+
+def notify_user(user_id, subject, body, action_url=None, payload=None):
+    """
+    Alert a user in the current transaction: an in-app notification plus
+    queued email and push messages, delivered later by the outbox worker.
+    """
+    db.session.add(Notification(user_id=user_id, message=subject, action_url=action_url))
+    enqueue('email', subject, body, user_id=user_id, payload=payload)
+    enqueue('push', subject, body, user_id=user_id, payload=payload)
+
+def notify_response_accepted(blood_request, hospital_email=None):
+    """A donor accepted ``blood_request``: tell the requester and, if given, the hospital"""
+    subject = 'Blood Donation Accepted'
+    body = f"A donor has accepted your blood request (ID: {blood_request.blood_request_id})."
+    payload = {'type': 'response_accepted', 'blood_request_id': blood_request.blood_request_id}
+    notify_user(blood_request.user_id, subject, body,
+                action_url=f'/blood/request/{blood_request.blood_request_id}', payload=payload)
+    if hospital_email:
+        enqueue('email', subject, body, recipient=hospital_email, payload=payload)
+
+def notify_donation_scheduled(blood_request, scheduled_datetime):
+    """A donor scheduled a donation for ``blood_request``: tell the requester"""
+    when = scheduled_datetime.isoformat() if hasattr(scheduled_datetime, 'isoformat') else scheduled_datetime
+    notify_user(
+        blood_request.user_id, 'Donation Scheduled',
+        f"A donor has scheduled a donation for your blood request (ID: {blood_request.blood_request_id}) at {when}.",
+        action_url=f'/blood/request/{blood_request.blood_request_id}',
+        payload={'type': 'donation_scheduled', 'blood_request_id': blood_request.blood_request_id,
+                 'scheduled_datetime': when},
+    )
+
+def notify_new_blood_request(blood_request):
+    """
+    Queue a push alert to compatible donors near the hospital. Recipients
+    are resolved when the worker sends it, so the request only writes one row.
+    """
+    if (blood_request.status or 'pending') != 'pending':
+        return
+    if blood_request.blood_request_id is None:
+        db.session.flush()
+    enqueue(
+        DONOR_ALERT, 'Blood Donation Needed',
+        f"{blood_request.no_of_units} unit(s) of blood are needed near you (request ID: {blood_request.blood_request_id}).",
+        payload={'type': 'new_blood_request', 'blood_request_id': blood_request.blood_request_id},
+    )
@@ -0,0 +1,138 @@
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import object_session
+from db import RoutingSession
+from models import db, BloodRequest, BloodRequestResponse, DailyRequestRollup
+from app.utils.upsert import insert_for
+
+COUNTERS = ('requests_created', 'requests_accepted', 'requests_completed', 'requests_cancelled', 'donations_scheduled')
+
+# Request status -> counter bumped on the day a request reaches it
+STATUS_COUNTERS = {
+    'accepted': 'requests_accepted',
+    'completed': 'requests_completed',
+    'cancelled': 'requests_cancelled',
+}
+
+# Deltas wait in session.info under this key until the next flush or commit
+# writes them, so they land in the same transaction as the rows they count.
+_PENDING_KEY = 'rollup_deltas'
+
+def _today():
+    return datetime.utcnow().date()
+
+def record(session, day, hospital_id, blood_group_id, counter, amount=1):
+    """Add ``amount`` to one rollup counter as part of ``session``'s transaction"""
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    pending.setdefault((day, hospital_id, blood_group_id), Counter())[counter] += amount
+
+def record_donation_scheduled(session, blood_request):
+    """Count a donation scheduled today against the request's hospital and blood group"""
+    record(session, _today(), blood_request.hospital_id, blood_request.blood_group_type, 'donations_scheduled')
+
+def _upsert(connection, deltas):
+    stmt = insert_for(DailyRequestRollup).values([
+        {'day': day, 'hospital_id': hospital_id, 'blood_group_id': blood_group_id,
+         **{counter: counts.get(counter, 0) for counter in COUNTERS}}
+        for (day, hospital_id, blood_group_id), counts in deltas.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['day', 'hospital_id', 'blood_group_id'],
+        set_={counter: getattr(DailyRequestRollup, counter) + stmt.excluded[counter] for counter in COUNTERS}
+    )
+    connection.execute(stmt)
+
+def _write_pending(session):
+    deltas = session.info.pop(_PENDING_KEY, None)
+    if deltas:
+        _upsert(session.connection(), deltas)
+
+def _request_inserted(mapper, connection, target):
+    session = object_session(target)
+    if session is None:
+        return
+    day = target.created_at.date() if target.created_at else _today()
+    record(session, day, target.hospital_id, target.blood_group_type, 'requests_created')
+    if target.status in STATUS_COUNTERS:
+        record(session, day, target.hospital_id, target.blood_group_type, STATUS_COUNTERS[target.status])
+
+def _request_updated(mapper, connection, target):
+    session = object_session(target)
+    if session is None or not inspect(target).attrs.status.history.has_changes():
+        return
+    if target.status in STATUS_COUNTERS:
+        record(session, _today(), target.hospital_id, target.blood_group_type, STATUS_COUNTERS[target.status])
+
+event.listen(BloodRequest, 'after_insert', _request_inserted)
+event.listen(BloodRequest, 'after_update', _request_updated)
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _write_after_flush(session, flush_context):
+    _write_pending(session)
+
+@event.listens_for(RoutingSession, 'before_commit')
+def _write_before_commit(session):
+    _write_pending(session)
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _discard_rolled_back(session):
+    session.info.pop(_PENDING_KEY, None)
+
+def rollup_range(start, end, hospital_id=None, hospital_ids=None):
+    """
+    Rollup rows for days ``start``..``end`` inclusive, optionally for one
+    hospital or limited to ``hospital_ids``. Reads at most days x hospitals
+    x blood groups rows whatever the size of the request and response tables.
+    """
+    query = DailyRequestRollup.query.filter(DailyRequestRollup.day.between(start, end))
+    if hospital_id is not None:
+        query = query.filter(DailyRequestRollup.hospital_id == hospital_id)
+    if hospital_ids is not None:
+        query = query.filter(DailyRequestRollup.hospital_id.in_(hospital_ids))
+    return query.order_by(
+        DailyRequestRollup.day, DailyRequestRollup.hospital_id, DailyRequestRollup.blood_group_id
+    ).all()
+
+def backfill(start, end):
+    """
+    Rebuild the rollups for ``start``..``end`` from the base tables.
+
+    Status history is not stored, so a request's current status is counted
+    on the day it was last updated and a scheduled response on the day it
+    was last updated. Returns the number of rollup rows written.
+    """
+    created_day = db.func.date(BloodRequest.created_at, type_=db.Date)
+    updated_day = db.func.date(db.func.coalesce(BloodRequest.updated_at, BloodRequest.created_at), type_=db.Date)
+    response_day = db.func.date(
+        db.func.coalesce(BloodRequestResponse.updated_at, BloodRequestResponse.created_at), type_=db.Date
+    )
+
+    deltas = {}
+
+    def add(rows, counter_for):
+        for day, hospital_id, blood_group_id, key, count in rows:
+            deltas.setdefault((day, hospital_id, blood_group_id), Counter())[counter_for(key)] += count
+
+    add(db.session.execute(
+        db.select(created_day, BloodRequest.hospital_id, BloodRequest.blood_group_type, db.literal(None), db.func.count())
+        .where(created_day.between(start, end))
+        .group_by(created_day, BloodRequest.hospital_id, BloodRequest.blood_group_type)
+    ), lambda _: 'requests_created')
+    add(db.session.execute(
+        db.select(updated_day, BloodRequest.hospital_id, BloodRequest.blood_group_type, BloodRequest.status, db.func.count())
+        .where(updated_day.between(start, end), BloodRequest.status.in_(STATUS_COUNTERS))
+        .group_by(updated_day, BloodRequest.hospital_id, BloodRequest.blood_group_type, BloodRequest.status)
+    ), STATUS_COUNTERS.get)
+    add(db.session.execute(
+        db.select(response_day, BloodRequest.hospital_id, BloodRequest.blood_group_type, db.literal(None), db.func.count())
+        .join(BloodRequest, BloodRequest.blood_request_id == BloodRequestResponse.blood_request_id)
+        .where(response_day.between(start, end), BloodRequestResponse.scheduled_datetime.isnot(None))
+        .group_by(response_day, BloodRequest.hospital_id, BloodRequest.blood_group_type)
+    ), lambda _: 'donations_scheduled')
+
+    db.session.execute(db.delete(DailyRequestRollup).where(DailyRequestRollup.day.between(start, end)))
+    if deltas:
+        _upsert(db.session.connection(), deltas)
+    db.session.commit()
+    return len(deltas)
@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+from flask import Blueprint, current_app, jsonify, request
+from flask_jwt_extended import jwt_required
+from app.controllers.rollups import COUNTERS, rollup_range
+from app.utils.auth_utils import ROLE_IDS, get_current_principal
+from app.utils.db_routing import read_only
+import logging
+
+analytics_bp = Blueprint('analytics', __name__)
+
+logger = logging.getLogger(__name__)
+
+@analytics_bp.route('/rollups', methods=['GET'])
+@jwt_required()
+@read_only
+def get_rollups():
+    """
+    Daily request and donation counters per hospital and blood group.
+
+    Query parameters: from, to (ISO dates, inclusive; default the last 30
+    days) and optional hospital_id. Super admins see every hospital,
+    hospital admins only the hospitals they administer.
+    """
+    try:
+        principal = get_current_principal()
+        if principal is None:
+            return jsonify({'error': 'User not found'}), 404
+        if principal.user_role_id == ROLE_IDS['super_admin']:
+            allowed = None
+        elif principal.user_role_id == ROLE_IDS['hospital_admin'] and principal.hospital_ids:
+            allowed = principal.hospital_ids
+        else:
+            return jsonify({'error': 'Hospital admin access required'}), 403
+
+        try:
+            end = date.fromisoformat(request.args['to']) if request.args.get('to') else date.today()
+            start = date.fromisoformat(request.args['from']) if request.args.get('from') else end - timedelta(days=29)
+        except ValueError:
+            return jsonify({'error': 'from and to must be YYYY-MM-DD dates'}), 400
+        if start > end:
+            return jsonify({'error': 'from must not be after to'}), 400
+        max_days = current_app.config.get('ANALYTICS_MAX_RANGE_DAYS', 366)
+        if (end - start).days + 1 > max_days:
+            return jsonify({'error': f'Date range cannot exceed {max_days} days'}), 400
+
+        hospital_id = request.args.get('hospital_id', type=int)
+        if hospital_id is not None and allowed is not None and hospital_id not in allowed:
+            return jsonify({'error': 'You do not administer this hospital'}), 403
+        rows = rollup_range(start, end, hospital_id, allowed)
+
+        totals = {counter: 0 for counter in COUNTERS}
+        result = []
+        for row in rows:
+            entry = {
+                'day': row.day.isoformat(),
+                'hospital_id': row.hospital_id,
+                'blood_group_id': row.blood_group_id,
+            }
+            for counter in COUNTERS:
+                value = getattr(row, counter)
+                entry[counter] = value
+                totals[counter] += value
+            result.append(entry)
+
+        return jsonify({
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'hospital_id': hospital_id,
+            'rows': result,
+            'totals': totals
+        }), 200
+    except Exception as e:
+        logger.exception("Failed to read rollups")
+        return jsonify({'error': str(e)}), 500
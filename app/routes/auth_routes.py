@@ -1,13 +1,15 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from models import db, User, LookupRole
+from app.controllers.donor_matching import get_donor_buckets, DONOR_ROLE_ID
+from app.utils.auth_utils import role_claims
+from app.utils.password_hashing import hash_password, verify_password, upgrade_password_hash, HashingBusy, RETRY_AFTER_SECONDS
 from datetime import datetime, timedelta
 import logging
 
 auth_bp = Blueprint('auth', __name__)
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
 
 # Role mapping dictionary
 ROLE_MAPPING = {
@@ -32,7 +34,6 @@ def map_role_to_id(role_name):
 @auth_bp.route('/register', methods=['POST'])
 def register():
     data = request.get_json()
-    logging.debug(f"Incoming registration data: {data}")
 
     # Map frontend field names to backend field names
     user_name = data.get('user_name') or data.get('fullname')
@@ -62,30 +63,36 @@ def register():
         missing_fields.append('pincode')
 
     if missing_fields:
-        logging.error(f"Missing required fields: {missing_fields}")
+        logger.info("Missing required fields: %s", missing_fields)
         return jsonify({'message': f"Missing required fields: {', '.join(missing_fields)}"}), 400
 
     # Map role name to role ID
     role_id = map_role_to_id(role_name)
     if role_id is None:
-        logging.error(f"Invalid role: {role_name}")
+        logger.info("Invalid role: %s", role_name)
         return jsonify({'message': 'Invalid role'}), 400
 
     # Check if email or phone number already exists
     if User.query.filter_by(user_email=user_email).first():
-        logging.error(f"Email already exists: {user_email}")
+        logger.info("Email already exists: %s", user_email)
         return jsonify({'message': 'Email already exists'}), 409
     if User.query.filter_by(user_phone_number=user_phone_number).first():
-        logging.error(f"Phone number already exists: {user_phone_number}")
+        logger.info("Phone number already exists: %s", user_phone_number)
         return jsonify({'message': 'Phone number already exists'}), 409
 
+    try:
+        password_hash = hash_password(password)
+    except HashingBusy:
+        logger.warning("Password hashing pool is saturated")
+        return jsonify({'message': 'Server busy, please retry'}), 503, {'Retry-After': str(RETRY_AFTER_SECONDS)}
+
     # Create new user
     new_user = User(
         user_name=user_name,
         blood_group=blood_group,
         address=address,
         pincode=pincode,
-        password=password,
+        password=password_hash,
         user_email=user_email,
         user_phone_number=user_phone_number,
         user_role_id=role_id,
@@ -95,16 +102,18 @@ def register():
     db.session.add(new_user)
     db.session.commit()
 
-    logging.info(f"User registered successfully: {user_name}")
+    if role_id == DONOR_ROLE_ID:
+        get_donor_buckets().add(new_user.user_id, new_user.blood_group, new_user.pincode)
+
+    logger.info("User registered successfully: %s", user_name)
     return jsonify({'message': 'User registered successfully'}), 201
 
 @auth_bp.route('/login', methods=['POST'])
 def login():
     data = request.get_json(silent=True)
-    logging.debug(f"Incoming login data: {data}")
 
     if not data:
-        logging.error("Invalid or missing JSON body")
+        logger.info("Invalid or missing JSON body")
         return jsonify({'success': False, 'message': 'Invalid or missing JSON body'}), 400
 
     # Use 'user_email' if present, fallback to 'emailaddress'
@@ -112,26 +121,36 @@ def login():
     password = data.get('password')
 
     if not user_email or not password:
-        logging.error("Missing required fields: user_email and password required")
+        logger.info("Missing required fields: user_email and password required")
         return jsonify({'success': False, 'message': 'Missing required fields: user_email and password required'}), 400
 
     user = User.query.filter_by(user_email=user_email).first()
 
     if not user:
-        logging.error(f"User not found for email: {user_email}")
+        logger.info("User not found for email: %s", user_email)
         return jsonify({'success': False, 'message': 'User not found'}), 404
 
-    if not user.check_password(password):
-        logging.error("Invalid password")
+    try:
+        password_ok, needs_rehash = verify_password(user.password, password)
+    except HashingBusy:
+        logger.warning("Password hashing pool is saturated")
+        return jsonify({'success': False, 'message': 'Server busy, please retry'}), 503, {'Retry-After': str(RETRY_AFTER_SECONDS)}
+
+    if not password_ok:
+        logger.info("Invalid password")
         return jsonify({'success': False, 'message': 'Invalid password'}), 401
 
+    if needs_rehash:
+        upgrade_password_hash(user, password)
+
     # Create token with user_id as identity (not a dict)
     access_token = create_access_token(
         identity=str(user.user_id),
-        expires_delta=timedelta(hours=1)
+        expires_delta=timedelta(hours=1),
+        additional_claims=role_claims(user)
     )
 
-    logging.info(f"User logged in successfully: {user_email}")
+    logger.info("User logged in successfully: %s", user_email)
     return jsonify({
         'success': True, 
         'message': 'Login successful', 
@@ -156,10 +175,9 @@ def protected():
 @auth_bp.route('/hospital-admin-login', methods=['POST'])
 def hospital_admin_login():
     data = request.get_json(silent=True)
-    logging.debug(f"Incoming hospital admin login data: {data}")
 
     if not data:
-        logging.error("Invalid or missing JSON body")
+        logger.info("Invalid or missing JSON body")
         return jsonify({'success': False, 'message': 'Invalid or missing JSON body'}), 400
 
     # Accept 'email' or 'user_email' for flexibility
@@ -167,7 +185,7 @@ def hospital_admin_login():
     password = data.get('password')
 
     if not user_email or not password:
-        logging.error("Missing required fields: email and password required")
+        logger.info("Missing required fields: email and password required")
         return jsonify({'success': False, 'message': 'Missing required fields: email and password required'}), 400
 
     # Get the role_id for hospital_admin
@@ -175,19 +193,29 @@ def hospital_admin_login():
     user = User.query.filter_by(user_email=user_email, user_role_id=hospital_admin_role_id).first()
 
     if not user:
-        logging.error(f"Hospital admin not found or not authorized for email: {user_email}")
+        logger.info("Hospital admin not found or not authorized for email: %s", user_email)
         return jsonify({'success': False, 'message': 'Unauthorized: Only hospital admins can login here'}), 401
 
-    if not user.check_password(password):
-        logging.error("Invalid password for hospital admin login")
+    try:
+        password_ok, needs_rehash = verify_password(user.password, password)
+    except HashingBusy:
+        logger.warning("Password hashing pool is saturated")
+        return jsonify({'success': False, 'message': 'Server busy, please retry'}), 503, {'Retry-After': str(RETRY_AFTER_SECONDS)}
+
+    if not password_ok:
+        logger.info("Invalid password for hospital admin login")
         return jsonify({'success': False, 'message': 'Invalid password'}), 401
 
+    if needs_rehash:
+        upgrade_password_hash(user, password)
+
     access_token = create_access_token(
         identity=str(user.user_id),
-        expires_delta=timedelta(hours=1)
+        expires_delta=timedelta(hours=1),
+        additional_claims=role_claims(user)
     )
 
-    logging.info(f"Hospital admin logged in successfully: {user_email}")
+    logger.info("Hospital admin logged in successfully: %s", user_email)
     return jsonify({
         'success': True,
         'message': 'Hospital admin login successful',
@@ -1,10 +1,23 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import db, BloodRequest, BloodRequestResponse, User, Hospital, LookupBloodGroup, UserHospitalAdminLineage
 from app.schemas.blood_request_schemas import BloodRequestSchema, BloodRequestResponseSchema
+from app.utils.pagination import changes_page, keyset_page, decode_cursor, encode_cursor, parse_page_size
+from app.utils import query_profiles, serializers
+from app.controllers.blood_responses import upsert_response
+from app.controllers.rollups import record_donation_scheduled
+from app.controllers.notifications import (notify_donation_scheduled, notify_new_blood_request,
+                                           notify_response_accepted)
+from app.controllers.donor_matching import find_candidates
+from app.utils.lookup_cache import get_lookup_cache
+from app.utils.db_routing import read_only
+from app.utils.conditional import conditional, make_etag
+from app.utils.request_events import (changed_requests, get_request_event_broker, matches as events_match,
+                                      resume_watermark)
 from marshmallow import ValidationError
-from datetime import datetime, date
-from sqlalchemy import and_
+from sqlalchemy.orm import aliased
+from datetime import datetime, date, timedelta
+import time
 
 blood_bp = Blueprint('blood', __name__)
 
@@ -42,36 +55,15 @@ def create_blood_request():
                 'error': f'Hospital with ID {hospital_id} not found. Available hospitals: {", ".join(hospital_names)}'
             }), 404
         
-        # Handle blood group type (can be string or integer)
+        # Handle blood group type (can be a name or an id), resolved from the lookup cache
         blood_group_type = validated_data['blood_group_type']
-        blood_group_id = None
-        
-        if isinstance(blood_group_type, int):
-            # If it's already an integer, use it directly
-            blood_group_id = blood_group_type
-        else:
-            # If it's a string, look up the blood group by name
-            blood_group = LookupBloodGroup.query.filter(
-                LookupBloodGroup.blood_group_name.ilike(str(blood_group_type))
-            ).first()
-            if blood_group:
-                blood_group_id = blood_group.blood_group_id
-            else:
-                # Get available blood groups for better error message
-                available_blood_groups = LookupBloodGroup.query.all()
-                blood_group_names = [bg.blood_group_name for bg in available_blood_groups]
-                return jsonify({
-                    'error': f'Blood group "{blood_group_type}" not found. Available blood groups: {", ".join(blood_group_names)}'
-                }), 404
-        
-        # Validate blood group exists
-        blood_group = LookupBloodGroup.query.get(blood_group_id)
+        lookups = get_lookup_cache()
+        blood_group = lookups.blood_group(blood_group_type)
         if not blood_group:
-            available_blood_groups = LookupBloodGroup.query.all()
-            blood_group_names = [bg.blood_group_name for bg in available_blood_groups]
             return jsonify({
-                'error': f'Blood group with ID {blood_group_id} not found. Available blood groups: {", ".join(blood_group_names)}'
+                'error': f'Blood group "{blood_group_type}" not found. Available blood groups: {", ".join(lookups.blood_group_names())}'
             }), 404
+        blood_group_id = blood_group['blood_group_id']
         
         # Normalize status to lowercase
         status = validated_data.get('status', 'pending').lower()
@@ -94,6 +86,7 @@ def create_blood_request():
         )
         
         db.session.add(blood_request)
+        notify_new_blood_request(blood_request)
         db.session.commit()
         
         return jsonify({
@@ -112,8 +105,15 @@ def create_blood_request_alias():
     """Alias endpoint for /blood/request to support frontend compatibility"""
     return create_blood_request()
 
+def _fetch_blood_requests(query, paginate, cursor, limit):
+    """Run the list query either as one keyset page or, for legacy callers, in full"""
+    if not paginate:
+        return query.all(), None
+    return keyset_page(query, BloodRequest.created_at, BloodRequest.blood_request_id, cursor, limit)
+
 # Get all blood requests (with optional filters)
 @blood_bp.route('/requests', methods=['GET'])
+@read_only
 def get_blood_requests():
     try:
         # Try to get current user ID, but don't require authentication
@@ -130,6 +130,19 @@ def get_blood_requests():
         hospital_id = request.args.get('hospital_id')
         user_id = request.args.get('user_id')
         
+        # Keyset pagination; ?paginate=false returns the legacy full list
+        paginate = request.args.get('paginate', 'true').lower() != 'false'
+        cursor = request.args.get('cursor')
+        try:
+            limit = parse_page_size(request.args.get('limit'))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        if cursor:
+            try:
+                decode_cursor(cursor)
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor'}), 400
+        
         # Build query
         query = BloodRequest.query
         
@@ -146,63 +159,215 @@ def get_blood_requests():
         # If authenticated, show all requests. If not, show only public info
         if current_user_id:
             # Get results with relationships for authenticated users
-            requests = query.join(User).join(Hospital).join(LookupBloodGroup, BloodRequest.blood_group_type == LookupBloodGroup.blood_group_id).all()
+            query = query.join(User).join(Hospital).join(
+                LookupBloodGroup, BloodRequest.blood_group_type == LookupBloodGroup.blood_group_id
+            ).options(*query_profiles.BLOOD_REQUEST_DETAIL)
+            requests, next_cursor = _fetch_blood_requests(query, paginate, cursor, limit)
             
-            result = []
-            for req in requests:
-                result.append({
-                    'blood_request_id': req.blood_request_id,
-                    'user_id': req.user_id,
-                    'user_name': req.user.user_name,
-                    'hospital_id': req.hospital_id,
-                    'hospital_name': req.hospital.hospital_name,
-                    'blood_group_type': req.blood_group_type,
-                    'blood_group_name': req.blood_group.blood_group_name,
-                    'no_of_units': req.no_of_units,
-                    'patient_name': req.patient_name,
-                    'patient_contact_email': req.patient_contact_email,
-                    'patient_contact_phone_number': req.patient_contact_phone_number,
-                    'required_by_date': req.required_by_date.isoformat() if req.required_by_date else None,
-                    'description': req.description,
-                    'status': req.status,
-                    'from_date': req.from_date.isoformat() if req.from_date else None,
-                    'to_date': req.to_date.isoformat() if req.to_date else None,
-                    'created_at': req.created_at.isoformat() if req.created_at else None,
-                    'updated_at': req.updated_at.isoformat() if req.updated_at else None
-                })
+            result = serializers.BLOOD_REQUEST_DETAIL.many(requests)
         else:
             # For unauthenticated users, show limited information
-            requests = query.join(Hospital).join(LookupBloodGroup, BloodRequest.blood_group_type == LookupBloodGroup.blood_group_id).all()
+            query = query.join(Hospital).join(
+                LookupBloodGroup, BloodRequest.blood_group_type == LookupBloodGroup.blood_group_id
+            ).options(*query_profiles.BLOOD_REQUEST_SUMMARY)
+            requests, next_cursor = _fetch_blood_requests(query, paginate, cursor, limit)
             
-            result = []
-            for req in requests:
-                result.append({
-                    'blood_request_id': req.blood_request_id,
-                    'hospital_id': req.hospital_id,
-                    'hospital_name': req.hospital.hospital_name,
-                    'blood_group_type': req.blood_group_type,
-                    'blood_group_name': req.blood_group.blood_group_name,
-                    'no_of_units': req.no_of_units,
-                    'required_by_date': req.required_by_date.isoformat() if req.required_by_date else None,
-                    'description': req.description,
-                    'status': req.status,
-                    'from_date': req.from_date.isoformat() if req.from_date else None,
-                    'created_at': req.created_at.isoformat() if req.created_at else None
-                })
+            result = serializers.BLOOD_REQUEST_PUBLIC.many(requests)
         
-        return jsonify(result), 200
+        if not paginate:
+            return jsonify(result), 200
+        return jsonify({
+            'requests': result,
+            'next_cursor': next_cursor,
+            'limit': limit
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Delta sync of blood requests since an updated_at watermark
+@blood_bp.route('/requests/changes', methods=['GET'])
+@read_only
+def get_blood_request_changes():
+    """
+    Requests created or updated since ``since`` (the ``watermark`` of the
+    previous call), with cancelled or closed requests as tombstones in
+    ``deleted``. Call again with the new watermark while ``has_more``.
+    Without ``since`` this is a full sync of the open requests.
+    """
+    try:
+        current_user_id = None
+        try:
+            current_user_id = get_jwt_identity()
+        except:
+            pass
+        
+        since = request.args.get('since')
+        blood_group_id = request.args.get('blood_group_id')
+        hospital_id = request.args.get('hospital_id')
+        max_rows = current_app.config.get('DELTA_SYNC_MAX_ROWS', 500)
+        try:
+            limit = max(1, min(int(request.args.get('limit', max_rows)), max_rows))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        if since:
+            try:
+                decode_cursor(since)
+            except ValueError:
+                return jsonify({'error': 'Invalid watermark'}), 400
+        
+        query = BloodRequest.query
+        if blood_group_id:
+            query = query.filter(BloodRequest.blood_group_type == blood_group_id)
+        if hospital_id:
+            query = query.filter(BloodRequest.hospital_id == hospital_id)
+        if not since:
+            # A client with nothing yet has nothing to delete
+            query = query.filter(BloodRequest.to_date.is_(None), BloodRequest.status != 'cancelled')
+        
+        if current_user_id:
+            query = query.join(User).join(Hospital).join(
+                LookupBloodGroup, BloodRequest.blood_group_type == LookupBloodGroup.blood_group_id
+            ).options(*query_profiles.BLOOD_REQUEST_DETAIL)
+            serializer = serializers.BLOOD_REQUEST_DETAIL
+        else:
+            query = query.join(Hospital).join(
+                LookupBloodGroup, BloodRequest.blood_group_type == LookupBloodGroup.blood_group_id
+            ).options(*query_profiles.BLOOD_REQUEST_SUMMARY)
+            serializer = serializers.BLOOD_REQUEST_PUBLIC
+        
+        until = datetime.utcnow() - timedelta(seconds=current_app.config.get('DELTA_SYNC_SETTLE_SECONDS', 5))
+        rows, watermark, has_more = changes_page(
+            query, BloodRequest.updated_at, BloodRequest.blood_request_id, since, limit, until
+        )
+        deleted = [row for row in rows if row.to_date is not None or row.status == 'cancelled']
+        changed = [row for row in rows if row.to_date is None and row.status != 'cancelled']
+        return jsonify({
+            'changes': serializer.many(changed),
+            'deleted': [{'blood_request_id': row.blood_request_id, 'updated_at': row.updated_at} for row in deleted],
+            'watermark': watermark,
+            'has_more': has_more
+        }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Stream blood request changes (Server-Sent Events)
+@blood_bp.route('/requests/stream', methods=['GET'])
+def stream_blood_requests():
+    """
+    Push 'created', 'status' and 'response' events as they commit, with the
+    same status / blood_group_id / hospital_id filters as GET /requests.
+    Those only cover writes this process handled, so every
+    SSE_DB_POLL_SECONDS the stream also sends a 'changed' event for each
+    request written since its last poll by any worker (filtered on
+    blood_group_id and hospital_id; a local write may be reported twice).
+    Reconnecting clients send Last-Event-ID to resume; a 'reset' event means
+    events were missed and the list should be fetched again.
+    """
+    broker = get_request_event_broker()
+    config = current_app.config
+    filters = {name: request.args.get(name) for name in ('status', 'blood_group_id', 'hospital_id')}
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    after = broker.position(last_event_id)
+    if not broker.subscribe(config.get('SSE_MAX_CLIENTS', 100)):
+        return jsonify({'error': 'Too many open streams, try again later'}), 503
+
+    dumps = current_app.json.dumps
+    heartbeat = config.get('SSE_HEARTBEAT_SECONDS', 15)
+    deadline = time.monotonic() + config.get('SSE_MAX_STREAM_SECONDS', 300)
+    poll_every = config.get('SSE_DB_POLL_SECONDS', 5)
+    poll_limit = config.get('DELTA_SYNC_MAX_ROWS', 500)
+    settle = timedelta(seconds=config.get('DELTA_SYNC_SETTLE_SECONDS', 5))
+    watermark = resume_watermark(last_event_id) if after is not None else None
+    if poll_every and watermark is None:
+        # Anything the list the client is about to fetch may have missed
+        watermark = encode_cursor(datetime.utcnow() - settle, 0)
+
+    def reset(position, watermark):
+        return f"id: {broker.event_id(position, watermark)}\nevent: reset\ndata: {{}}\n\n"
+
+    def message(event_id, payload):
+        return f"id: {event_id}\nevent: {payload['type']}\ndata: {dumps(payload)}\n\n"
+
+    def generate(after, watermark):
+        try:
+            yield f"retry: {config.get('SSE_RETRY_MS', 3000)}\n\n"
+            if after is None:
+                after = broker.last
+                yield reset(after, watermark)
+            next_poll = quiet_since = time.monotonic()
+            while True:
+                now = time.monotonic()
+                if now >= deadline:
+                    return
+                if poll_every and now >= next_poll:
+                    changed, watermark, has_more = changed_requests(
+                        watermark, datetime.utcnow() - settle, poll_limit,
+                        filters['blood_group_id'], filters['hospital_id']
+                    )
+                    for payload in changed:
+                        position = encode_cursor(payload['at'], payload['blood_request_id'])
+                        yield message(broker.event_id(after, position), payload)
+                    if changed:
+                        quiet_since = now
+                    next_poll = now if has_more else now + poll_every
+                wake = min(deadline, quiet_since + heartbeat, next_poll if poll_every else deadline)
+                events = broker.wait(after, max(0, wake - time.monotonic()))
+                if not events:
+                    if time.monotonic() >= quiet_since + heartbeat:
+                        # Carries the id forward so a reconnect resumes from here
+                        yield f"id: {broker.event_id(after, watermark)}\n: keepalive\n\n"
+                        quiet_since = time.monotonic()
+                    continue
+                if events[0][0] > after + 1:
+                    # Fell further behind than the broker's history
+                    yield reset(events[0][0] - 1, watermark)
+                for sequence, payload in events:
+                    after = sequence
+                    if events_match(payload, **filters):
+                        yield message(broker.event_id(sequence, watermark), payload)
+                quiet_since = time.monotonic()
+        finally:
+            broker.unsubscribe()
+
+    return current_app.response_class(stream_with_context(generate(after, watermark)), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
 # Get a specific blood request by ID
+def _blood_request_version(request_id):
+    """
+    Validator for /request/<id>: the request, its hospital and requester,
+    and its responses and their responders, in one aggregate query
+    """
+    Responder = aliased(User)
+    row = db.session.query(
+        BloodRequest.updated_at, Hospital.updated_at, User.updated_at,
+        db.func.count(BloodRequestResponse.blood_requests_response_id),
+        db.func.max(BloodRequestResponse.updated_at), db.func.max(Responder.updated_at)
+    ).select_from(BloodRequest).join(Hospital).join(User, BloodRequest.user_id == User.user_id).outerjoin(
+        BloodRequestResponse, BloodRequestResponse.blood_request_id == BloodRequest.blood_request_id
+    ).outerjoin(
+        Responder, BloodRequestResponse.user_id == Responder.user_id
+    ).filter(BloodRequest.blood_request_id == request_id).group_by(
+        BloodRequest.updated_at, Hospital.updated_at, User.updated_at
+    ).first()
+    if row is None:
+        return None
+    return make_etag('blood_request', request_id, *row), None
+
 @blood_bp.route('/request/<int:request_id>', methods=['GET'])
 @jwt_required()
+@conditional(_blood_request_version, private=True)
 def get_blood_request(request_id):
     try:
         request_obj = BloodRequest.query.filter(
             BloodRequest.blood_request_id == request_id
-        ).join(User).join(Hospital).join(LookupBloodGroup).first()
+        ).join(User).join(Hospital).join(LookupBloodGroup).options(
+            *query_profiles.BLOOD_REQUEST_DETAIL
+        ).first()
         
         if not request_obj:
             return jsonify({'error': 'Blood request not found'}), 404
@@ -232,7 +397,7 @@ def get_blood_request(request_id):
         # Get responses for this request
         responses = BloodRequestResponse.query.filter(
             BloodRequestResponse.blood_request_id == request_id
-        ).join(User).all()
+        ).join(User).options(*query_profiles.RESPONSE_WITH_RESPONDER).all()
         
         for response in responses:
             result['responses'].append({
@@ -349,35 +514,22 @@ def respond_to_blood_request(request_id):
         if request_obj.user_id == current_user_id:
             return jsonify({'error': 'Cannot respond to your own request'}), 400
         
-        # Check if user already responded
-        existing_response = BloodRequestResponse.query.filter(
-            and_(
-                BloodRequestResponse.blood_request_id == request_id,
-                BloodRequestResponse.user_id == current_user_id
-            )
-        ).first()
-        
-        if existing_response:
-            return jsonify({'error': 'You have already responded to this request'}), 400
-        
-        # Create response with all required fields
-        response = BloodRequestResponse(
-            blood_request_id=request_id,
-            user_id=current_user_id,
+        # Insert the response; the unique (request, user) index rejects a second one
+        response, created = upsert_response(
+            request_id, current_user_id,
             response_status=validated_data['response_status'],
-            message=validated_data.get('message'),
-            from_date=date.today(),
-            responded_date=date.today(),
-            to_date=None,  # Will be set when response is completed/cancelled
-            created_at=datetime.now(),
-            updated_at=datetime.now()
+            message=validated_data.get('message')
         )
-        
-        db.session.add(response)
+        if not created:
+            db.session.rollback()
+            return jsonify({'error': 'You have already responded to this request'}), 400
+        # Read before commit expires the instance
+        response_id = response.blood_requests_response_id
         
         # Update request status based on response
         if validated_data['response_status'] == 'accepted':
             request_obj.status = 'accepted'
+            notify_response_accepted(request_obj)
         elif validated_data['response_status'] == 'declined':
             # Keep request as pending if declined, so others can still respond
             pass
@@ -386,8 +538,8 @@ def respond_to_blood_request(request_id):
         
         return jsonify({
             'message': 'Response submitted successfully',
-            'response_id': response.blood_requests_response_id,
-            'response_status': response.response_status,
+            'response_id': response_id,
+            'response_status': validated_data['response_status'],
             'blood_request_id': request_id
         }), 201
         
@@ -404,20 +556,9 @@ def get_my_blood_requests():
         
         requests = BloodRequest.query.filter(
             BloodRequest.user_id == current_user_id
-        ).join(Hospital).join(LookupBloodGroup).all()
+        ).join(Hospital).join(LookupBloodGroup).options(*query_profiles.BLOOD_REQUEST_SUMMARY).all()
         
-        result = []
-        for req in requests:
-            result.append({
-                'blood_request_id': req.blood_request_id,
-                'hospital_name': req.hospital.hospital_name,
-                'blood_group_name': req.blood_group.blood_group_name,
-                'no_of_units': req.no_of_units,
-                'patient_name': req.patient_name,
-                'required_by_date': req.required_by_date.isoformat() if req.required_by_date else None,
-                'status': req.status,
-                'created_at': req.created_at.isoformat() if req.created_at else None
-            })
+        result = serializers.BLOOD_REQUEST_SUMMARY.many(requests)
         
         return jsonify(result), 200
         
@@ -434,31 +575,11 @@ def get_my_responses():
         # Get all responses by the current user
         responses = BloodRequestResponse.query.filter(
             BloodRequestResponse.user_id == current_user_id
-        ).join(BloodRequest).join(Hospital).join(LookupBloodGroup).all()
+        ).join(BloodRequest).join(Hospital).join(LookupBloodGroup).options(
+            *query_profiles.RESPONSE_WITH_REQUEST
+        ).all()
         
-        result = []
-        for response in responses:
-            result.append({
-                'blood_requests_response_id': response.blood_requests_response_id,
-                'blood_request_id': response.blood_request_id,
-                'response_status': response.response_status,
-                'message': response.message,
-                'from_date': response.from_date.isoformat() if response.from_date else None,
-                'responded_date': response.responded_date.isoformat() if response.responded_date else None,
-                'to_date': response.to_date.isoformat() if response.to_date else None,
-                'created_at': response.created_at.isoformat() if response.created_at else None,
-                'updated_at': response.updated_at.isoformat() if response.updated_at else None,
-                # Blood request details
-                'blood_request': {
-                    'hospital_name': response.blood_request.hospital.hospital_name,
-                    'blood_group_name': response.blood_request.blood_group.blood_group_name,
-                    'no_of_units': response.blood_request.no_of_units,
-                    'patient_name': response.blood_request.patient_name,
-                    'required_by_date': response.blood_request.required_by_date.isoformat() if response.blood_request.required_by_date else None,
-                    'status': response.blood_request.status,
-                    'description': response.blood_request.description
-                }
-            })
+        result = serializers.RESPONSE_WITH_REQUEST.many(responses)
         
         return jsonify({
             'total_responses': len(result),
@@ -470,16 +591,13 @@ def get_my_responses():
 
 # Get available blood groups
 @blood_bp.route('/blood-groups', methods=['GET'])
+@read_only
 def get_blood_groups():
     try:
-        blood_groups = LookupBloodGroup.query.all()
-        result = [
-            {
-                'blood_group_id': bg.blood_group_id,
-                'blood_group_name': bg.blood_group_name
-            } for bg in blood_groups
-        ]
-        return jsonify(result), 200
+        body, etag = get_lookup_cache().blood_groups_json()
+        response = current_app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        return response.make_conditional(request)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -496,7 +614,7 @@ def get_blood_request_responses(request_id):
         # Get all responses for this request
         responses = BloodRequestResponse.query.filter(
             BloodRequestResponse.blood_request_id == request_id
-        ).join(User).all()
+        ).join(User).options(*query_profiles.RESPONSE_WITH_RESPONDER).all()
         
         result = []
         for response in responses:
@@ -523,6 +641,41 @@ def get_blood_request_responses(request_id):
     except Exception as e:
         return jsonify({'error': f'Failed to get responses: {str(e)}'}), 500
 
+# Get ranked candidate donors for a blood request
+@blood_bp.route('/request/<int:request_id>/candidates', methods=['GET'])
+@jwt_required()
+def get_blood_request_candidates(request_id):
+    try:
+        current_user_id = get_jwt_identity()
+        
+        request_obj = BloodRequest.query.get(request_id)
+        if not request_obj:
+            return jsonify({'error': 'Blood request not found'}), 404
+        
+        # Only the requester or an admin of the request's hospital may see donors
+        if str(request_obj.user_id) != str(current_user_id):
+            admin_lineage = UserHospitalAdminLineage.query.filter_by(
+                user_id=current_user_id,
+                hospital_id=request_obj.hospital_id
+            ).first()
+            if not admin_lineage:
+                return jsonify({'error': 'Unauthorized to view candidates for this request'}), 403
+        
+        try:
+            limit = max(1, min(int(request.args.get('limit', 50)), 200))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        
+        candidates = find_candidates(request_obj, limit=limit)
+        return jsonify({
+            'blood_request_id': request_id,
+            'total_candidates': len(candidates),
+            'candidates': candidates
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to get candidates: {str(e)}'}), 500
+
 @blood_bp.route('/donation', methods=['POST'])
 @jwt_required()
 def create_donation():
@@ -590,44 +743,40 @@ def schedule_donation():
         if blood_request.user_id == current_user_id:
             return jsonify({'error': 'Cannot respond to your own request'}), 400
         
-        # Check if user has already responded to this request
-        existing_response = BloodRequestResponse.query.filter_by(
-            blood_request_id=request_id,
-            user_id=current_user_id
-        ).first()
+        try:
+            if isinstance(scheduled_datetime, str):
+                scheduled_datetime = datetime.fromisoformat(scheduled_datetime.replace('Z', '+00:00'))
+        except ValueError:
+            return jsonify({'error': f'Invalid scheduled_datetime format: {scheduled_datetime}'}), 400
         
-        if existing_response:
-            # Update existing response
-            existing_response.scheduled_datetime = scheduled_datetime
-            existing_response.message = message
-            existing_response.response_status = 'scheduled'
-            existing_response.updated_date = datetime.now()
-            db.session.commit()
-            
-            return jsonify({
-                'message': 'Donation schedule updated successfully',
-                'response_id': existing_response.blood_requests_response_id
-            }), 200
-        else:
-            # Create new response
-            response = BloodRequestResponse(
-                blood_request_id=request_id,
-                user_id=current_user_id,
-                response_status='scheduled',
-                scheduled_datetime=scheduled_datetime,
-                message=message,
-                from_date=date.today(),
-                created_date=datetime.now(),
-                updated_date=datetime.now()
-            )
-            
-            db.session.add(response)
-            db.session.commit()
-            
+        # A reschedule is not another scheduled donation for the rollups
+        already_scheduled = db.session.query(BloodRequestResponse.scheduled_datetime).filter_by(
+            blood_request_id=request_id, user_id=int(current_user_id)
+        ).scalar() is not None
+
+        # Create the response, or reschedule the one the user already made
+        response, created = upsert_response(
+            request_id, current_user_id,
+            update=('scheduled_datetime', 'message', 'response_status'),
+            response_status='scheduled',
+            scheduled_datetime=scheduled_datetime,
+            message=message
+        )
+        response_id = response.blood_requests_response_id
+        if not already_scheduled:
+            record_donation_scheduled(db.session(), blood_request)
+        notify_donation_scheduled(blood_request, scheduled_datetime)
+        db.session.commit()
+        
+        if created:
             return jsonify({
                 'message': 'Donation scheduled successfully',
-                'response_id': response.blood_requests_response_id
+                'response_id': response_id
             }), 201
+        return jsonify({
+            'message': 'Donation schedule updated successfully',
+            'response_id': response_id
+        }), 200
             
     except Exception as e:
         db.session.rollback()
@@ -642,32 +791,10 @@ def get_my_scheduled_donations():
         responses = BloodRequestResponse.query.filter(
             BloodRequestResponse.user_id == current_user_id,
             BloodRequestResponse.scheduled_datetime != None
-        ).join(BloodRequest).join(Hospital).join(LookupBloodGroup).all()
-        result = []
-        for response in responses:
-            req = response.blood_request
-            result.append({
-                'blood_requests_response_id': response.blood_requests_response_id,
-                'blood_request_id': response.blood_request_id,
-                'scheduled_datetime': response.scheduled_datetime.isoformat() if response.scheduled_datetime else None,
-                'response_status': response.response_status,
-                'message': response.message,
-                'from_date': response.from_date.isoformat() if response.from_date else None,
-                'responded_date': response.responded_date.isoformat() if response.responded_date else None,
-                'to_date': response.to_date.isoformat() if response.to_date else None,
-                'created_at': response.created_at.isoformat() if response.created_at else None,
-                'updated_at': response.updated_at.isoformat() if response.updated_at else None,
-                # Blood request details
-                'blood_request': {
-                    'hospital_name': req.hospital.hospital_name if req.hospital else None,
-                    'blood_group_name': req.blood_group.blood_group_name if req.blood_group else None,
-                    'no_of_units': req.no_of_units,
-                    'patient_name': req.patient_name,
-                    'required_by_date': req.required_by_date.isoformat() if req.required_by_date else None,
-                    'status': req.status,
-                    'description': req.description
-                }
-            })
+        ).join(BloodRequest).join(Hospital).join(LookupBloodGroup).options(
+            *query_profiles.RESPONSE_WITH_REQUEST
+        ).all()
+        result = serializers.SCHEDULED_DONATION.many(responses)
         return jsonify({'total_donations': len(result), 'donations': result}), 200
     except Exception as e:
         return jsonify({'error': f'Failed to get scheduled donations: {str(e)}'}), 500
@@ -714,39 +841,9 @@ def get_all_donations():
         ).join(
             User, 
             BloodRequestResponse.user_id == User.user_id
-        ).all()
+        ).options(*query_profiles.DONATION_LIST).all()
         
-        result = []
-        for response in responses:
-            req = response.blood_request
-            result.append({
-                'blood_requests_response_id': response.blood_requests_response_id,
-                'blood_request_id': response.blood_request_id,
-                'scheduled_datetime': response.scheduled_datetime.isoformat() if response.scheduled_datetime else None,
-                'response_status': response.response_status,
-                'message': response.message,
-                'from_date': response.from_date.isoformat() if response.from_date else None,
-                'to_date': response.to_date.isoformat() if response.to_date else None,
-                'created_at': response.created_at.isoformat() if response.created_at else None,
-                'updated_at': response.updated_at.isoformat() if response.updated_at else None,
-                # Blood request details
-                'patient_name': req.patient_name,
-                'no_of_units': req.no_of_units,
-                'required_by_date': req.required_by_date.isoformat() if req.required_by_date else None,
-                'description': req.description,
-                'blood_request_status': req.status,
-                # Hospital details
-                'hospital_id': req.hospital_id,
-                'hospital_name': req.hospital.hospital_name,
-                # Blood group details
-                'blood_group_type': req.blood_group_type,
-                'blood_group_name': req.blood_group.blood_group_name,
-                # Donor details
-                'donor_id': response.user_id,
-                'donor_name': response.user.user_name,
-                'donor_email': response.user.emailaddress,
-                'donor_phone': response.user.phonenumber
-            })
+        result = serializers.DONATION_LIST.many(responses)
         
         # Return just the array directly to match frontend expectations
         return jsonify(result), 200
@@ -754,12 +851,6 @@ def get_all_donations():
     except Exception as e:
         return jsonify({'error': f'Failed to get donations: {str(e)}'}), 500
 
-def send_email_notification(to_email, subject, body):
-    # Placeholder for sending email
-    current_app.logger.info(f"Sending email to {to_email}: {subject}\n{body}")
-    # Implement actual email logic here
-    pass
-
 # POST /blood-response: Create a blood donation response
 @blood_bp.route('/blood-response', methods=['POST'])
 @jwt_required()
@@ -791,45 +882,45 @@ def create_blood_response():
                 return jsonify({'error': 'user_id does not match authenticated user'}), 403
 
         blood_request_id = data['blood_request_id']
-        # Prevent duplicate responses
-        existing = BloodRequestResponse.query.filter_by(blood_request_id=blood_request_id, user_id=user_id).first()
-        if existing:
-            return jsonify({'error': 'You have already responded to this request'}), 400
-
         # Validate blood_request exists
         blood_request = BloodRequest.query.get(blood_request_id)
         if not blood_request:
             return jsonify({'error': 'Blood request not found'}), 404
 
         # Prepare fields
-        message = data.get('message')
-        from_date = data['from_date']
-        scheduled_datetime = data.get('scheduled_datetime')
-        now = datetime.now()
-        response = BloodRequestResponse(
-            blood_request_id=blood_request_id,
-            user_id=user_id,
+        try:
+            from_date = data['from_date']
+            if isinstance(from_date, str):
+                from_date = date.fromisoformat(from_date[:10])
+            scheduled_datetime = data.get('scheduled_datetime')
+            if isinstance(scheduled_datetime, str):
+                scheduled_datetime = datetime.fromisoformat(scheduled_datetime.replace('Z', '+00:00'))
+        except ValueError:
+            return jsonify({'error': 'from_date and scheduled_datetime must be ISO 8601 dates'}), 400
+
+        # Insert the response; the unique (request, user) index rejects a second one
+        response, created = upsert_response(
+            blood_request_id, user_id,
             response_status=data['response_status'],
-            message=message,
+            message=data.get('message'),
             from_date=from_date,
-            responded_date=now,
-            scheduled_datetime=scheduled_datetime,
-            created_at=now,
-            updated_at=now
+            scheduled_datetime=scheduled_datetime
         )
-        db.session.add(response)
-        db.session.commit()
-
-        # Bonus: Send email if accepted
+        if not created:
+            db.session.rollback()
+            return jsonify({'error': 'You have already responded to this request'}), 400
+        response_id = response.blood_requests_response_id
+        if scheduled_datetime:
+            record_donation_scheduled(db.session(), blood_request)
+        # Queued with the response; the outbox worker delivers them
         if data['response_status'] == 'Accepted':
-            # Email hospital or user (placeholder logic)
             hospital_email = getattr(blood_request.hospital, 'hospital_email_id', None)
-            if hospital_email:
-                send_email_notification(hospital_email, 'Blood Donation Accepted', f"A donor has accepted your blood request (ID: {blood_request_id}).")
+            notify_response_accepted(blood_request, hospital_email)
+        db.session.commit()
 
         return jsonify({
             'message': 'Blood response created successfully',
-            'blood_requests_response_id': response.blood_requests_response_id
+            'blood_requests_response_id': response_id
         }), 201
     except Exception as e:
         db.session.rollback()
@@ -873,7 +964,9 @@ def get_hospital_blood_requests():
         if not admin_lineage:
             return jsonify({'error': 'Hospital not found for current user'}), 404
 
-        requests = BloodRequest.query.filter_by(hospital_id=admin_lineage.hospital_id).all()
+        requests = BloodRequest.query.filter_by(hospital_id=admin_lineage.hospital_id).options(
+            *query_profiles.HOSPITAL_BLOOD_REQUESTS
+        ).all()
         result = [{
             "blood_request_id": req.blood_request_id,
             "patient_name": req.patient_name,
@@ -0,0 +1,25 @@
+import os
+from flask import Blueprint, jsonify
+from sqlalchemy import text
+from models import db
+from app.utils.db_pool import all_pool_stats
+import logging
+
+health_bp = Blueprint('health', __name__)
+
+logger = logging.getLogger(__name__)
+
+@health_bp.route('', methods=['GET'])
+def health():
+    """Liveness plus a round trip to the primary database"""
+    try:
+        db.session.execute(text('SELECT 1'))
+        return jsonify({'status': 'ok', 'database': 'ok'}), 200
+    except Exception:
+        logger.exception("Database health check failed")
+        return jsonify({'status': 'error', 'database': 'unavailable'}), 503
+
+@health_bp.route('/pool', methods=['GET'])
+def pool():
+    """Connection pool occupancy for each engine in this worker"""
+    return jsonify({'pid': os.getpid(), 'pools': all_pool_stats()}), 200
@@ -1,13 +1,23 @@
-print("[DEBUG] app/routes/hospital_routes.py loaded")
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, Hospital, HospitalBloodAvailability, LookupBloodGroup, UserHospitalAdminLineage, BloodRequest
+from models import db, Hospital, HospitalBloodAvailability, LookupBloodGroup, UserHospitalAdminLineage
 from app.schemas.hospital_schemas import HospitalSchema
+from app.controllers.blood_availability import bulk_update_availability, row_hospital_ids
+from app.utils.auth_utils import ROLE_IDS, get_current_principal
+from app.utils.geo_index import get_hospital_index
+from app.utils.hospital_stats import get_hospital_stats_cache
+from app.utils import query_profiles
+from app.utils.lookup_cache import get_lookup_cache
+from app.utils.db_routing import read_only
+from app.utils.conditional import conditional, make_etag
 from marshmallow import ValidationError
 from datetime import datetime, date
+import logging
 
 hospital_bp = Blueprint('hospital', __name__)
 
+logger = logging.getLogger(__name__)
+
 # Initialize schema
 hospital_schema = HospitalSchema()
 
@@ -39,6 +49,9 @@ def register_hospital():
             hospital_name=validated_data['hospital_name'],
             from_date=date.today(),
             hospital_address=validated_data.get('hospital_address'),
+            hospital_address_lat=validated_data.get('hospital_address_lat'),
+            hospital_address_long=validated_data.get('hospital_address_long'),
+            hospital_gmap_link=validated_data.get('hospital_gmap_link'),
             hospital_contact_number=validated_data.get('hospital_contact_number'),
             hospital_email_id=validated_data.get('hospital_email_id'),
             hospital_contact_person=validated_data.get('hospital_contact_person'),
@@ -50,6 +63,13 @@ def register_hospital():
         db.session.add(new_hospital)
         db.session.commit()
         
+        # Keep this worker's nearby-search index in step with the new row
+        get_hospital_index().add(
+            new_hospital.hospital_id,
+            new_hospital.hospital_address_lat,
+            new_hospital.hospital_address_long
+        )
+        
         return jsonify({
             'message': 'Hospital registered successfully',
             'hospital_id': new_hospital.hospital_id
@@ -59,18 +79,21 @@ def register_hospital():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def _hospital_list_version():
+    """Validator for /list: any insert, update or delete moves one of these"""
+    count, last_updated, last_id = db.session.query(
+        db.func.count(Hospital.hospital_id), db.func.max(Hospital.updated_at), db.func.max(Hospital.hospital_id)
+    ).one()
+    return make_etag('hospitals', count, last_updated, last_id), None
+
 @hospital_bp.route('/list', methods=['GET'])
+@read_only
+@conditional(_hospital_list_version)
 def list_hospitals():
-    print("[DEBUG] /hospital/list endpoint called")
     try:
         hospitals = Hospital.query.all()
         result = []
-        print("[DEBUG] Hospitals type:", type(hospitals))
-        for i, hospital in enumerate(hospitals):
-            print(f"[DEBUG] Index {i}: type={type(hospital)}, value={hospital}")
-            if isinstance(hospital, list):
-                print(f"[DEBUG] Skipping list at index {i}: {hospital}")
-                continue
+        for hospital in hospitals:
             try:
                 result.append({
                     'hospital_id': hospital.hospital_id,
@@ -85,16 +108,24 @@ def list_hospitals():
                     'from_date': hospital.from_date.isoformat() if hospital.from_date else None,
                     'to_date': hospital.to_date.isoformat() if hospital.to_date else None
                 })
-            except Exception as inner_e:
-                print(f"[DEBUG] Error serializing hospital at index {i}: {inner_e}")
+            except Exception:
+                logger.warning("Could not serialize hospital %s", hospital.hospital_id, exc_info=True)
                 continue
-        print(f"[DEBUG] Returning {len(result)} hospitals")
+        logger.debug("Returning %d hospitals", len(result))
         return jsonify(result), 200
     except Exception as e:
-        print(f"[DEBUG] Exception in /hospital/list: {e}")
+        logger.exception("Failed to list hospitals")
         return jsonify({'error': str(e)}), 500
 
+def _hospital_version(hospital_id):
+    """Validator for /<id>; the view's lookup then comes from the identity map"""
+    hospital = db.session.get(Hospital, hospital_id)
+    if hospital is None:
+        return None
+    return make_etag('hospital', hospital_id, hospital.updated_at), hospital.updated_at
+
 @hospital_bp.route('/<int:hospital_id>', methods=['GET'])
+@conditional(_hospital_version)
 def get_hospital(hospital_id):
     try:
         hospital = Hospital.query.get(hospital_id)
@@ -140,7 +171,7 @@ def update_blood_availability():
             return jsonify({'error': 'Hospital not found'}), 404
         
         # Validate blood group exists
-        blood_group = LookupBloodGroup.query.get(data['blood_group_id'])
+        blood_group = get_lookup_cache().blood_group(data['blood_group_id'])
         if not blood_group:
             return jsonify({'error': 'Blood group not found'}), 404
         
@@ -171,7 +202,76 @@ def update_blood_availability():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@hospital_bp.route('/availability/bulk', methods=['POST'])
+@jwt_required()
+def bulk_update_blood_availability():
+    """
+    Set units for many (hospital_id, blood_group_id) pairs in one transaction.
+
+    Body: {"rows": [{"hospital_id", "blood_group_id", "no_of_units"}, ...]} or
+    the bare list; a top-level "hospital_id" fills rows that omit it.
+    Valid rows are applied and every row gets a result. Super admins may
+    write any hospital, hospital admins only hospitals they administer.
+    """
+    try:
+        principal = get_current_principal()
+        if principal is None:
+            return jsonify({'error': 'User not found'}), 404
+        if principal.user_role_id not in (ROLE_IDS['super_admin'], ROLE_IDS['hospital_admin']):
+            return jsonify({'error': 'Hospital admin access required'}), 403
+
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        rows = data.get('rows') if isinstance(data, dict) else data
+        if not isinstance(rows, list) or not rows:
+            return jsonify({'error': 'rows must be a non-empty list'}), 400
+        max_rows = current_app.config.get('AVAILABILITY_BULK_MAX_ROWS', 500)
+        if len(rows) > max_rows:
+            return jsonify({'error': f'At most {max_rows} rows per request'}), 413
+
+        default_hospital_id = data.get('hospital_id') if isinstance(data, dict) else None
+        if principal.user_role_id != ROLE_IDS['super_admin']:
+            foreign = row_hospital_ids(rows, default_hospital_id) - set(principal.hospital_ids)
+            if foreign:
+                return jsonify({'error': 'You do not administer every hospital in this request',
+                                'hospital_ids': sorted(foreign)}), 403
+        results = bulk_update_availability(rows, default_hospital_id)
+        db.session.commit()
+
+        applied = sum(1 for result in results if result['status'] != 'error')
+        logger.info("Bulk availability update", extra={'rows': len(rows), 'applied': applied})
+        return jsonify({
+            'applied': applied,
+            'failed': len(results) - applied,
+            'results': results
+        }), 200 if applied else 400
+
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("Bulk availability update failed")
+        return jsonify({'error': str(e)}), 500
+
+def _availability_version():
+    """Validator for /availability from per-hospital aggregates of the availability rows"""
+    try:
+        hospital_id = int(request.args.get('hospital_id'))
+    except (TypeError, ValueError):
+        return None
+    # No row when the hospital does not exist, so the view can answer 404
+    row = db.session.query(
+        db.func.count(HospitalBloodAvailability.blood_group_id), db.func.max(HospitalBloodAvailability.updated_at),
+        db.func.sum(HospitalBloodAvailability.no_of_units), db.func.count(HospitalBloodAvailability.to_date)
+    ).select_from(Hospital).outerjoin(
+        HospitalBloodAvailability, HospitalBloodAvailability.hospital_id == Hospital.hospital_id
+    ).filter(Hospital.hospital_id == hospital_id).group_by(Hospital.hospital_id).first()
+    if row is None:
+        return None
+    return make_etag('availability', hospital_id, *row), None
+
 @hospital_bp.route('/availability', methods=['GET'])
+@read_only
+@conditional(_availability_version)
 def get_availability():
     try:
         hospital_id = request.args.get('hospital_id')
@@ -186,7 +286,7 @@ def get_availability():
         
         availabilities = HospitalBloodAvailability.query.filter_by(
             hospital_id=hospital_id
-        ).join(LookupBloodGroup).all()
+        ).join(LookupBloodGroup).options(*query_profiles.HOSPITAL_AVAILABILITY).all()
         
         result = []
         for availability in availabilities:
@@ -204,6 +304,7 @@ def get_availability():
         return jsonify({'error': str(e)}), 500
 
 @hospital_bp.route('/search', methods=['GET'])
+@read_only
 def search_hospitals():
     try:
         # Get search parameters
@@ -243,6 +344,58 @@ def search_hospitals():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@hospital_bp.route('/nearby', methods=['GET'])
+def nearby_hospitals():
+    try:
+        try:
+            lat = float(request.args['lat'])
+            lng = float(request.args['lng'])
+        except (KeyError, ValueError):
+            return jsonify({'error': 'lat and lng query parameters are required and must be numbers'}), 400
+        if not -90 <= lat <= 90 or not -180 <= lng <= 180:
+            return jsonify({'error': 'lat must be within [-90, 90] and lng within [-180, 180]'}), 400
+        
+        try:
+            radius_km = request.args.get('radius_km', type=float)
+            limit = int(request.args.get('limit', 10))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        if radius_km is not None and radius_km <= 0:
+            return jsonify({'error': 'radius_km must be positive'}), 400
+        limit = max(1, min(limit, 100))
+        
+        matches = get_hospital_index().nearest(lat, lng, limit=limit, radius_km=radius_km)
+        if not matches:
+            return jsonify([]), 200
+        
+        # One primary-key lookup for the matched rows, re-ordered by distance
+        hospitals = Hospital.query.filter(
+            Hospital.hospital_id.in_([hospital_id for hospital_id, _ in matches])
+        ).all()
+        hospitals_by_id = {hospital.hospital_id: hospital for hospital in hospitals}
+        
+        result = []
+        for hospital_id, distance in matches:
+            hospital = hospitals_by_id.get(hospital_id)
+            if not hospital:
+                continue
+            result.append({
+                'hospital_id': hospital.hospital_id,
+                'hospital_name': hospital.hospital_name,
+                'hospital_address': hospital.hospital_address,
+                'hospital_address_lat': hospital.hospital_address_lat,
+                'hospital_address_long': hospital.hospital_address_long,
+                'hospital_contact_number': hospital.hospital_contact_number,
+                'hospital_pincode': hospital.hospital_pincode,
+                'has_blood_bank': hospital.has_blood_bank,
+                'distance_km': round(distance, 3)
+            })
+        
+        return jsonify(result), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @hospital_bp.route('/stats', methods=['GET'])
 @jwt_required()
 def get_hospital_stats():
@@ -255,18 +408,6 @@ def get_hospital_stats():
         if not admin_lineage:
             return jsonify({'error': 'Hospital not found for current user'}), 404
 
-        # Dummy values for unitsAvailable and critical (replace with real queries if available)
-        units_available = 120
-        critical = 2
-        # Count active and fulfilled requests for this hospital
-        active_requests = BloodRequest.query.filter_by(hospital_id=admin_lineage.hospital_id, status='pending').count()
-        fulfilled = BloodRequest.query.filter_by(hospital_id=admin_lineage.hospital_id, status='completed').count()
-
-        return jsonify({
-            "unitsAvailable": units_available,
-            "activeRequests": active_requests,
-            "fulfilled": fulfilled,
-            "critical": critical
-        }), 200
+        return jsonify(get_hospital_stats_cache().stats(admin_lineage.hospital_id)), 200
     except Exception as e:
         return jsonify({'error': f'Failed to get hospital stats: {str(e)}'}), 500
\ No newline at end of file
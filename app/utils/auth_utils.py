@@ -1,7 +1,145 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
 from functools import wraps
-from flask import request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
-from models.user import User
+from flask import request, jsonify, g, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt, verify_jwt_in_request
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from db import RoutingSession
+from models import db
+from models.user import User, UserHospitalAdminLineage
+
+# What authorization checks need to know about a user
+AuthPrincipal = namedtuple('AuthPrincipal', ['user_id', 'user_role_id', 'hospital_ids'])
+
+ROLE_IDS = {
+    "super_admin": 1,
+    "hospital_admin": 2,
+    "donor": 3
+}
+
+ROLE_ERRORS = {
+    "super_admin": "Super admin access required",
+    "hospital_admin": "Hospital admin access required",
+    "donor": "Donor access required"
+}
+
+class PrincipalCache:
+    """Bounded LRU of AuthPrincipal by user id, with a per-entry TTL"""
+
+    def __init__(self, max_size=10000, ttl_seconds=300):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return principal
+
+    def put(self, principal):
+        with self._lock:
+            self._entries[principal.user_id] = (principal, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(principal.user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def evict(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+principal_cache = PrincipalCache()
+
+# Users written during a flush wait in session.info under this key and are
+# evicted only once the transaction commits; evicting at flush time let a
+# concurrent request re-cache the old row before the commit landed.
+_PENDING_KEY = 'principal_cache_evictions'
+
+def _note_user_write(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(target.user_id)
+
+for _model in (User, UserHospitalAdminLineage):
+    for _event_name in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(_model, _event_name, _note_user_write)
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _evict_committed(session):
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        principal_cache.evict(user_id)
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _discard_rolled_back(session):
+    session.info.pop(_PENDING_KEY, None)
+
+def init_app(app):
+    """Apply cache sizing from config"""
+    principal_cache.max_size = app.config.get('AUTH_CACHE_SIZE', 10000)
+    principal_cache.ttl_seconds = app.config.get('AUTH_CACHE_TTL', 300)
+
+def role_claims(user):
+    """
+    Additional JWT claims carrying the user's role and admin hospitals, or an
+    empty dict unless AUTH_EMBED_ROLE_CLAIMS is enabled.
+    """
+    if not current_app.config.get('AUTH_EMBED_ROLE_CLAIMS'):
+        return {}
+    hospital_ids = [
+        row.hospital_id for row in db.session.query(UserHospitalAdminLineage.hospital_id).filter_by(user_id=user.user_id)
+    ]
+    return {'role_id': user.user_role_id, 'hospital_ids': hospital_ids}
+
+def _load_principal(user_id):
+    row = db.session.query(User.user_id, User.user_role_id).filter(User.user_id == user_id).first()
+    if row is None:
+        return None
+    hospital_ids = tuple(
+        lineage.hospital_id
+        for lineage in db.session.query(UserHospitalAdminLineage.hospital_id).filter_by(user_id=user_id)
+    )
+    return AuthPrincipal(row.user_id, row.user_role_id, hospital_ids)
+
+def get_current_principal():
+    """
+    Get the role and hospital lineage of the authenticated user.
+
+    Resolution order: memo on ``g`` for this request, role claims embedded
+    in the token, the process-wide principal cache, then the database.
+    Returns None if there is no identity or the user does not exist.
+    """
+    if 'auth_principal' in g:
+        return g.auth_principal
+
+    principal = None
+    identity = get_jwt_identity()
+    if identity is not None:
+        user_id = int(identity)
+        claims = get_jwt()
+        if 'role_id' in claims:
+            principal = AuthPrincipal(user_id, claims['role_id'], tuple(claims.get('hospital_ids', ())))
+        else:
+            principal = principal_cache.get(user_id)
+            if principal is None:
+                principal = _load_principal(user_id)
+                if principal is not None:
+                    principal_cache.put(principal)
+
+    g.auth_principal = principal
+    return principal
 
 def require_auth(f):
     """Decorator to require authentication"""
@@ -24,48 +162,42 @@ def require_role(required_role):
         def decorated_function(*args, **kwargs):
             try:
                 verify_jwt_in_request()
-                current_user_id = get_jwt_identity()
-                user = User.query.get(current_user_id)
-                
-                if not user:
-                    return jsonify({
-                        "status": "error",
-                        "message": "User not found"
-                    }), 404
-                
-                # Check role based on role_id
-                if required_role == "super_admin" and user.user_role_id != 1:
-                    return jsonify({
-                        "status": "error",
-                        "message": "Super admin access required"
-                    }), 403
-                elif required_role == "hospital_admin" and user.user_role_id != 2:
-                    return jsonify({
-                        "status": "error",
-                        "message": "Hospital admin access required"
-                    }), 403
-                elif required_role == "donor" and user.user_role_id != 3:
-                    return jsonify({
-                        "status": "error",
-                        "message": "Donor access required"
-                    }), 403
-                
-                return f(*args, **kwargs)
+                principal = get_current_principal()
             except Exception as e:
                 return jsonify({
                     "status": "error",
                     "message": "Authentication required"
                 }), 401
+
+            if not principal:
+                return jsonify({
+                    "status": "error",
+                    "message": "User not found"
+                }), 404
+
+            # Check role based on role_id
+            required_role_id = ROLE_IDS.get(required_role)
+            if required_role_id is not None and principal.user_role_id != required_role_id:
+                return jsonify({
+                    "status": "error",
+                    "message": ROLE_ERRORS[required_role]
+                }), 403
+
+            return f(*args, **kwargs)
         return decorated_function
     return decorator
 
 def get_current_user():
     """Get current authenticated user"""
+    if 'current_user' in g:
+        return g.current_user
     try:
         current_user_id = get_jwt_identity()
-        return User.query.get(current_user_id)
+        user = db.session.get(User, int(current_user_id)) if current_user_id is not None else None
     except:
         return None
+    g.current_user = user
+    return user
 
 def is_hospital_admin(user):
     """Check if user is hospital admin"""
@@ -77,4 +209,4 @@ def is_super_admin(user):
 
 def is_donor(user):
     """Check if user is donor"""
-    return user and user.user_role_id == 3 
\ No newline at end of file
+    return user and user.user_role_id == 3
@@ -0,0 +1,60 @@
+"""
+Conditional GET for read endpoints.
+
+``conditional(validator)`` runs a cheap validator query before the view:
+aggregates such as row counts and max(updated_at), never the response
+body. When the client's If-None-Match (or, for validators with an exact
+timestamp, If-Modified-Since) still matches, a 304 is returned without
+calling the view at all.
+
+Validators are computed before the body, so a write landing in between
+gives a body newer than its ETag. That only costs the client one extra
+full response later, never a stale 304.
+"""
+import hashlib
+from functools import wraps
+from flask import current_app, request
+
+def make_etag(*parts):
+    """Weak-ETag value for the validator ``parts``"""
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        # HTTP dates have whole-second resolution
+        return last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+    return False
+
+def conditional(validator, private=False):
+    """
+    Serve the decorated GET view conditionally. ``validator`` takes the
+    view's arguments and returns ``(etag, last_modified)``, with
+    last_modified None when a timestamp alone cannot tell every change
+    (for example a deleted row); returning None skips the check, e.g. so
+    the view can answer 404.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            validators = validator(*args, **kwargs)
+            if validators is None:
+                return view(*args, **kwargs)
+            etag, last_modified = validators
+            if _not_modified(etag, last_modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            # Clients keep the body but must revalidate before reusing it
+            response.cache_control.no_cache = True
+            if private:
+                response.cache_control.private = True
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,43 @@
+import os
+import weakref
+from sqlalchemy.pool import QueuePool
+from models import db
+
+def pool_stats(engine):
+    """Current occupancy of ``engine``'s connection pool"""
+    pool = engine.pool
+    stats = {'pool_class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow(),
+            'max_overflow': pool._max_overflow,
+            'timeout': pool.timeout(),
+        })
+    else:
+        stats['status'] = pool.status()
+    return stats
+
+def all_pool_stats():
+    """Pool stats for every engine of the current app, keyed by bind name"""
+    return {bind or 'default': pool_stats(engine) for bind, engine in db.engines.items()}
+
+# Engines to reset in forked children; weak so test apps can be collected
+_engines = weakref.WeakSet()
+
+def _reset_pools_after_fork():
+    for engine in list(_engines):
+        engine.dispose(close=False)
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+def init_app(app):
+    """
+    Drop inherited pool connections in forked children, so gunicorn
+    workers started from a preloaded app never share a socket with the master.
+    """
+    with app.app_context():
+        _engines.update(db.engines.values())
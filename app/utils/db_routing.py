@@ -0,0 +1,50 @@
+import time
+from functools import wraps
+from flask import current_app, request
+from db import db, REPLICA_BIND
+
+# Set on responses to requests that wrote; while it is in the future the
+# client's read-only requests stay on the primary so they see their own writes.
+STICKY_COOKIE = 'db_primary_until'
+
+def _recently_wrote():
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+def read_only(f):
+    """
+    Route decorator: run the endpoint's queries against the read replica
+    when one is configured and the client has not written recently.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        session = db.session()
+        previous = session.info.get('use_replica', False)
+        session.info['use_replica'] = not _recently_wrote()
+        try:
+            return f(*args, **kwargs)
+        finally:
+            session.info['use_replica'] = previous
+    return decorated_function
+
+def replica_configured():
+    return REPLICA_BIND in db.engines
+
+def init_app(app):
+    """Track writes per request and pin writers to the primary for REPLICA_STICKY_SECONDS"""
+    sticky_seconds = app.config.get('REPLICA_STICKY_SECONDS', 5)
+
+    @app.before_request
+    def reset_write_flag():
+        db.session().info.pop('wrote', None)
+
+    @app.after_request
+    def pin_writers_to_primary(response):
+        if sticky_seconds and db.session().info.get('wrote') and replica_configured():
+            response.set_cookie(
+                STICKY_COOKIE, str(time.time() + sticky_seconds),
+                max_age=int(sticky_seconds) + 1, httponly=True, samesite='Lax'
+            )
+        return response
@@ -0,0 +1,164 @@
+import math
+import threading
+import time
+from flask import current_app
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points in kilometres"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+class HospitalGeoIndex:
+    """
+    In-memory grid index over hospital coordinates.
+
+    Points are bucketed into square lat/long cells of ``cell_size_deg``
+    degrees. Queries walk outwards ring by ring from the query cell and
+    stop as soon as no unvisited cell can hold a closer point, so a
+    lookup only touches the handful of cells around the query point.
+    """
+
+    def __init__(self, cell_size_deg=0.25, ttl_seconds=300):
+        self.cell_size_deg = cell_size_deg
+        self.ttl_seconds = ttl_seconds
+        self._cells = {}
+        self._points = {}
+        self._bounds = None
+        self._lock = threading.RLock()
+        self._built_at = None
+
+    def __len__(self):
+        return len(self._points)
+
+    def _cell_for(self, lat, lng):
+        return (int(math.floor(lat / self.cell_size_deg)), int(math.floor(lng / self.cell_size_deg)))
+
+    def _extend_bounds(self, cell):
+        if self._bounds is None:
+            self._bounds = [cell[0], cell[0], cell[1], cell[1]]
+            return
+        self._bounds[0] = min(self._bounds[0], cell[0])
+        self._bounds[1] = max(self._bounds[1], cell[0])
+        self._bounds[2] = min(self._bounds[2], cell[1])
+        self._bounds[3] = max(self._bounds[3], cell[1])
+
+    def is_stale(self):
+        """Check if the index was never built or has outlived its TTL"""
+        if self._built_at is None:
+            return True
+        return bool(self.ttl_seconds) and time.monotonic() - self._built_at > self.ttl_seconds
+
+    def build(self, rows):
+        """Replace the index contents with (hospital_id, lat, lng) rows"""
+        with self._lock:
+            self._cells = {}
+            self._points = {}
+            self._bounds = None
+            for hospital_id, lat, lng in rows:
+                self.add(hospital_id, lat, lng)
+            self._built_at = time.monotonic()
+
+    def add(self, hospital_id, lat, lng):
+        """Insert or move a single hospital"""
+        with self._lock:
+            self.remove(hospital_id)
+            if lat is None or lng is None:
+                return
+            cell = self._cell_for(lat, lng)
+            self._cells.setdefault(cell, {})[hospital_id] = (lat, lng)
+            self._points[hospital_id] = (lat, lng, cell)
+            self._extend_bounds(cell)
+
+    def remove(self, hospital_id):
+        """Drop a hospital from the index if present"""
+        with self._lock:
+            point = self._points.pop(hospital_id, None)
+            if point is None:
+                return
+            bucket = self._cells.get(point[2])
+            if bucket is not None:
+                bucket.pop(hospital_id, None)
+                if not bucket:
+                    del self._cells[point[2]]
+
+    def _ring(self, ci, cj, r):
+        if r == 0:
+            yield (ci, cj)
+            return
+        for dj in range(-r, r + 1):
+            yield (ci - r, cj + dj)
+            yield (ci + r, cj + dj)
+        for di in range(-r + 1, r):
+            yield (ci + di, cj - r)
+            yield (ci + di, cj + r)
+
+    def nearest(self, lat, lng, limit=10, radius_km=None):
+        """
+        Return up to ``limit`` (hospital_id, distance_km) pairs ordered by
+        distance, optionally restricted to ``radius_km``.
+        """
+        with self._lock:
+            if not self._cells:
+                return []
+            ci, cj = self._cell_for(lat, lng)
+            min_i, max_i, min_j, max_j = self._bounds
+            max_ring = max(abs(min_i - ci), abs(max_i - ci), abs(min_j - cj), abs(max_j - cj))
+            found = []
+            r = 0
+            while r <= max_ring:
+                for cell in self._ring(ci, cj, r):
+                    bucket = self._cells.get(cell)
+                    if not bucket:
+                        continue
+                    for hospital_id, (p_lat, p_lng) in bucket.items():
+                        distance = haversine_km(lat, lng, p_lat, p_lng)
+                        if radius_km is None or distance <= radius_km:
+                            found.append((distance, hospital_id))
+
+                # Anything outside ring r is at least r full cells away. Use the
+                # narrowest cell width reachable in that band, with some slack
+                # because great circles cut across parallels.
+                edge_lat = min(89.9, abs(lat) + (r + 1) * self.cell_size_deg)
+                reach_km = 0.9 * r * self.cell_size_deg * KM_PER_DEGREE * math.cos(math.radians(edge_lat))
+                if radius_km is not None and reach_km > radius_km:
+                    break
+                if len(found) >= limit:
+                    found.sort()
+                    if found[limit - 1][0] <= reach_km:
+                        break
+                r += 1
+
+            found.sort()
+            return [(hospital_id, distance) for distance, hospital_id in found[:limit]]
+
+def init_app(app):
+    """Attach an empty hospital index to the app; it is filled on first use"""
+    app.extensions['hospital_geo_index'] = HospitalGeoIndex(
+        cell_size_deg=app.config.get('HOSPITAL_INDEX_CELL_DEG', 0.25),
+        ttl_seconds=app.config.get('HOSPITAL_INDEX_TTL', 300),
+    )
+
+def get_hospital_index():
+    """Get the hospital index for the current app, (re)building it when stale"""
+    from models import db, Hospital
+
+    index = current_app.extensions['hospital_geo_index']
+    if index.is_stale():
+        rows = db.session.query(
+            Hospital.hospital_id,
+            Hospital.hospital_address_lat,
+            Hospital.hospital_address_long
+        ).filter(
+            Hospital.hospital_address_lat.isnot(None),
+            Hospital.hospital_address_long.isnot(None),
+            Hospital.to_date.is_(None)
+        ).all()
+        index.build(rows)
+    return index
@@ -0,0 +1,190 @@
+import threading
+import time
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import object_session
+from db import RoutingSession
+from models import db, BloodRequest, HospitalBloodAvailability
+
+# Changes seen during a flush wait in session.info under this key and are
+# applied to the cache only once the transaction commits.
+_PENDING_KEY = 'hospital_stats_changes'
+
+def _pending(session):
+    return session.info.setdefault(_PENDING_KEY, [])
+
+def note_units(session, hospital_id, blood_group_id, units):
+    """
+    Record that a hospital now holds ``units`` of a blood group (None when
+    the row is gone or closed). Writers that bypass the ORM, such as the
+    bulk availability upsert, call this themselves.
+    """
+    _pending(session).append(('units', hospital_id, blood_group_id, units))
+
+def _note_request(session, hospital_id, status, delta):
+    _pending(session).append(('requests', hospital_id, status, delta))
+
+def _availability_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        units = target.no_of_units if target.to_date is None else None
+        note_units(session, target.hospital_id, target.blood_group_id, units)
+
+def _availability_deleted(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        note_units(session, target.hospital_id, target.blood_group_id, None)
+
+def _request_inserted(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        _note_request(session, target.hospital_id, target.status, 1)
+
+def _request_updated(mapper, connection, target):
+    session = object_session(target)
+    if session is None:
+        return
+    state = inspect(target)
+    status, hospital_id = state.attrs.status.history, state.attrs.hospital_id.history
+    if not (status.has_changes() or hospital_id.has_changes()):
+        return
+    if (status.has_changes() and not status.deleted) or (hospital_id.has_changes() and not hospital_id.deleted):
+        # Assigned without being loaded first, so the previous value is unknown
+        _pending(session).append(('reload', target.hospital_id, None, None))
+        if hospital_id.deleted:
+            _pending(session).append(('reload', hospital_id.deleted[0], None, None))
+        return
+    old_status = status.deleted[0] if status.deleted else target.status
+    old_hospital_id = hospital_id.deleted[0] if hospital_id.deleted else target.hospital_id
+    _note_request(session, old_hospital_id, old_status, -1)
+    _note_request(session, target.hospital_id, target.status, 1)
+
+def _request_deleted(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        _note_request(session, target.hospital_id, target.status, -1)
+
+event.listen(HospitalBloodAvailability, 'after_insert', _availability_changed)
+event.listen(HospitalBloodAvailability, 'after_update', _availability_changed)
+event.listen(HospitalBloodAvailability, 'after_delete', _availability_deleted)
+event.listen(BloodRequest, 'after_insert', _request_inserted)
+event.listen(BloodRequest, 'after_update', _request_updated)
+event.listen(BloodRequest, 'after_delete', _request_deleted)
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _apply_committed(session):
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes and has_app_context() and 'hospital_stats' in current_app.extensions:
+        current_app.extensions['hospital_stats'].apply(changes)
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _discard_rolled_back(session):
+    session.info.pop(_PENDING_KEY, None)
+
+class HospitalStatsCache:
+    """
+    Per-hospital inventory and request counts for the admin dashboard.
+
+    A hospital's entry is loaded with one grouped query the first time it
+    is asked for, then kept current by applying committed availability and
+    request-status changes from this process. The TTL bounds how long
+    changes made by other workers can go unseen.
+    """
+
+    def __init__(self, ttl_seconds=60, critical_units=5):
+        self.ttl_seconds = ttl_seconds
+        self.critical_units = critical_units
+        self._lock = threading.Lock()
+        self._entries = {}
+        # Bumped on every applied change so a load that raced one is not kept
+        self._generation = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def invalidate(self, hospital_id=None):
+        """Drop one hospital's entry, or all of them"""
+        with self._lock:
+            self._generation += 1
+            if hospital_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(hospital_id, None)
+
+    def _load(self, hospital_id):
+        availability = db.select(
+            db.literal('units').label('kind'),
+            HospitalBloodAvailability.blood_group_id.label('blood_group_id'),
+            db.cast(db.null(), db.String).label('status'),
+            HospitalBloodAvailability.no_of_units.label('value'),
+        ).where(
+            HospitalBloodAvailability.hospital_id == hospital_id,
+            HospitalBloodAvailability.to_date.is_(None),
+        )
+        requests = db.select(
+            db.literal('requests'),
+            db.cast(db.null(), db.Integer),
+            BloodRequest.status,
+            db.func.count(),
+        ).where(BloodRequest.hospital_id == hospital_id).group_by(BloodRequest.status)
+
+        entry = {'units': {}, 'requests': {}, 'loaded_at': time.monotonic()}
+        for kind, blood_group_id, status, value in db.session.execute(db.union_all(availability, requests)):
+            if kind == 'units':
+                entry['units'][blood_group_id] = value
+            else:
+                entry['requests'][status] = value
+        return entry
+
+    def _entry(self, hospital_id):
+        entry = self._entries.get(hospital_id)
+        if entry is not None and not (self.ttl_seconds and time.monotonic() - entry['loaded_at'] > self.ttl_seconds):
+            return entry
+        generation = self._generation
+        entry = self._load(hospital_id)
+        with self._lock:
+            if generation == self._generation:
+                self._entries[hospital_id] = entry
+        return entry
+
+    def apply(self, changes):
+        """Apply committed ('units' | 'requests' | 'reload', hospital_id, key, value) changes"""
+        with self._lock:
+            self._generation += 1
+            for kind, hospital_id, key, value in changes:
+                entry = self._entries.get(hospital_id)
+                if entry is None:
+                    continue
+                if kind == 'reload':
+                    del self._entries[hospital_id]
+                elif kind == 'units':
+                    if value is None:
+                        entry['units'].pop(key, None)
+                    else:
+                        entry['units'][key] = value
+                else:
+                    entry['requests'][key] = entry['requests'].get(key, 0) + value
+
+    def stats(self, hospital_id):
+        """Dashboard figures for one hospital"""
+        entry = self._entry(hospital_id)
+        with self._lock:
+            units = list(entry['units'].values())
+            requests = dict(entry['requests'])
+        return {
+            'unitsAvailable': sum(units),
+            'activeRequests': requests.get('pending', 0),
+            'fulfilled': requests.get('completed', 0),
+            'critical': sum(1 for value in units if value < self.critical_units),
+        }
+
+def init_app(app):
+    """Attach an empty hospital stats cache to the app; entries load on first use"""
+    app.extensions['hospital_stats'] = HospitalStatsCache(
+        ttl_seconds=app.config.get('HOSPITAL_STATS_TTL', 60),
+        critical_units=app.config.get('HOSPITAL_CRITICAL_UNITS', 5),
+    )
+
+def get_hospital_stats_cache():
+    """Get the hospital stats cache for the current app"""
+    return current_app.extensions['hospital_stats']
@@ -0,0 +1,69 @@
+import dataclasses
+import decimal
+import uuid
+from datetime import date, datetime, time
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+# Sorted keys match what the stdlib provider has always produced
+_ORJSON_OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+def _default(o):
+    """Types neither encoder handles natively; dates are ISO 8601, not HTTP dates"""
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+class ISOJSONProvider(DefaultJSONProvider):
+    """
+    The stdlib provider with ISO 8601 dates instead of Flask's RFC 822
+    ones. Installed when JSON_FAST_ENCODER is off, so the serializers'
+    date and datetime values keep the same format on both paths.
+    """
+
+    default = staticmethod(_default)
+
+class FastJSONProvider(ISOJSONProvider):
+    """
+    JSON provider that encodes with orjson when it is installed and falls
+    back to the stdlib encoder otherwise (or when a caller passes stdlib
+    options such as indent). Either way date and datetime values are
+    written as ISO 8601 strings, so routes can return them as-is.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS).decode('utf-8')
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if orjson is None or self._pretty():
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+    def _pretty(self):
+        return self.compact is False or (self.compact is None and self._app.debug)
+
+def init_app(app):
+    """Install the orjson provider, or the stdlib one when JSON_FAST_ENCODER is turned off"""
+    if app.config.get('JSON_FAST_ENCODER', True):
+        app.json = FastJSONProvider(app)
+    else:
+        app.json = ISOJSONProvider(app)
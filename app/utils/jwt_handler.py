@@ -1,10 +1,13 @@
+import logging
 from flask_jwt_extended import JWTManager
 
+logger = logging.getLogger(__name__)
+
 jwt = JWTManager()
 
 @jwt.expired_token_loader
 def expired_token_callback(jwt_header, jwt_payload):
-    print("[JWT] Token expired")
+    logger.info("Token expired for user %s", jwt_payload.get('sub'))
     return {
         'status': 'error',
         'message': 'Token has expired'
@@ -12,7 +15,7 @@ def expired_token_callback(jwt_header, jwt_payload):
 
 @jwt.invalid_token_loader
 def invalid_token_callback(error):
-    print(f"[JWT] Invalid token: {error}")
+    logger.info("Invalid token: %s", error)
     return {
         'status': 'error',
         'message': 'Invalid token'
@@ -20,7 +23,7 @@ def invalid_token_callback(error):
 
 @jwt.unauthorized_loader
 def missing_token_callback(error):
-    print(f"[JWT] Unauthorized: {error}")
+    logger.debug("Unauthorized: %s", error)
     return {
         'status': 'error',
         'message': 'Authorization token is missing'
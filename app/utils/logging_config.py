@@ -0,0 +1,115 @@
+import json
+import logging
+import random
+import sys
+import time
+import uuid
+from flask import g, has_request_context, request
+
+# Attributes every LogRecord has; anything else was passed via extra=
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+
+_HANDLER_NAME = 'app-log-handler'
+
+class RequestContextFilter(logging.Filter):
+    """
+    Stamps each record with the current request id and drops DEBUG
+    records for requests that were not picked for debug sampling.
+    """
+
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = g.get('request_id', '-')
+            if record.levelno <= logging.DEBUG and not g.get('log_debug_sampled', True):
+                return False
+        else:
+            record.request_id = '-'
+        return True
+
+class KeyValueFormatter(logging.Formatter):
+    """Plain text lines with any extra= fields appended as key=value"""
+
+    def format(self, record):
+        line = super().format(record)
+        extras = {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+        if extras:
+            line += ' ' + ' '.join(f'{key}={value}' for key, value in extras.items() if not isinstance(value, (list, dict)))
+        return line
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any extra= fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'request_id': getattr(record, 'request_id', '-'),
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+def _parse_levels(spec):
+    """'app.sql=DEBUG,werkzeug=WARNING' -> {'app.sql': 'DEBUG', 'werkzeug': 'WARNING'}"""
+    levels = {}
+    for item in (spec or '').split(','):
+        if '=' in item:
+            name, level = item.split('=', 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+def configure_logging(level='INFO', fmt='text', module_levels=None):
+    """
+    Install a single stderr handler on the root logger and apply levels.
+    Safe to call more than once; the handler is replaced, not duplicated.
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if handler.get_name() == _HANDLER_NAME:
+            root.removeHandler(handler)
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.set_name(_HANDLER_NAME)
+    handler.addFilter(RequestContextFilter())
+    if fmt == 'json':
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(KeyValueFormatter('%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s'))
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    for name, module_level in (module_levels or {}).items():
+        logging.getLogger(name).setLevel(module_level)
+
+def init_app(app):
+    """
+    Configure logging from LOG_LEVEL, LOG_LEVELS and LOG_FORMAT, and give
+    every request an id (taken from X-Request-ID when the client sends one)
+    that is added to its log lines and echoed in the response.
+
+    LOG_DEBUG_SAMPLE_RATE keeps DEBUG output for only that fraction of
+    requests; the decision is made once per request so its lines stay together.
+    """
+    configure_logging(
+        level=app.config.get('LOG_LEVEL', 'INFO'),
+        fmt=app.config.get('LOG_FORMAT', 'text'),
+        module_levels=_parse_levels(app.config.get('LOG_LEVELS')),
+    )
+    sample_rate = app.config.get('LOG_DEBUG_SAMPLE_RATE', 1.0)
+
+    @app.before_request
+    def assign_request_id():
+        incoming = request.headers.get('X-Request-ID', '')
+        g.request_id = incoming[:64] if incoming else uuid.uuid4().hex
+        g.log_debug_sampled = sample_rate >= 1.0 or random.random() < sample_rate
+
+    @app.after_request
+    def echo_request_id(response):
+        if 'request_id' in g:
+            response.headers['X-Request-ID'] = g.request_id
+        return response
@@ -0,0 +1,146 @@
+import hashlib
+import threading
+import time
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from db import RoutingSession
+from models import db, LookupBloodGroup, LookupRole
+
+# Bumped whenever a lookup write commits in this process; caches compare it
+# against the generation they loaded to know they are out of date.
+_generation = 0
+
+# Set in session.info when a flush writes a lookup row; the generation is
+# only bumped once that transaction commits.
+_PENDING_KEY = 'lookup_cache_dirty'
+
+def _note_write(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info[_PENDING_KEY] = True
+
+for _model in (LookupBloodGroup, LookupRole):
+    for _event_name in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(_model, _event_name, _note_write)
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _bump_committed(session):
+    global _generation
+    if session.info.pop(_PENDING_KEY, None):
+        _generation += 1
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _discard_rolled_back(session):
+    session.info.pop(_PENDING_KEY, None)
+
+def _name_key(name):
+    return str(name).strip().upper()
+
+class LookupCache:
+    """
+    Process-wide copy of the lookup tables.
+
+    Rows are held as plain dicts keyed by id and by case-insensitive name,
+    so resolving a blood group or role is a dict hit. The serialized
+    /blood/blood-groups body and its ETag are computed once per load.
+    """
+
+    def __init__(self, ttl_seconds=3600):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._loaded_generation = None
+        self._loaded_at = None
+        self._blood_groups_by_id = {}
+        self._blood_groups_by_name = {}
+        self._roles_by_id = {}
+        self._roles_by_name = {}
+        self._blood_groups_body = None
+        self._blood_groups_etag = None
+
+    def invalidate(self):
+        """Force a reload on next access"""
+        with self._lock:
+            self._loaded_generation = None
+
+    def _is_stale(self):
+        if self._loaded_generation != _generation:
+            return True
+        return bool(self.ttl_seconds) and time.monotonic() - self._loaded_at > self.ttl_seconds
+
+    def _ensure_loaded(self):
+        if not self._is_stale():
+            return
+        with self._lock:
+            if not self._is_stale():
+                return
+            generation = _generation
+            blood_groups = db.session.query(
+                LookupBloodGroup.blood_group_id, LookupBloodGroup.blood_group_name
+            ).order_by(LookupBloodGroup.blood_group_id).all()
+            roles = db.session.query(
+                LookupRole.lookup_role_id, LookupRole.lookup_role_name
+            ).order_by(LookupRole.lookup_role_id).all()
+
+            self._blood_groups_by_id = {
+                row.blood_group_id: {'blood_group_id': row.blood_group_id, 'blood_group_name': row.blood_group_name}
+                for row in blood_groups
+            }
+            self._blood_groups_by_name = {
+                _name_key(entry['blood_group_name']): entry for entry in self._blood_groups_by_id.values()
+            }
+            self._roles_by_id = {
+                row.lookup_role_id: {'lookup_role_id': row.lookup_role_id, 'lookup_role_name': row.lookup_role_name}
+                for row in roles
+            }
+            self._roles_by_name = {
+                _name_key(entry['lookup_role_name']): entry for entry in self._roles_by_id.values()
+            }
+
+            body = current_app.json.dumps(list(self._blood_groups_by_id.values()))
+            self._blood_groups_body = body
+            self._blood_groups_etag = hashlib.sha1(body.encode('utf-8')).hexdigest()
+            self._loaded_generation = generation
+            self._loaded_at = time.monotonic()
+
+    def _resolve(self, value, by_id, by_name):
+        if value is None:
+            return None
+        if isinstance(value, int) and not isinstance(value, bool):
+            return by_id.get(value)
+        text = str(value).strip()
+        if text.isdigit():
+            return by_id.get(int(text))
+        return by_name.get(_name_key(text))
+
+    def blood_group(self, name_or_id):
+        """Resolve a blood group by id or name (case-insensitive). None if unknown."""
+        self._ensure_loaded()
+        return self._resolve(name_or_id, self._blood_groups_by_id, self._blood_groups_by_name)
+
+    def blood_groups(self):
+        """All blood groups ordered by id"""
+        self._ensure_loaded()
+        return list(self._blood_groups_by_id.values())
+
+    def blood_group_names(self):
+        """All blood group names ordered by id"""
+        return [entry['blood_group_name'] for entry in self.blood_groups()]
+
+    def blood_groups_json(self):
+        """Pre-serialized blood group list and its ETag"""
+        self._ensure_loaded()
+        return self._blood_groups_body, self._blood_groups_etag
+
+    def role(self, name_or_id):
+        """Resolve a role by id or name (case-insensitive). None if unknown."""
+        self._ensure_loaded()
+        return self._resolve(name_or_id, self._roles_by_id, self._roles_by_name)
+
+def init_app(app):
+    """Attach an empty lookup cache to the app; it is filled on first use"""
+    app.extensions['lookup_cache'] = LookupCache(ttl_seconds=app.config.get('LOOKUP_CACHE_TTL', 3600))
+
+def get_lookup_cache():
+    """Get the lookup cache for the current app"""
+    return current_app.extensions['lookup_cache']
@@ -0,0 +1,101 @@
+import os
+import time
+from flask import Response, g, request
+from prometheus_client import (CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram,
+                               REGISTRY, generate_latest, multiprocess)
+from models import db
+from app.utils.password_hashing import password_hasher
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Metrics are process-wide; with PROMETHEUS_MULTIPROC_DIR set, prometheus_client
+# writes them to per-process files that /metrics aggregates.
+REQUESTS = Counter(
+    'http_requests_total', 'HTTP requests handled',
+    ['blueprint', 'endpoint', 'method', 'status']
+)
+LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time spent handling HTTP requests',
+    ['blueprint', 'endpoint', 'method'], buckets=LATENCY_BUCKETS
+)
+IN_PROGRESS = Gauge(
+    'http_requests_in_progress', 'HTTP requests currently being handled',
+    ['blueprint', 'endpoint'], multiprocess_mode='livesum'
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    'db_pool_checkout_wait_seconds', 'Time spent waiting for a pooled DB connection',
+    ['engine'], buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+)
+PASSWORD_HASH_QUEUE = Gauge(
+    'password_hash_queue_depth', 'Password hashes queued or running',
+    multiprocess_mode='livesum'
+)
+
+def instrument_pool(engine, name='default'):
+    """Time every checkout from ``engine``'s pool into POOL_CHECKOUT_WAIT"""
+    pool = engine.pool
+    if getattr(pool, '_metrics_instrumented', False):
+        return
+    connect = pool.connect
+    observe = POOL_CHECKOUT_WAIT.labels(name).observe
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            observe(time.perf_counter() - started)
+
+    pool.connect = timed_connect
+    pool._metrics_instrumented = True
+
+def render_metrics():
+    """Text exposition of all metrics, aggregated across workers in multiprocess mode"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+def _labels():
+    endpoint = request.endpoint or 'unmatched'
+    blueprint = request.blueprint or ''
+    return blueprint, endpoint
+
+def init_app(app):
+    """Record per-endpoint request metrics and serve them at /metrics"""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    with app.app_context():
+        for bind, engine in db.engines.items():
+            instrument_pool(engine, bind or 'default')
+
+    @app.before_request
+    def start_request_metrics():
+        blueprint, endpoint = _labels()
+        IN_PROGRESS.labels(blueprint, endpoint).inc()
+        g.metrics_started_at = time.perf_counter()
+
+    @app.after_request
+    def note_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        started = g.pop('metrics_started_at', None)
+        if started is None:
+            return
+        status = g.pop('metrics_status', 500)
+        blueprint, endpoint = _labels()
+        IN_PROGRESS.labels(blueprint, endpoint).dec()
+        LATENCY.labels(blueprint, endpoint, request.method).observe(time.perf_counter() - started)
+        REQUESTS.labels(blueprint, endpoint, request.method, str(status)).inc()
+        PASSWORD_HASH_QUEUE.set(password_hasher.stats()['queue_depth'])
+
+    @app.route(app.config.get('METRICS_PATH', '/metrics'), methods=['GET'])
+    def metrics():
+        """Prometheus text exposition"""
+        return Response(render_metrics(), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,266 @@
+"""
+Notification outbox: queue email and push messages with the write that
+causes them, deliver them from a separate worker process.
+
+Request handlers call ``enqueue()`` before they commit, so a message exists
+exactly when the change it announces does and sending never adds to request
+latency. ``drain_once()`` leases a batch of due rows, resolves user ids to
+addresses, hands each channel's messages to its transport and records the
+outcome; failures are retried with exponential backoff until
+OUTBOX_MAX_ATTEMPTS, after which the row is marked failed.
+"""
+import logging
+import random
+import smtplib
+from collections import namedtuple
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from models import db, NotificationOutbox, User, UserDeviceToken
+
+logger = logging.getLogger(__name__)
+
+# What a transport is given: ``to`` is a list of email addresses or device tokens. A transport that
+# sends a message in parts adds the addresses it has reached to the ``delivered`` set, so a retry
+# after a partial failure skips them.
+OutgoingMessage = namedtuple('OutgoingMessage', 'id channel to subject body payload delivered')
+
+# Payload key under which the addresses already reached are kept between attempts
+DELIVERED_KEY = 'delivered_to'
+
+# Push broadcast to the donors nearest the blood request in ``payload['blood_request_id']``
+DONOR_ALERT = 'donor_alert'
+
+def enqueue(channel, subject, body, user_id=None, recipient=None, payload=None):
+    """Queue a message as part of the current transaction"""
+    if user_id is None and recipient is None and channel != DONOR_ALERT:
+        raise ValueError('A notification needs a user_id or a recipient')
+    message = NotificationOutbox(
+        channel=channel, user_id=user_id, recipient=recipient,
+        subject=subject, body=body, payload=payload,
+        status='pending', attempts=0, next_attempt_at=datetime.utcnow(),
+    )
+    db.session.add(message)
+    return message
+
+class Transport:
+    """Delivers a batch of messages for one channel"""
+
+    def send(self, messages):
+        """Return {message id: None on success or an error string}"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release connections or threads held between batches"""
+
+class LogTransport(Transport):
+    """Writes messages to the log instead of delivering them (development default)"""
+
+    def __init__(self, config=None):
+        pass
+
+    def send(self, messages):
+        for message in messages:
+            logger.info("Notification %s via %s to %s: %s", message.id, message.channel,
+                        ', '.join(message.to), message.subject)
+        return {message.id: None for message in messages}
+
+class FakeTransport(Transport):
+    """
+    Records messages in memory for tests. ``fail_with`` makes the next
+    ``failures`` sends report that error for every message.
+    """
+
+    def __init__(self, config=None):
+        self.sent = []
+        self.failures = 0
+        self.fail_with = 'simulated failure'
+
+    def send(self, messages):
+        if self.failures:
+            self.failures -= 1
+            return {message.id: self.fail_with for message in messages}
+        self.sent.extend(messages)
+        return {message.id: None for message in messages}
+
+class SMTPTransport(Transport):
+    """Sends email over one SMTP connection per batch"""
+
+    def __init__(self, config):
+        self.host = config.get('SMTP_HOST', 'localhost')
+        self.port = config.get('SMTP_PORT', 587)
+        self.username = config.get('SMTP_USERNAME')
+        self.password = config.get('SMTP_PASSWORD')
+        self.use_tls = config.get('SMTP_USE_TLS', True)
+        self.sender = config.get('NOTIFICATION_EMAIL_FROM', 'no-reply@donornearme.local')
+        self.timeout = config.get('SMTP_TIMEOUT', 10)
+
+    def send(self, messages):
+        results = {}
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            for message in messages:
+                email = EmailMessage()
+                email['From'] = self.sender
+                email['To'] = ', '.join(message.to)
+                email['Subject'] = message.subject
+                email.set_content(message.body)
+                try:
+                    smtp.send_message(email)
+                    results[message.id] = None
+                except smtplib.SMTPException as e:
+                    results[message.id] = str(e)
+        return results
+
+TRANSPORTS = {'log': LogTransport, 'fake': FakeTransport, 'smtp': SMTPTransport}
+
+def build_transports(config):
+    """
+    {channel: transport}: email from NOTIFICATION_EMAIL_TRANSPORT; push and
+    donor alerts share one batched PushTransport whose provider client is
+    chosen by NOTIFICATION_PUSH_TRANSPORT
+    """
+    from app.utils.push_fanout import PushTransport
+
+    push = PushTransport(config)
+    return {
+        'email': TRANSPORTS[config.get('NOTIFICATION_EMAIL_TRANSPORT', 'log')](config),
+        'push': push,
+        DONOR_ALERT: push,
+    }
+
+def backoff_delay(attempts, base_seconds, max_seconds):
+    """Exponential delay before retry number ``attempts``, with jitter"""
+    delay = min(max_seconds, base_seconds * (2 ** max(0, attempts - 1)))
+    return delay * (0.5 + random.random() / 2)
+
+def _addresses(rows, alert_limit=2000):
+    """{outbox id: [address or token, ...]} for a batch, in one query per channel"""
+    email_users = {row.user_id for row in rows if row.channel == 'email' and row.user_id and not row.recipient}
+    push_users = {row.user_id for row in rows if row.channel == 'push' and row.user_id and not row.recipient}
+    alerts = {}
+    alert_requests = {(row.payload or {}).get('blood_request_id') for row in rows if row.channel == DONOR_ALERT}
+    alert_requests.discard(None)
+    if alert_requests:
+        from app.controllers.donor_matching import alert_recipients
+        alerts = alert_recipients(alert_requests, limit=alert_limit)
+        for donors in alerts.values():
+            push_users.update(donors)
+
+    emails = dict(db.session.query(User.user_id, User.user_email).filter(User.user_id.in_(email_users))) if email_users else {}
+    tokens = {}
+    if push_users:
+        for user_id, token in db.session.query(UserDeviceToken.user_id, UserDeviceToken.firebase_device_token).filter(
+                UserDeviceToken.user_id.in_(push_users)):
+            tokens.setdefault(user_id, []).append(token)
+
+    addresses = {}
+    for row in rows:
+        if row.recipient:
+            addresses[row.id] = [row.recipient]
+        elif row.channel == 'email':
+            addresses[row.id] = [emails[row.user_id]] if emails.get(row.user_id) else []
+        elif row.channel == DONOR_ALERT:
+            donors = alerts.get((row.payload or {}).get('blood_request_id'), [])
+            addresses[row.id] = [token for donor in donors for token in tokens.get(donor, [])]
+        else:
+            addresses[row.id] = tokens.get(row.user_id, [])
+    return addresses
+
+def drain_once(transports, batch_size=100, max_attempts=8, backoff_seconds=30, backoff_max_seconds=3600,
+               alert_limit=2000, lease_seconds=300):
+    """
+    Deliver one batch of due messages and record the outcome.
+
+    Rows are claimed with FOR UPDATE SKIP LOCKED on PostgreSQL, so several
+    workers can drain the same table, and leased by pushing next_attempt_at
+    ``lease_seconds`` ahead. The claim commits before anything is sent, so
+    no transaction stays open across SMTP or push calls; results are written
+    in a second short transaction. A worker that dies mid-send leaves its
+    rows to be picked up again once the lease runs out. Returns counts of
+    sent, retried and failed rows.
+    """
+    now = datetime.utcnow()
+    rows = NotificationOutbox.query.filter(
+        NotificationOutbox.status == 'pending',
+        NotificationOutbox.next_attempt_at <= now,
+    ).order_by(NotificationOutbox.next_attempt_at, NotificationOutbox.id).limit(batch_size).with_for_update(
+        skip_locked=True
+    ).all()
+    counts = {'sent': 0, 'retried': 0, 'failed': 0}
+    if not rows:
+        db.session.commit()
+        return counts
+
+    addresses = _addresses(rows, alert_limit)
+    results = {}
+    outgoing = {}
+    by_channel = {}
+    for row in rows:
+        row.next_attempt_at = now + timedelta(seconds=lease_seconds)
+        if not addresses[row.id]:
+            # Nobody nearby with a registered device is not a failure for a broadcast
+            results[row.id] = None if row.channel == DONOR_ALERT else 'No address for recipient'
+            continue
+        payload = dict(row.payload or {})
+        reached = set(payload.pop(DELIVERED_KEY, ()))
+        to = [address for address in addresses[row.id] if address not in reached]
+        if not to:
+            results[row.id] = None
+            continue
+        message = OutgoingMessage(row.id, row.channel, to, row.subject, row.body, payload or None, set())
+        outgoing[row.id] = message
+        by_channel.setdefault(row.channel, []).append(message)
+    claimed = [row.id for row in rows]
+    db.session.commit()
+
+    for channel, messages in by_channel.items():
+        transport = transports.get(channel)
+        if transport is None:
+            results.update({message.id: f'No transport for channel {channel}' for message in messages})
+            continue
+        try:
+            results.update(transport.send(messages))
+        except Exception as e:
+            logger.warning("%s transport failed for %d messages", channel, len(messages), exc_info=True)
+            results.update({message.id: str(e) or type(e).__name__ for message in messages})
+
+    now = datetime.utcnow()
+    for row in NotificationOutbox.query.filter(NotificationOutbox.id.in_(claimed)):
+        error = results.get(row.id, 'No result from transport')
+        row.attempts += 1
+        if error is None:
+            row.status = 'sent'
+            row.sent_at = now
+            row.last_error = None
+            counts['sent'] += 1
+        elif row.attempts >= max_attempts:
+            row.status = 'failed'
+            row.last_error = error
+            counts['failed'] += 1
+        else:
+            row.last_error = error
+            if row.id in outgoing and outgoing[row.id].delivered:
+                reached = set((row.payload or {}).get(DELIVERED_KEY, ())) | outgoing[row.id].delivered
+                row.payload = {**(row.payload or {}), DELIVERED_KEY: sorted(reached)}
+            row.next_attempt_at = now + timedelta(
+                seconds=backoff_delay(row.attempts, backoff_seconds, backoff_max_seconds)
+            )
+            counts['retried'] += 1
+    db.session.commit()
+    if counts['failed']:
+        logger.warning("Gave up on %d notifications", counts['failed'])
+    return counts
+
+def drain_options(config):
+    """drain_once() keyword arguments from the app config"""
+    return {
+        'batch_size': config.get('OUTBOX_BATCH_SIZE', 100),
+        'max_attempts': config.get('OUTBOX_MAX_ATTEMPTS', 8),
+        'backoff_seconds': config.get('OUTBOX_BACKOFF_SECONDS', 30),
+        'backoff_max_seconds': config.get('OUTBOX_BACKOFF_MAX_SECONDS', 3600),
+        'alert_limit': config.get('DONOR_ALERT_MAX_RECIPIENTS', 2000),
+        'lease_seconds': config.get('OUTBOX_LEASE_SECONDS', 300),
+    }
@@ -0,0 +1,80 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+def encode_cursor(created_at, row_id):
+    """Encode a (created_at, id) position as an opaque URL-safe cursor"""
+    payload = json.dumps([created_at.isoformat() if created_at else None, row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor. Raises ValueError if malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return (datetime.fromisoformat(created_at) if created_at else None), int(row_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+def parse_page_size(value):
+    """Clamp a ?limit= value to [1, MAX_PAGE_SIZE]. Raises ValueError if not an integer."""
+    if value is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(value), MAX_PAGE_SIZE))
+
+def keyset_page(query, created_col, id_col, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Fetch one page of ``query`` ordered newest first on (created_col, id_col).
+
+    Returns ``(rows, next_cursor)``; next_cursor is None on the last page.
+    Only ``limit + 1`` rows are read regardless of table size.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            created_col < created_at,
+            and_(created_col == created_at, id_col < row_id)
+        ))
+    rows = query.order_by(created_col.desc(), id_col.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, created_col.key), getattr(last, id_col.key))
+    return rows, next_cursor
+
+def changes_page(query, updated_col, id_col, watermark=None, limit=DEFAULT_PAGE_SIZE, until=None):
+    """
+    Fetch rows changed after ``watermark``, oldest change first, ordered on
+    (updated_col, id_col). Watermarks use the cursor encoding.
+
+    ``until`` caps the newest change returned, leaving time for transactions
+    that stamped an earlier updated_at to commit before the watermark passes
+    them. Returns ``(rows, next_watermark, has_more)``.
+    """
+    position = decode_cursor(watermark) if watermark else None
+    if position:
+        updated_at, row_id = position
+        query = query.filter(or_(
+            updated_col > updated_at,
+            and_(updated_col == updated_at, id_col > row_id)
+        ))
+    if until is not None:
+        query = query.filter(updated_col <= until)
+    rows = query.order_by(updated_col.asc(), id_col.asc()).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    candidates = [position] if position else []
+    if rows:
+        candidates.append((getattr(rows[-1], updated_col.key), getattr(rows[-1], id_col.key)))
+    if not has_more and until is not None:
+        # Everything up to ``until`` has been seen
+        candidates.append((until, 0))
+    next_watermark = encode_cursor(*max(candidates)) if candidates else None
+    return rows, next_watermark, has_more
@@ -0,0 +1,156 @@
+import hmac
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import bcrypt
+from werkzeug.security import generate_password_hash, check_password_hash
+
+logger = logging.getLogger(__name__)
+
+# Sent as Retry-After with the 503 routes return on HashingBusy; a queued hash clears in well under a second
+RETRY_AFTER_SECONDS = 1
+
+class HashingBusy(Exception):
+    """Raised when the hashing pool is saturated or a hash did not finish in time"""
+
+def _check_any(stored_hash, password):
+    """Verify against werkzeug, bcrypt or legacy plaintext hashes"""
+    if stored_hash.startswith('pbkdf2:') or stored_hash.startswith('scrypt:'):
+        return check_password_hash(stored_hash, password)
+    if stored_hash.startswith(('$2b$', '$2a$', '$2y$')):
+        return bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8'))
+    # Plaintext rows from early seed scripts
+    return hmac.compare_digest(stored_hash.encode('utf-8'), password.encode('utf-8'))
+
+class PasswordHasher:
+    """
+    Runs password hashing on a small dedicated thread pool.
+
+    PBKDF2, scrypt and bcrypt all release the GIL, so hashing on the pool
+    does not stall other request threads, and at most ``max_workers``
+    hashes run at once per process. Work beyond ``max_queue`` pending
+    hashes is rejected with HashingBusy instead of piling up.
+    """
+
+    def __init__(self, method='scrypt', max_workers=2, max_queue=64, timeout=10.0):
+        self.method = method
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = None
+        self._pid = None
+        self._slots = threading.BoundedSemaphore(max_queue)
+        self._pending = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+        self._method_prefix = None
+
+    def configure(self, method, max_workers, max_queue, timeout):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self.method = method
+            self.max_workers = max_workers
+            self.max_queue = max_queue
+            self.timeout = timeout
+            self._executor = None
+            self._slots = threading.BoundedSemaphore(max_queue)
+            self._method_prefix = None
+
+    def _get_executor(self):
+        # Threads do not survive a fork, so each gunicorn worker builds its own pool
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='password-hash')
+                self._pid = os.getpid()
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashingBusy('Password hashing queue is full')
+        with self._lock:
+            self._pending += 1
+
+        def _release(_future):
+            with self._lock:
+                self._pending -= 1
+            self._slots.release()
+
+        future = self._get_executor().submit(fn, *args)
+        future.add_done_callback(_release)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise HashingBusy('Password hashing timed out')
+
+    @property
+    def method_prefix(self):
+        """The 'method:params' prefix hashes produced with the configured method start with"""
+        if self._method_prefix is None:
+            self._method_prefix = generate_password_hash('probe', method=self.method).split('$', 1)[0]
+        return self._method_prefix
+
+    def hash(self, password):
+        """Hash a password with the configured method"""
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, stored_hash, password):
+        """
+        Check a password against a stored hash of any supported kind.
+
+        Returns ``(matches, needs_rehash)``; needs_rehash is True when the
+        password matched but the stored hash is plaintext, bcrypt, or uses
+        different parameters than the configured method.
+        """
+        if not stored_hash or password is None:
+            return False, False
+        matches = self._run(_check_any, stored_hash, password)
+        needs_rehash = matches and stored_hash.split('$', 1)[0] != self.method_prefix
+        return matches, needs_rehash
+
+    def stats(self):
+        """Pool size, current queue depth and rejected-work count"""
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'queue_depth': self._pending,
+                'in_flight': min(self._pending, self.max_workers),
+                'rejected': self._rejected,
+            }
+
+password_hasher = PasswordHasher()
+
+def init_app(app):
+    """Apply hashing pool settings from config"""
+    password_hasher.configure(
+        method=app.config.get('PASSWORD_HASH_METHOD', 'scrypt'),
+        max_workers=app.config.get('PASSWORD_HASH_WORKERS', 2),
+        max_queue=app.config.get('PASSWORD_HASH_QUEUE', 64),
+        timeout=app.config.get('PASSWORD_HASH_TIMEOUT', 10.0),
+    )
+
+def hash_password(password):
+    """Hash a password on the hashing pool"""
+    return password_hasher.hash(password)
+
+def verify_password(stored_hash, password):
+    """Verify a password on the hashing pool; returns (matches, needs_rehash)"""
+    return password_hasher.verify(stored_hash, password)
+
+def upgrade_password_hash(user, password):
+    """
+    Re-hash a just-verified password with the configured method and save it.
+    Failures are logged and ignored; the login itself already succeeded.
+    """
+    from models import db
+
+    try:
+        user.password = hash_password(password)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        logger.warning("Could not upgrade password hash for user %s", user.user_id, exc_info=True)
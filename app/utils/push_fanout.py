@@ -0,0 +1,135 @@
+"""
+Batched push delivery for the notification outbox.
+
+``PushTransport`` takes outbox messages whose ``to`` lists hold device
+tokens (a single user's devices, or every nearby donor's for a new-request
+alert), splits the tokens into provider-sized multicast batches and sends
+them through a bounded thread pool. Tokens the provider reports as
+unregistered are deleted, and delivered tokens get ``last_seen_date``
+refreshed, each with one bulk statement per drain.
+
+When some batches of a message fail, the tokens the others reached are
+reported back through ``OutgoingMessage.delivered``; the outbox keeps them
+with the row so the retry sends only to the tokens that were missed.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from sqlalchemy import delete, update
+from models import db, UserDeviceToken
+from app.utils.outbox import Transport
+
+logger = logging.getLogger(__name__)
+
+# What a push client reports for a token the provider no longer knows
+INVALID_TOKEN = 'invalid-token'
+
+class PushClient:
+    """One provider multicast call"""
+
+    def send_multicast(self, tokens, title, body, data=None):
+        """Return {token: None if delivered, INVALID_TOKEN or an error string}"""
+        raise NotImplementedError
+
+class LogPushClient(PushClient):
+    """Logs pushes instead of sending them (development default)"""
+
+    def __init__(self, config=None):
+        pass
+
+    def send_multicast(self, tokens, title, body, data=None):
+        logger.info("Push to %d devices: %s", len(tokens), title)
+        return {token: None for token in tokens}
+
+class FakePushClient(PushClient):
+    """
+    Records multicast batches in memory for tests. Tokens in ``invalid``
+    are reported unregistered; the next ``failures`` calls, and any call
+    for a batch holding a token in ``unreachable``, fail outright.
+    """
+
+    def __init__(self, config=None):
+        self.batches = []
+        self.invalid = set()
+        self.unreachable = set()
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def send_multicast(self, tokens, title, body, data=None):
+        with self._lock:
+            if self.failures or self.unreachable.intersection(tokens):
+                self.failures = max(0, self.failures - 1)
+                raise ConnectionError('simulated provider outage')
+            self.batches.append(list(tokens))
+        return {token: INVALID_TOKEN if token in self.invalid else None for token in tokens}
+
+PUSH_CLIENTS = {'log': LogPushClient, 'fake': FakePushClient}
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+class PushTransport(Transport):
+    """Outbox transport that fans push messages out in multicast batches"""
+
+    def __init__(self, config, client=None):
+        self.client = client or PUSH_CLIENTS[config.get('NOTIFICATION_PUSH_TRANSPORT', 'log')](config)
+        self.batch_size = config.get('PUSH_MULTICAST_SIZE', 500)
+        self.workers = config.get('PUSH_FANOUT_WORKERS', 4)
+        self._executor = None
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='push-fanout')
+        return self._executor
+
+    def _send_batch(self, tokens, message):
+        try:
+            return self.client.send_multicast(tokens, message.subject, message.body, message.payload)
+        except Exception as e:
+            logger.warning("Push batch of %d tokens failed", len(tokens), exc_info=True)
+            return {token: str(e) or type(e).__name__ for token in tokens}
+
+    def send(self, messages):
+        futures = []
+        for message in messages:
+            tokens = list(dict.fromkeys(message.to))
+            for batch in _chunks(tokens, self.batch_size):
+                futures.append((message, self.executor.submit(self._send_batch, batch, message)))
+
+        results = {message.id: None for message in messages}
+        delivered, invalid = set(), set()
+        for message, future in futures:
+            for token, error in future.result().items():
+                if error is None:
+                    delivered.add(token)
+                    message.delivered.add(token)
+                elif error == INVALID_TOKEN:
+                    invalid.add(token)
+                    message.delivered.add(token)
+                elif results[message.id] is None:
+                    # A transient failure retries the message, but only to the tokens not yet reached
+                    results[message.id] = error
+
+        now = datetime.utcnow()
+        if invalid:
+            db.session.execute(
+                delete(UserDeviceToken).where(UserDeviceToken.firebase_device_token.in_(invalid)),
+                execution_options={'synchronize_session': False},
+            )
+            logger.info("Pruned %d unregistered device tokens", len(invalid))
+        if delivered:
+            db.session.execute(
+                update(UserDeviceToken).where(UserDeviceToken.firebase_device_token.in_(delivered))
+                .values(last_seen_date=now),
+                execution_options={'synchronize_session': False},
+            )
+        return results
+
+    def close(self):
+        """Wait for in-flight batches and stop the pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,50 @@
+"""
+Loader profiles for list and detail endpoints.
+
+Each profile is a tuple of loader options for ``query.options(*PROFILE)``
+that fetches every relationship the route serializes in the same round
+trip, so a route runs a fixed number of queries no matter how many rows
+it returns. ``contains_eager`` is used where the route already joins the
+related table; ``joinedload`` where it does not.
+"""
+from sqlalchemy.orm import contains_eager, joinedload, undefer
+from models import BloodRequest, BloodRequestResponse, HospitalBloodAvailability
+
+# GET /blood/requests (authenticated) and GET /blood/request/<id>
+BLOOD_REQUEST_DETAIL = (
+    contains_eager(BloodRequest.user),
+    contains_eager(BloodRequest.hospital),
+    contains_eager(BloodRequest.blood_group),
+    undefer(BloodRequest.responses_count),
+)
+
+# GET /blood/requests (anonymous) and GET /blood/my-requests
+BLOOD_REQUEST_SUMMARY = (
+    contains_eager(BloodRequest.hospital),
+    contains_eager(BloodRequest.blood_group),
+    undefer(BloodRequest.responses_count),
+)
+
+# GET /blood/requests/my
+HOSPITAL_BLOOD_REQUESTS = (
+    joinedload(BloodRequest.blood_group),
+)
+
+# GET /blood/my-responses and GET /blood/donations/my
+RESPONSE_WITH_REQUEST = (
+    contains_eager(BloodRequestResponse.blood_request).contains_eager(BloodRequest.hospital),
+    contains_eager(BloodRequestResponse.blood_request).contains_eager(BloodRequest.blood_group),
+)
+
+# GET /blood/request/<id>/responses and the responses of GET /blood/request/<id>
+RESPONSE_WITH_RESPONDER = (
+    contains_eager(BloodRequestResponse.user),
+)
+
+# GET /blood/donations
+DONATION_LIST = RESPONSE_WITH_REQUEST + RESPONSE_WITH_RESPONDER
+
+# GET /hospital/availability
+HOSPITAL_AVAILABILITY = (
+    contains_eager(HospitalBloodAvailability.blood_group),
+)
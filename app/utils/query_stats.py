@@ -0,0 +1,121 @@
+import heapq
+import logging
+import time
+from flask import current_app, g, has_app_context, has_request_context, request
+from sqlalchemy import event
+from models import db
+
+logger = logging.getLogger('app.sql')
+
+class RequestQueryStats:
+    """SQL statements issued while handling one request"""
+
+    def __init__(self, top_n=3):
+        self.top_n = top_n
+        self.count = 0
+        self.total_ms = 0.0
+        self._slowest = []  # min-heap of (duration_ms, sequence, statement)
+
+    def record(self, statement, duration_ms):
+        self.count += 1
+        self.total_ms += duration_ms
+        entry = (duration_ms, self.count, statement)
+        if len(self._slowest) < self.top_n:
+            heapq.heappush(self._slowest, entry)
+        elif duration_ms > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    @property
+    def slowest(self):
+        """The top_n slowest statements as (duration_ms, statement), slowest first"""
+        return [(duration, statement) for duration, _, statement in sorted(self._slowest, reverse=True)]
+
+def _short(statement, limit=500):
+    statement = ' '.join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + '...'
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started_at', []).append(time.perf_counter())
+
+def _handle_error(exception_context):
+    # after_cursor_execute never fires for a failed statement
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('query_started_at'):
+        connection.info['query_started_at'].pop()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started_at'].pop()
+    if not has_app_context():
+        return
+    duration_ms = (time.perf_counter() - started) * 1000
+
+    stats = g.get('query_stats')
+    if stats is not None:
+        stats.record(statement, duration_ms)
+
+    slow_query_ms = current_app.config.get('SLOW_QUERY_MS')
+    if slow_query_ms is not None and duration_ms >= slow_query_ms:
+        endpoint = request.endpoint if has_request_context() else None
+        logger.warning(
+            "slow_query duration_ms=%.1f endpoint=%s statement=%s",
+            duration_ms, endpoint, _short(statement),
+            extra={'duration_ms': round(duration_ms, 1), 'endpoint': endpoint, 'statement': _short(statement)}
+        )
+
+def get_request_query_stats():
+    """Query stats for the current request, or None outside a request or when disabled"""
+    return g.get('query_stats') if has_request_context() else None
+
+def init_app(app):
+    """
+    Time every statement on the app's engines, collect per-request totals
+    and report them in a Server-Timing header and a debug log line.
+    Statements slower than SLOW_QUERY_MS are logged at WARNING.
+    """
+    if not app.config.get('SQL_STATS_ENABLED', True):
+        return
+
+    top_n = app.config.get('SQL_STATS_TOP_N', 3)
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+            event.listen(engine, 'handle_error', _handle_error)
+
+    @app.before_request
+    def start_query_stats():
+        g.query_stats = RequestQueryStats(top_n)
+        g.request_started_at = time.perf_counter()
+
+    @app.after_request
+    def report_query_stats(response):
+        stats = g.pop('query_stats', None)
+        started = g.pop('request_started_at', None)
+        if stats is None or started is None:
+            return response
+        total_ms = (time.perf_counter() - started) * 1000
+
+        if app.config.get('SERVER_TIMING_ENABLED', True):
+            response.headers.add(
+                'Server-Timing', f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries"'
+            )
+            response.headers.add('Server-Timing', f'app;dur={total_ms:.1f}')
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "request_sql endpoint=%s status=%s queries=%d db_ms=%.1f total_ms=%.1f slowest_ms=%s",
+                request.endpoint, response.status_code, stats.count, stats.total_ms, total_ms,
+                ','.join(f'{duration:.1f}' for duration, _ in stats.slowest),
+                extra={
+                    'endpoint': request.endpoint,
+                    'status': response.status_code,
+                    'queries': stats.count,
+                    'db_ms': round(stats.total_ms, 1),
+                    'total_ms': round(total_ms, 1),
+                    'slowest': [
+                        {'duration_ms': round(duration, 1), 'statement': _short(statement)}
+                        for duration, statement in stats.slowest
+                    ],
+                }
+            )
+        return response
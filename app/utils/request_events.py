@@ -0,0 +1,206 @@
+"""
+In-process pub/sub of committed blood request changes, behind the
+Server-Sent Events feed at GET /blood/requests/stream.
+
+Writes are noted in session.info as they flush (BloodRequest inserts and
+status changes through mapper events; responses by ``upsert_response``)
+and published to the app's ``RequestEventBroker`` only once the
+transaction commits. The broker numbers events and keeps the most recent
+ones so a reconnecting client can resume from its Last-Event-ID.
+
+Each process has its own broker and sees only the writes it handles, so
+streams also poll blood_requests on updated_at (``changed_requests``) and
+send a ``changed`` event for every request written since the last poll,
+whichever worker wrote it. Event ids carry a per-process prefix, the
+broker sequence and the poll watermark: a client that reconnects to the
+same worker resumes both, one that reconnects to a different worker (or
+after a restart) gets a ``reset`` event telling it to re-fetch the list.
+"""
+import itertools
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import object_session
+from db import RoutingSession
+from models import db, BloodRequest
+from app.utils.pagination import changes_page, decode_cursor
+
+# Events seen during a flush wait in session.info under this key and are
+# published only once the transaction commits.
+_PENDING_KEY = 'request_events'
+
+def _pending(session):
+    return session.info.setdefault(_PENDING_KEY, [])
+
+def _event(kind, blood_request, **extra):
+    return {
+        'type': kind,
+        'blood_request_id': blood_request.blood_request_id,
+        'hospital_id': blood_request.hospital_id,
+        'blood_group_id': blood_request.blood_group_type,
+        'status': blood_request.status,
+        'at': datetime.utcnow(),
+        **extra,
+    }
+
+def note_response(session, blood_request, user_id, response_status):
+    """Queue a 'response' event; responses are upserted without the ORM, so writers call this"""
+    _pending(session).append(_event('response', blood_request, user_id=int(user_id), response_status=response_status))
+
+def _request_inserted(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        _pending(session).append(_event('created', target))
+
+def _request_updated(mapper, connection, target):
+    session = object_session(target)
+    if session is None:
+        return
+    history = inspect(target).attrs.status.history
+    if history.has_changes():
+        previous = history.deleted[0] if history.deleted else None
+        if previous != target.status:
+            _pending(session).append(_event('status', target, previous_status=previous))
+
+event.listen(BloodRequest, 'after_insert', _request_inserted)
+event.listen(BloodRequest, 'after_update', _request_updated)
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _publish_committed(session):
+    events = session.info.pop(_PENDING_KEY, None)
+    if events and has_app_context() and 'request_events' in current_app.extensions:
+        current_app.extensions['request_events'].publish(events)
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _discard_rolled_back(session):
+    session.info.pop(_PENDING_KEY, None)
+
+class RequestEventBroker:
+    """
+    Numbered, bounded history of published events with blocking waits.
+
+    Open streams are only counted, not queued to: each one remembers the
+    last sequence it sent and asks for anything newer, so a slow client
+    never holds up publishers and at most ``history_size`` events are kept
+    in memory.
+    """
+
+    def __init__(self, history_size=1000):
+        self.prefix = uuid.uuid4().hex[:8]
+        self._history = deque(maxlen=history_size)
+        self._sequence = itertools.count(1)
+        self._last = 0
+        self._changed = threading.Condition()
+        self.clients = 0
+
+    @property
+    def last(self):
+        """Sequence number of the newest event"""
+        return self._last
+
+    def subscribe(self, max_clients=None):
+        """Count an open stream; False when ``max_clients`` are already open (None for no limit)"""
+        with self._changed:
+            if max_clients is not None and self.clients >= max_clients:
+                return False
+            self.clients += 1
+            return True
+
+    def unsubscribe(self):
+        with self._changed:
+            self.clients -= 1
+
+    def publish(self, events):
+        with self._changed:
+            for payload in events:
+                self._last = next(self._sequence)
+                self._history.append((self._last, payload))
+            self._changed.notify_all()
+
+    def event_id(self, sequence, watermark=None):
+        event_id = f'{self.prefix}-{sequence}'
+        return f'{event_id}-{watermark}' if watermark else event_id
+
+    def position(self, last_event_id):
+        """
+        Sequence number to resume after for a Last-Event-ID header, or None
+        when the id is from another process or too old to resume from.
+        """
+        if not last_event_id:
+            return self._last
+        prefix, _, rest = last_event_id.partition('-')
+        sequence = rest.partition('-')[0]
+        if prefix != self.prefix or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        with self._changed:
+            oldest = self._history[0][0] if self._history else self._last + 1
+            if sequence > self._last or sequence < oldest - 1:
+                return None
+        return sequence
+
+    def wait(self, after, timeout):
+        """Events newer than ``after``, waiting up to ``timeout`` seconds for one"""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while self._last <= after:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                self._changed.wait(remaining)
+            return [(sequence, payload) for sequence, payload in self._history if sequence > after]
+
+def resume_watermark(last_event_id):
+    """The poll watermark carried by a Last-Event-ID, or None"""
+    parts = (last_event_id or '').split('-', 2)
+    if len(parts) < 3:
+        return None
+    try:
+        decode_cursor(parts[2])
+    except ValueError:
+        return None
+    return parts[2]
+
+def changed_requests(watermark, until, limit, blood_group_id=None, hospital_id=None):
+    """
+    'changed' payloads for blood requests written after ``watermark`` by any
+    process, up to ``until``. Returns ``(payloads, next_watermark, has_more)``.
+
+    Ends its read transaction before returning, so a stream never holds one
+    open while it waits between polls.
+    """
+    query = BloodRequest.query
+    if blood_group_id:
+        query = query.filter(BloodRequest.blood_group_type == blood_group_id)
+    if hospital_id:
+        query = query.filter(BloodRequest.hospital_id == hospital_id)
+    try:
+        rows, watermark, has_more = changes_page(
+            query, BloodRequest.updated_at, BloodRequest.blood_request_id, watermark, limit, until
+        )
+        payloads = [{**_event('changed', row), 'at': row.updated_at} for row in rows]
+    finally:
+        db.session.rollback()
+    return payloads, watermark, has_more
+
+def matches(payload, status=None, blood_group_id=None, hospital_id=None):
+    """Apply the GET /blood/requests filters to an event; a status change matches either side"""
+    if status and status not in (payload['status'], payload.get('previous_status')):
+        return False
+    if blood_group_id and str(payload['blood_group_id']) != str(blood_group_id):
+        return False
+    if hospital_id and str(payload['hospital_id']) != str(hospital_id):
+        return False
+    return True
+
+def init_app(app):
+    """Attach an empty event broker to the app"""
+    app.extensions['request_events'] = RequestEventBroker(app.config.get('SSE_HISTORY_SIZE', 1000))
+
+def get_request_event_broker():
+    """Get the request event broker for the current app"""
+    return current_app.extensions['request_events']
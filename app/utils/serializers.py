@@ -0,0 +1,165 @@
+"""
+Compiled row serializers for the list and detail endpoints.
+
+A ``Serializer`` is declared once as an ordered mapping of output key to
+attribute path (``'hospital.hospital_name'``) or ``Nested`` serializer,
+and compiled into a plain Python function that builds the dict from the
+instances' loaded state. Missing relationships along a path give None.
+Dates and datetimes are left as objects; the app's JSON provider writes
+them as ISO 8601, exactly as the hand-written ``.isoformat()`` calls did.
+"""
+from models import BloodRequest, BloodRequestResponse
+
+class Nested:
+    """Serialize the object at ``path`` with another serializer"""
+
+    def __init__(self, path, serializer):
+        self.path = path
+        self.serializer = serializer
+
+class Serializer:
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = dict(fields)
+        self._direct = self._compile(direct=True)
+        self._safe = self._compile(direct=False)
+
+    def __call__(self, obj):
+        try:
+            return self._direct(obj)
+        except KeyError:
+            return self._safe(obj)
+
+    def many(self, objs):
+        """Serialize an iterable of rows into a list"""
+        direct, safe = self._direct, self._safe
+        result = []
+        append = result.append
+        for obj in objs:
+            try:
+                append(direct(obj))
+            except KeyError:
+                append(safe(obj))
+        return result
+
+    def _compile(self, direct):
+        """
+        Generate the serializing function. The direct variant reads loaded
+        values straight from each instance's __dict__, skipping attribute
+        instrumentation, and raises KeyError if anything it needs is not
+        loaded; the safe variant uses normal attribute access (and so may
+        lazy load).
+        """
+        namespace = {}
+        lines = ['def serialize(obj):']
+        temps = {'': 'obj'}
+
+        def get(owner, attr):
+            return f"{owner}.__dict__[{attr!r}]" if direct else f'{owner}.{attr}'
+
+        def ref(prefix):
+            # Local holding the object at ``prefix``, None-safe, assigned once
+            if prefix not in temps:
+                parent, _, attr = prefix.rpartition('.')
+                parent_ref = ref(parent)
+                name = f'_t{len(temps)}'
+                if parent_ref == 'obj':
+                    lines.append(f'    {name} = {get(parent_ref, attr)}')
+                else:
+                    lines.append(f'    {name} = None if {parent_ref} is None else {get(parent_ref, attr)}')
+                temps[prefix] = name
+            return temps[prefix]
+
+        items = []
+        for index, (key, spec) in enumerate(self.fields.items()):
+            if isinstance(spec, Nested):
+                name = f'_n{index}'
+                namespace[name] = spec.serializer
+                target = ref(spec.path)
+                items.append(f'{key!r}: None if {target} is None else {name}({target})')
+                continue
+            parent, _, attr = spec.rpartition('.')
+            owner = ref(parent)
+            if owner == 'obj':
+                items.append(f'{key!r}: {get(owner, attr)}')
+            else:
+                items.append(f'{key!r}: None if {owner} is None else {get(owner, attr)}')
+        lines.append('    return {' + ', '.join(items) + '}')
+        exec(compile('\n'.join(lines), f'<serializer {self.model.__name__}>', 'exec'), namespace)
+        return namespace['serialize']
+
+def _same(*names):
+    return {name: name for name in names}
+
+# GET /blood/requests (authenticated)
+BLOOD_REQUEST_DETAIL = Serializer(BloodRequest, {
+    'blood_request_id': 'blood_request_id',
+    'user_id': 'user_id',
+    'user_name': 'user.user_name',
+    'hospital_id': 'hospital_id',
+    'hospital_name': 'hospital.hospital_name',
+    'blood_group_type': 'blood_group_type',
+    'blood_group_name': 'blood_group.blood_group_name',
+    **_same('no_of_units', 'patient_name', 'patient_contact_email', 'patient_contact_phone_number',
+            'required_by_date', 'description', 'status', 'from_date', 'to_date', 'created_at', 'updated_at',
+            'responses_count'),
+})
+
+# GET /blood/requests (anonymous)
+BLOOD_REQUEST_PUBLIC = Serializer(BloodRequest, {
+    'blood_request_id': 'blood_request_id',
+    'hospital_id': 'hospital_id',
+    'hospital_name': 'hospital.hospital_name',
+    'blood_group_type': 'blood_group_type',
+    'blood_group_name': 'blood_group.blood_group_name',
+    **_same('no_of_units', 'required_by_date', 'description', 'status', 'from_date', 'created_at',
+            'responses_count'),
+})
+
+# GET /blood/my-requests
+BLOOD_REQUEST_SUMMARY = Serializer(BloodRequest, {
+    'blood_request_id': 'blood_request_id',
+    'hospital_name': 'hospital.hospital_name',
+    'blood_group_name': 'blood_group.blood_group_name',
+    **_same('no_of_units', 'patient_name', 'required_by_date', 'status', 'created_at', 'responses_count'),
+})
+
+# The 'blood_request' object inside response listings
+BLOOD_REQUEST_BRIEF = Serializer(BloodRequest, {
+    'hospital_name': 'hospital.hospital_name',
+    'blood_group_name': 'blood_group.blood_group_name',
+    **_same('no_of_units', 'patient_name', 'required_by_date', 'status', 'description'),
+})
+
+# GET /blood/my-responses
+RESPONSE_WITH_REQUEST = Serializer(BloodRequestResponse, {
+    **_same('blood_requests_response_id', 'blood_request_id', 'response_status', 'message', 'from_date',
+            'responded_date', 'to_date', 'created_at', 'updated_at'),
+    'blood_request': Nested('blood_request', BLOOD_REQUEST_BRIEF),
+})
+
+# GET /blood/donations/my
+SCHEDULED_DONATION = Serializer(BloodRequestResponse, {
+    **_same('blood_requests_response_id', 'blood_request_id', 'scheduled_datetime', 'response_status', 'message',
+            'from_date', 'responded_date', 'to_date', 'created_at', 'updated_at'),
+    'blood_request': Nested('blood_request', BLOOD_REQUEST_BRIEF),
+})
+
+# GET /blood/donations
+DONATION_LIST = Serializer(BloodRequestResponse, {
+    **_same('blood_requests_response_id', 'blood_request_id', 'scheduled_datetime', 'response_status', 'message',
+            'from_date', 'to_date', 'created_at', 'updated_at'),
+    'patient_name': 'blood_request.patient_name',
+    'no_of_units': 'blood_request.no_of_units',
+    'required_by_date': 'blood_request.required_by_date',
+    'description': 'blood_request.description',
+    'blood_request_status': 'blood_request.status',
+    'hospital_id': 'blood_request.hospital_id',
+    'hospital_name': 'blood_request.hospital.hospital_name',
+    'blood_group_type': 'blood_request.blood_group_type',
+    'blood_group_name': 'blood_request.blood_group.blood_group_name',
+    'donor_id': 'user_id',
+    'donor_name': 'user.user_name',
+    'donor_email': 'user.user_email',
+    'donor_phone': 'user.user_phone_number',
+})
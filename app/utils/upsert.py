@@ -0,0 +1,29 @@
+from sqlalchemy import literal_column
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db
+
+# Dialects whose insert() supports ON CONFLICT ... DO UPDATE ... RETURNING
+_INSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+def _dialect(model):
+    return db.session.get_bind(mapper=model.__mapper__).dialect.name
+
+def insert_for(model):
+    """
+    insert() construct for ``model`` from the dialect of the engine it is
+    bound to, so callers can add on_conflict_do_update()/do_nothing().
+    """
+    dialect = _dialect(model)
+    if dialect not in _INSERTS:
+        raise NotImplementedError(f'ON CONFLICT upserts are not supported on {dialect}')
+    return _INSERTS[dialect](model)
+
+def inserted_flag(model):
+    """
+    Column for an upsert's RETURNING that is true when the row was inserted
+    rather than updated, or None where the dialect cannot tell. PostgreSQL
+    leaves xmax at 0 only on a row version created by an INSERT.
+    """
+    if _dialect(model) == 'postgresql':
+        return literal_column('xmax = 0').label('inserted')
+    return None
@@ -1,3 +1,30 @@
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
 
-db = SQLAlchemy()
+REPLICA_BIND = 'replica'
+
+class RoutingSession(Session):
+    """
+    Session that sends statements to the 'replica' bind while
+    ``info['use_replica']`` is set, unless it has already written in this
+    request. Flushes and everything else go to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and self.info.get('use_replica') and not self.info.get('wrote')
+                and not self._flushing and REPLICA_BIND in self._db.engines):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_written(session, flush_context):
+    session.info['wrote'] = True
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _mark_statement_write(orm_execute_state):
+    # insert()/update()/delete() statements run without a flush
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info['wrote'] = True
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
@@ -0,0 +1,36 @@
+"""
+Gunicorn settings for running run:app with several workers.
+
+    PROMETHEUS_MULTIPROC_DIR=/tmp/donor-metrics gunicorn -c gunicorn.conf.py run:app
+
+With PROMETHEUS_MULTIPROC_DIR set, each worker writes its metrics to that
+directory and /metrics reports the sum over all workers. The directory is
+emptied when the master starts so counters from a previous run are not merged in.
+
+Workers are threaded (gthread) because each open /blood/requests/stream
+holds a thread for up to SSE_MAX_STREAM_SECONDS. SSE_MAX_CLIENTS is capped
+below the thread count so streams can never take every thread of a worker;
+by default they get half.
+"""
+import os
+import shutil
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', '4'))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', '32'))
+
+# Read by config.py when the workers import the app
+sse_max_clients = int(os.getenv('SSE_MAX_CLIENTS', str(threads // 2)))
+os.environ['SSE_MAX_CLIENTS'] = str(max(0, min(sse_max_clients, threads - 1)))
+
+def on_starting(server):
+    metrics_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.makedirs(metrics_dir, exist_ok=True)
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,82 @@
+"""Indexes for the blood request, response and login query patterns
+
+Revision ID: 3f2a9c1d7b4e
+Revises:
+Create Date: 2026-10-16 12:00:00.000000
+
+Databases created from DonorNearMeDDL.txt only have primary keys, while
+ones created with db.create_all() already have some of these, so each
+index is only created when no index of the same name exists. Duplicate
+(blood_request_id, user_id) responses are removed, keeping the earliest,
+before the unique index is built.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c1d7b4e'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+SCHEDULED = sa.text('scheduled_datetime IS NOT NULL')
+
+INDEXES = [
+    ('ix_blood_requests_created_at_id', 'blood_requests', ['created_at', 'blood_request_id'], {}),
+    ('ix_blood_requests_status_created_at', 'blood_requests', ['status', 'created_at', 'blood_request_id'], {}),
+    ('ix_blood_requests_hospital_id_status', 'blood_requests', ['hospital_id', 'status'], {}),
+    ('ix_blood_requests_user_id_created_at', 'blood_requests', ['user_id', 'created_at'], {}),
+    ('ix_blood_requests_blood_group_type_status', 'blood_requests', ['blood_group_type', 'status'], {}),
+    ('uq_blood_requests_responses_request_user', 'blood_requests_responses', ['blood_request_id', 'user_id'],
+     {'unique': True}),
+    ('ix_blood_requests_responses_user_id', 'blood_requests_responses', ['user_id'], {}),
+    ('ix_blood_requests_responses_scheduled', 'blood_requests_responses', ['user_id', 'scheduled_datetime'],
+     {'postgresql_where': SCHEDULED, 'sqlite_where': SCHEDULED}),
+]
+
+
+def _existing_indexes(table):
+    inspector = sa.inspect(op.get_bind())
+    names = {index['name'] for index in inspector.get_indexes(table)}
+    names.update(constraint['name'] for constraint in inspector.get_unique_constraints(table))
+    return names
+
+
+def _has_unique_on(table, column):
+    inspector = sa.inspect(op.get_bind())
+    return any(
+        entry['column_names'] == [column]
+        for entry in inspector.get_unique_constraints(table)
+        + [index for index in inspector.get_indexes(table) if index.get('unique')]
+    )
+
+
+def upgrade():
+    op.execute(
+        """
+        DELETE FROM blood_requests_responses
+        WHERE blood_requests_response_id NOT IN (
+            SELECT MIN(blood_requests_response_id)
+            FROM blood_requests_responses
+            GROUP BY blood_request_id, user_id
+        )
+        """
+    )
+
+    for name, table, columns, kwargs in INDEXES:
+        if name not in _existing_indexes(table):
+            op.create_index(name, table, columns, **kwargs)
+
+    # create_all() already makes user_email unique; DDL-built databases do not
+    if not _has_unique_on('users', 'user_email'):
+        op.create_index('ix_users_user_email', 'users', ['user_email'], unique=True)
+
+
+def downgrade():
+    if 'ix_users_user_email' in _existing_indexes('users'):
+        op.drop_index('ix_users_user_email', table_name='users')
+    for name, table, _, _ in reversed(INDEXES):
+        if name in _existing_indexes(table):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,39 @@
+"""Daily request and donation rollups
+
+Revision ID: 8b41d2e6c0a5
+Revises: 3f2a9c1d7b4e
+Create Date: 2026-10-16 15:00:00.000000
+
+Counters start empty; fill them with scripts/backfill_rollups.py.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b41d2e6c0a5'
+down_revision = '3f2a9c1d7b4e'
+branch_labels = None
+depends_on = None
+
+COUNTERS = ('requests_created', 'requests_accepted', 'requests_completed', 'requests_cancelled', 'donations_scheduled')
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table('daily_request_rollups'):
+        return
+    op.create_table(
+        'daily_request_rollups',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('hospital_id', sa.Integer(), sa.ForeignKey('hospitals.hospital_id'), nullable=False),
+        sa.Column('blood_group_id', sa.Integer(), sa.ForeignKey('lookup_blood_groups.blood_group_id'), nullable=False),
+        *[sa.Column(counter, sa.Integer(), nullable=False, server_default='0') for counter in COUNTERS],
+        sa.PrimaryKeyConstraint('day', 'hospital_id', 'blood_group_id'),
+    )
+    op.create_index('ix_daily_request_rollups_hospital_id_day', 'daily_request_rollups', ['hospital_id', 'day'])
+
+
+def downgrade():
+    op.drop_index('ix_daily_request_rollups_hospital_id_day', table_name='daily_request_rollups')
+    op.drop_table('daily_request_rollups')
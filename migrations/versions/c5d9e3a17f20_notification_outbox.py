@@ -0,0 +1,46 @@
+"""Notification outbox
+
+Revision ID: c5d9e3a17f20
+Revises: 8b41d2e6c0a5
+Create Date: 2026-10-17 10:00:00.000000
+
+Drained by scripts/notification_worker.py.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d9e3a17f20'
+down_revision = '8b41d2e6c0a5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table('notification_outbox'):
+        return
+    op.create_table(
+        'notification_outbox',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('channel', sa.String(20), nullable=False),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.user_id'), nullable=True),
+        sa.Column('recipient', sa.String(255), nullable=True),
+        sa.Column('subject', sa.String(255), nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=True),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_notification_outbox_status_next_attempt_at', 'notification_outbox',
+                    ['status', 'next_attempt_at', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_notification_outbox_status_next_attempt_at', table_name='notification_outbox')
+    op.drop_table('notification_outbox')
@@ -0,0 +1,32 @@
+"""Index blood requests on updated_at for delta sync
+
+Revision ID: e7a4b8c2d913
+Revises: c5d9e3a17f20
+Create Date: 2026-10-17 14:00:00.000000
+
+Rows loaded without an updated_at (for example from DonorNearMeDDL.txt
+seed data) get their created_at, so a first sync includes them.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a4b8c2d913'
+down_revision = 'c5d9e3a17f20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "UPDATE blood_requests SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP) WHERE updated_at IS NULL"
+    )
+    existing = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('blood_requests')}
+    if 'ix_blood_requests_updated_at_id' not in existing:
+        op.create_index('ix_blood_requests_updated_at_id', 'blood_requests', ['updated_at', 'blood_request_id'])
+
+
+def downgrade():
+    op.drop_index('ix_blood_requests_updated_at_id', table_name='blood_requests')
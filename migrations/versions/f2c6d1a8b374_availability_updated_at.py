@@ -0,0 +1,29 @@
+"""Track when hospital blood availability rows change
+
+Revision ID: f2c6d1a8b374
+Revises: e7a4b8c2d913
+Create Date: 2026-10-17 16:00:00.000000
+
+The /hospital/availability ETag is built from this column; existing rows
+start out NULL.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c6d1a8b374'
+down_revision = 'e7a4b8c2d913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('hospital_blood_availability')}
+    if 'updated_at' not in columns:
+        op.add_column('hospital_blood_availability', sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('hospital_blood_availability', 'updated_at')
@@ -5,3 +5,6 @@ from .lookup import LookupRole, LookupBloodGroup
 from .hospital import Hospital, HospitalBloodAvailability
 from .user import User, UserHospitalAdminLineage
 from .blood_request import BloodRequest, BloodRequestResponse
+from .analytics import DailyRequestRollup
+from .device_token import UserDeviceToken
+from .notification import Notification, NotificationOutbox
@@ -0,0 +1,25 @@
+from db import db
+
+class DailyRequestRollup(db.Model):
+    """
+    Per day, hospital and blood group counters for requests and donations.
+    Maintained by app.controllers.rollups as the rows they count are written.
+    """
+    __tablename__ = 'daily_request_rollups'
+
+    day = db.Column(db.Date, primary_key=True)
+    hospital_id = db.Column(db.Integer, db.ForeignKey('hospitals.hospital_id'), primary_key=True)
+    blood_group_id = db.Column(db.Integer, db.ForeignKey('lookup_blood_groups.blood_group_id'), primary_key=True)
+    requests_created = db.Column(db.Integer, nullable=False, default=0)
+    requests_accepted = db.Column(db.Integer, nullable=False, default=0)
+    requests_completed = db.Column(db.Integer, nullable=False, default=0)
+    requests_cancelled = db.Column(db.Integer, nullable=False, default=0)
+    donations_scheduled = db.Column(db.Integer, nullable=False, default=0)
+
+    # Range reads for one hospital; the primary key serves all-hospital ranges
+    __table_args__ = (
+        db.Index('ix_daily_request_rollups_hospital_id_day', 'hospital_id', 'day'),
+    )
+
+    def __repr__(self):
+        return f'<DailyRequestRollup {self.day} {self.hospital_id} {self.blood_group_id}>'
@@ -19,6 +19,17 @@ class BloodRequest(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Matched to the list filters, the (created_at, id) keyset ordering and
+    # the (updated_at, id) delta sync; kept in step with migrations/versions
+    __table_args__ = (
+        db.Index('ix_blood_requests_created_at_id', 'created_at', 'blood_request_id'),
+        db.Index('ix_blood_requests_status_created_at', 'status', 'created_at', 'blood_request_id'),
+        db.Index('ix_blood_requests_hospital_id_status', 'hospital_id', 'status'),
+        db.Index('ix_blood_requests_user_id_created_at', 'user_id', 'created_at'),
+        db.Index('ix_blood_requests_blood_group_type_status', 'blood_group_type', 'status'),
+        db.Index('ix_blood_requests_updated_at_id', 'updated_at', 'blood_request_id'),
+    )
+
     # Relationships
     user = db.relationship('User', backref='blood_requests')
     hospital = db.relationship('Hospital', backref='blood_requests')
@@ -73,6 +84,17 @@ class BloodRequestResponse(db.Model):
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
     updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
 
+    __table_args__ = (
+        # One response per donor per request; also serves the per-request lookups and counts
+        db.Index('uq_blood_requests_responses_request_user', 'blood_request_id', 'user_id', unique=True),
+        db.Index('ix_blood_requests_responses_user_id', 'user_id'),
+        db.Index(
+            'ix_blood_requests_responses_scheduled', 'user_id', 'scheduled_datetime',
+            postgresql_where=db.text('scheduled_datetime IS NOT NULL'),
+            sqlite_where=db.text('scheduled_datetime IS NOT NULL'),
+        ),
+    )
+
     blood_request = db.relationship('BloodRequest', backref='responses')
     user = db.relationship('User', backref='responses')
 
@@ -83,4 +105,14 @@ class BloodRequestResponse(db.Model):
         self.from_date = from_date
         self.scheduled_datetime = scheduled_datetime
         for key, value in kwargs.items():
-            setattr(self, key, value)
\ No newline at end of file
+            setattr(self, key, value)
+
+# Number of responses computed in SQL. Deferred so plain loads skip it; list
+# endpoints opt in with undefer() instead of loading the whole collection.
+BloodRequest.responses_count = db.column_property(
+    db.select(db.func.count(BloodRequestResponse.blood_requests_response_id))
+    .where(BloodRequestResponse.blood_request_id == BloodRequest.blood_request_id)
+    .correlate_except(BloodRequestResponse)
+    .scalar_subquery(),
+    deferred=True
+)
@@ -43,6 +43,8 @@ class HospitalBloodAvailability(db.Model):
     no_of_units = db.Column(db.Integer, nullable=False)
     from_date = db.Column(db.Date, nullable=False)
     to_date = db.Column(db.Date, nullable=True)
+    # Drives the /hospital/availability validator; raw SQL writers leave it NULL
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     hospital = db.relationship('Hospital', backref='blood_availabilities')
     blood_group = db.relationship('LookupBloodGroup', backref='hospital_availabilities')
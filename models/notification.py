@@ -4,10 +4,43 @@ from datetime import datetime
 class Notification(db.Model):
     __tablename__ = 'notifications'
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
     message = db.Column(db.String(255), nullable=False)
     is_read = db.Column(db.Boolean, default=False)
     action_url = db.Column(db.String(255), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-    user = db.relationship('User', backref='notifications') 
\ No newline at end of file
+    user = db.relationship('User', backref='notifications')
+
+
+class NotificationOutbox(db.Model):
+    """
+    Email and push messages waiting to be delivered. Rows are written in
+    the same transaction as the change they announce and drained by the
+    notification worker (scripts/notification_worker.py).
+    """
+    __tablename__ = 'notification_outbox'
+
+    id = db.Column(db.Integer, primary_key=True)
+    channel = db.Column(db.String(20), nullable=False)  # 'email' or 'push'
+    # Either a user, whose address or device tokens are looked up at send
+    # time, or a literal address such as a hospital's email
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=True)
+    recipient = db.Column(db.String(255), nullable=True)
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    payload = db.Column(db.JSON, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, sent, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    # The worker's claim query: pending rows that are due, oldest first
+    __table_args__ = (
+        db.Index('ix_notification_outbox_status_next_attempt_at', 'status', 'next_attempt_at', 'id'),
+    )
+
+    def __repr__(self):
+        return f'<NotificationOutbox {self.id} {self.channel} {self.status}>'
@@ -1,18 +1,14 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from werkzeug.security import generate_password_hash, check_password_hash
 from db import db
 from models.user import User
 from models.lookup import LookupRole
 from datetime import datetime, timedelta
 import logging
-import bcrypt
+from app.utils.password_hashing import hash_password, verify_password, HashingBusy, RETRY_AFTER_SECONDS
 
 auth_bp = Blueprint('auth', __name__)
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
-
 # Role mapping dictionary
 ROLE_MAPPING = {
     "super_admin": 0,
@@ -37,17 +33,12 @@ def map_role_to_id(role_name):
 def check_password(password_hash, password):
     """
     Check password against hash, supporting multiple hash methods.
+    HashingBusy is left for the caller to turn into a 503.
     """
     try:
-        # Try werkzeug hash first
-        if password_hash.startswith('pbkdf2:') or password_hash.startswith('scrypt:'):
-            return check_password_hash(password_hash, password)
-        # Try bcrypt hash
-        elif password_hash.startswith('$2b$') or password_hash.startswith('$2a$'):
-            return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
-        # Fallback for plain text (development only)
-        else:
-            return password_hash == password
+        return verify_password(password_hash, password)[0]
+    except HashingBusy:
+        raise
     except Exception as e:
         logging.error(f"Password check error: {e}")
         return False
@@ -97,8 +88,12 @@ def register():
         logging.error(f"Phone number already exists: {user_phone_number}")
         return jsonify({'message': 'Phone number already exists'}), 409
 
-    # Hash the password using bcrypt
-    password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    # Hash the password on the shared hashing pool
+    try:
+        password_hash = hash_password(password)
+    except HashingBusy:
+        logging.warning("Password hashing pool is saturated")
+        return jsonify({'message': 'Server busy, please retry'}), 503, {'Retry-After': str(RETRY_AFTER_SECONDS)}
 
     # Create new user
     new_user = User(
@@ -153,7 +148,13 @@ def login():
         return jsonify({'success': False, 'message': 'Hospital admins must use the hospital admin login page.'}), 403
 
     # Use the new password check function
-    if not check_password(user.password, password):
+    try:
+        password_ok = check_password(user.password, password)
+    except HashingBusy:
+        logging.warning("Password hashing pool is saturated")
+        return jsonify({'success': False, 'message': 'Server busy, please retry'}), 503, {'Retry-After': str(RETRY_AFTER_SECONDS)}
+
+    if not password_ok:
         logging.error("Invalid password")
         return jsonify({'success': False, 'message': 'Invalid password'}), 401
 
@@ -213,7 +214,13 @@ def hospital_admin_login():
         logging.error(f"Hospital admin not found or not authorized for email: {user_email}")
         return jsonify({'success': False, 'message': 'Unauthorized: Only hospital admins can login here'}), 401
 
-    if not check_password(user.password, password):
+    try:
+        password_ok = check_password(user.password, password)
+    except HashingBusy:
+        logging.warning("Password hashing pool is saturated")
+        return jsonify({'success': False, 'message': 'Server busy, please retry'}), 503, {'Retry-After': str(RETRY_AFTER_SECONDS)}
+
+    if not password_ok:
         logging.error("Invalid password for hospital admin login")
         return jsonify({'success': False, 'message': 'Invalid password'}), 401
 
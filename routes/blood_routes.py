@@ -6,12 +6,18 @@ from models.user import User
 from models.hospital import Hospital
 from models.lookup import LookupBloodGroup
 from datetime import datetime, date, timedelta
-from sqlalchemy import and_
 from schemas import BloodRequestSchema, BloodRequestResponseSchema
+from app.controllers.blood_responses import upsert_response
+from app.controllers.rollups import record_donation_scheduled
+from app.controllers.notifications import (notify_donation_scheduled, notify_new_blood_request,
+                                           notify_response_accepted)
 from marshmallow import ValidationError
+import logging
 
 blood_bp = Blueprint('blood', __name__)
 
+logger = logging.getLogger(__name__)
+
 # Initialize schemas
 blood_request_schema = BloodRequestSchema()
 blood_request_response_schema = BloodRequestResponseSchema()
@@ -20,84 +26,60 @@ blood_request_response_schema = BloodRequestResponseSchema()
 @blood_bp.route('/request', methods=['POST'])
 @jwt_required()
 def create_blood_request():
-    print("\n" + "="*50)
-    print("CREATE BLOOD REQUEST ENDPOINT CALLED")
-    print("="*50)
-    
     try:
         # Get current user ID from JWT with better error handling
         try:
             current_user_id = get_jwt_identity()
-            print(f"[DEBUG] JWT identity raw: {current_user_id} (type: {type(current_user_id)})")
             
             # Convert to integer if it's a string
             if isinstance(current_user_id, str):
                 current_user_id = int(current_user_id)
-            
-            print(f"[DEBUG] Current user ID processed: {current_user_id} (type: {type(current_user_id)})")
         except Exception as jwt_error:
-            print(f"[DEBUG] JWT Error: {jwt_error}")
+            logger.info("JWT identity error: %s", jwt_error)
             return jsonify({'error': f'JWT authentication failed: {str(jwt_error)}'}), 401
         
         # Get request data
         data = request.get_json()
-        print(f"[DEBUG] Received raw data: {data}")
-        print(f"[DEBUG] Request headers: {dict(request.headers)}")
-        print(f"[DEBUG] Request method: {request.method}")
-        print(f"[DEBUG] Request URL: {request.url}")
+        logger.debug("Create blood request from user %s: %s", current_user_id, data)
         
         if not data:
-            print("[DEBUG] No data provided")
             return jsonify({'error': 'No data provided'}), 400
         
-        # Log all required fields
-        required_fields = ['hospital_id', 'blood_group_type', 'no_of_units', 'patient_name', 'required_by_date']
-        for field in required_fields:
-            print(f"[DEBUG] {field}: {data.get(field)} (type: {type(data.get(field))})")
-        
         # Validate input data using Marshmallow schema
         try:
             validated_data = blood_request_schema.load(data)
-            print(f"[DEBUG] Validated data: {validated_data}")
         except ValidationError as err:
-            print(f"[DEBUG] Validation error: {err.messages}")
+            logger.debug("Validation error: %s", err.messages)
             return jsonify({'error': 'Validation failed', 'details': err.messages}), 422
         except Exception as schema_error:
-            print(f"[DEBUG] Schema error: {schema_error}")
+            logger.exception("Schema error")
             return jsonify({'error': f'Schema validation failed: {str(schema_error)}'}), 500
         
         # Get hospital_id from request body
         try:
             hospital_id = int(validated_data['hospital_id'])
-            print(f"[DEBUG] Hospital ID: {hospital_id}")
         except (ValueError, TypeError, KeyError) as e:
-            print(f"[DEBUG] Hospital ID conversion error: {e}")
             return jsonify({'error': f'Invalid or missing hospital_id: {str(e)}'}), 400
         
         # Validate hospital exists
         try:
             hospital_obj = Hospital.query.get(hospital_id)
-            print(f"[DEBUG] Hospital object: {hospital_obj}")
             if not hospital_obj:
-                print(f"[DEBUG] Hospital with ID {hospital_id} not found")
                 available_hospitals = Hospital.query.all()
                 hospital_names = [h.hospital_name for h in available_hospitals]
-                print(f"[DEBUG] Available hospitals: {hospital_names}")
                 return jsonify({
                     'error': f'Hospital with ID {hospital_id} not found. Available hospitals: {", ".join(hospital_names)}'
                 }), 404
         except Exception as hospital_error:
-            print(f"[DEBUG] Hospital query error: {hospital_error}")
+            logger.exception("Hospital query error")
             return jsonify({'error': f'Hospital validation failed: {str(hospital_error)}'}), 500
         
         # Handle blood group type
         blood_group_type = validated_data['blood_group_type']
-        print(f"[DEBUG] Blood group type received: {blood_group_type} (type: {type(blood_group_type)})")
         
         try:
             if isinstance(blood_group_type, int):
                 blood_group_id = blood_group_type
-                print(f"[DEBUG] Using blood group ID: {blood_group_id}")
             else:
                 # If it's a string, look up the blood group by name
                 blood_group = LookupBloodGroup.query.filter(
@@ -105,11 +87,9 @@ def create_blood_request():
                 ).first()
                 if blood_group:
                     blood_group_id = blood_group.blood_group_id
-                    print(f"[DEBUG] Found blood group {blood_group_type} with ID: {blood_group_id}")
                 else:
                     available_blood_groups = LookupBloodGroup.query.all()
                     blood_group_names = [bg.blood_group_name for bg in available_blood_groups]
-                    print(f"[DEBUG] Available blood groups: {blood_group_names}")
                     return jsonify({
                         'error': f'Blood group "{blood_group_type}" not found. Available blood groups: {", ".join(blood_group_names)}'
                     }), 404
@@ -124,16 +104,13 @@ def create_blood_request():
                 }), 404
             
         except Exception as blood_group_error:
-            print(f"[DEBUG] Blood group processing error: {blood_group_error}")
+            logger.exception("Blood group processing error")
             return jsonify({'error': f'Blood group validation failed: {str(blood_group_error)}'}), 500
         
         # Normalize status
         status = validated_data.get('status', 'pending').lower()
         if status not in ['pending', 'accepted', 'cancelled', 'completed']:
             status = 'pending'
-        print(f"[DEBUG] Final status: {status}")
-        
-        print(f"[DEBUG] Creating blood request with user_id: {current_user_id}")
         
         # Create the blood request
         try:
@@ -151,12 +128,11 @@ def create_blood_request():
                 from_date=date.today()
             )
             
-            print(f"[DEBUG] Blood request object created: {blood_request}")
-            
             db.session.add(blood_request)
+            notify_new_blood_request(blood_request)
             db.session.commit()
             
-            print(f"[DEBUG] Successfully created blood request with ID: {blood_request.blood_request_id}")
+            logger.info("Created blood request %s for user %s", blood_request.blood_request_id, current_user_id)
             
             return jsonify({
                 'success': True,
@@ -173,21 +149,13 @@ def create_blood_request():
             
         except Exception as creation_error:
             db.session.rollback()
-            print(f"[DEBUG] Error creating blood request object: {creation_error}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error creating blood request")
             return jsonify({'error': f'Failed to create blood request: {str(creation_error)}'}), 500
         
     except Exception as e:
         db.session.rollback()
-        print(f"[DEBUG] Unexpected error in create_blood_request: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unexpected error in create_blood_request")
         return jsonify({'error': f'Unexpected error: {str(e)}'}), 500
-    finally:
-        print("="*50)
-        print("CREATE BLOOD REQUEST ENDPOINT FINISHED")
-        print("="*50 + "\n")
 
 # Alias endpoint for /blood-requests (to support frontend)
 @blood_bp.route('/blood-requests', methods=['POST'])
@@ -453,35 +421,22 @@ def respond_to_blood_request(request_id):
         if request_obj.user_id == current_user_id:
             return jsonify({'error': 'Cannot respond to your own request'}), 400
         
-        # Check if user already responded
-        existing_response = BloodRequestResponse.query.filter(
-            and_(
-                BloodRequestResponse.blood_request_id == request_id,
-                BloodRequestResponse.user_id == current_user_id
-            )
-        ).first()
-        
-        if existing_response:
-            return jsonify({'error': 'You have already responded to this request'}), 400
-        
-        # Create response with all required fields
-        response = BloodRequestResponse(
-            blood_request_id=request_id,
-            user_id=current_user_id,
+        # Insert the response; the unique (request, user) index rejects a second one
+        response, created = upsert_response(
+            request_id, current_user_id,
             response_status=validated_data['response_status'],
-            message=validated_data.get('message'),
-            from_date=date.today(),
-            responded_date=date.today(),
-            to_date=None,  # Will be set when response is completed/cancelled
-            created_at=datetime.now(),
-            updated_at=datetime.now()
+            message=validated_data.get('message')
         )
-        
-        db.session.add(response)
+        if not created:
+            db.session.rollback()
+            return jsonify({'error': 'You have already responded to this request'}), 400
+        # Read before commit expires the instance
+        response_id = response.blood_requests_response_id
         
         # Update request status based on response
         if validated_data['response_status'] == 'accepted':
             request_obj.status = 'accepted'
+            notify_response_accepted(request_obj)
         elif validated_data['response_status'] == 'declined':
             # Keep request as pending if declined, so others can still respond
             pass
@@ -490,8 +445,8 @@ def respond_to_blood_request(request_id):
         
         return jsonify({
             'message': 'Response submitted successfully',
-            'response_id': response.blood_requests_response_id,
-            'response_status': response.response_status,
+            'response_id': response_id,
+            'response_status': validated_data['response_status'],
             'blood_request_id': request_id
         }), 201
         
@@ -706,44 +661,40 @@ def schedule_donation():
         if blood_request.user_id == current_user_id:
             return jsonify({'error': 'Cannot respond to your own request'}), 400
         
-        # Check if user has already responded to this request
-        existing_response = BloodRequestResponse.query.filter_by(
-            blood_request_id=request_id,
-            user_id=current_user_id
-        ).first()
+        try:
+            if isinstance(scheduled_datetime, str):
+                scheduled_datetime = datetime.fromisoformat(scheduled_datetime.replace('Z', '+00:00'))
+        except ValueError:
+            return jsonify({'error': f'Invalid scheduled_datetime format: {scheduled_datetime}'}), 400
         
-        if existing_response:
-            # Update existing response
-            existing_response.scheduled_datetime = scheduled_datetime
-            existing_response.message = message
-            existing_response.response_status = 'scheduled'
-            existing_response.updated_date = datetime.now()
-            db.session.commit()
-            
-            return jsonify({
-                'message': 'Donation schedule updated successfully',
-                'response_id': existing_response.blood_requests_response_id
-            }), 200
-        else:
-            # Create new response
-            response = BloodRequestResponse(
-                blood_request_id=request_id,
-                user_id=current_user_id,
-                response_status='scheduled',
-                scheduled_datetime=scheduled_datetime,
-                message=message,
-                from_date=date.today(),
-                created_date=datetime.now(),
-                updated_date=datetime.now()
-            )
-            
-            db.session.add(response)
-            db.session.commit()
-            
+        # A reschedule is not another scheduled donation for the rollups
+        already_scheduled = db.session.query(BloodRequestResponse.scheduled_datetime).filter_by(
+            blood_request_id=request_id, user_id=int(current_user_id)
+        ).scalar() is not None
+
+        # Create the response, or reschedule the one the user already made
+        response, created = upsert_response(
+            request_id, current_user_id,
+            update=('scheduled_datetime', 'message', 'response_status'),
+            response_status='scheduled',
+            scheduled_datetime=scheduled_datetime,
+            message=message
+        )
+        response_id = response.blood_requests_response_id
+        if not already_scheduled:
+            record_donation_scheduled(db.session(), blood_request)
+        notify_donation_scheduled(blood_request, scheduled_datetime)
+        db.session.commit()
+        
+        if created:
             return jsonify({
                 'message': 'Donation scheduled successfully',
-                'response_id': response.blood_requests_response_id
+                'response_id': response_id
             }), 201
+        return jsonify({
+            'message': 'Donation schedule updated successfully',
+            'response_id': response_id
+        }), 200
             
     except Exception as e:
         db.session.rollback()
@@ -870,12 +821,6 @@ def get_all_donations():
     except Exception as e:
         return jsonify({'error': f'Failed to get donations: {str(e)}'}), 500
 
-def send_email_notification(to_email, subject, body):
-    # Placeholder for sending email
-    current_app.logger.info(f"Sending email to {to_email}: {subject}\n{body}")
-    # Implement actual email logic here
-    pass
-
 # POST /blood-response: Create a blood donation response
 @blood_bp.route('/blood-response', methods=['POST'])
 @jwt_required()
@@ -907,45 +852,45 @@ def create_blood_response():
                 return jsonify({'error': 'user_id does not match authenticated user'}), 403
 
         blood_request_id = data['blood_request_id']
-        # Prevent duplicate responses
-        existing = BloodRequestResponse.query.filter_by(blood_request_id=blood_request_id, user_id=user_id).first()
-        if existing:
-            return jsonify({'error': 'You have already responded to this request'}), 400
-
         # Validate blood_request exists
         blood_request = BloodRequest.query.get(blood_request_id)
         if not blood_request:
             return jsonify({'error': 'Blood request not found'}), 404
 
         # Prepare fields
-        message = data.get('message')
-        from_date = data['from_date']
-        scheduled_datetime = data.get('scheduled_datetime')
-        now = datetime.now()
-        response = BloodRequestResponse(
-            blood_request_id=blood_request_id,
-            user_id=user_id,
+        try:
+            from_date = data['from_date']
+            if isinstance(from_date, str):
+                from_date = date.fromisoformat(from_date[:10])
+            scheduled_datetime = data.get('scheduled_datetime')
+            if isinstance(scheduled_datetime, str):
+                scheduled_datetime = datetime.fromisoformat(scheduled_datetime.replace('Z', '+00:00'))
+        except ValueError:
+            return jsonify({'error': 'from_date and scheduled_datetime must be ISO 8601 dates'}), 400
+
+        # Insert the response; the unique (request, user) index rejects a second one
+        response, created = upsert_response(
+            blood_request_id, user_id,
             response_status=data['response_status'],
-            message=message,
+            message=data.get('message'),
             from_date=from_date,
-            responded_date=now,
-            scheduled_datetime=scheduled_datetime,
-            created_at=now,
-            updated_at=now
+            scheduled_datetime=scheduled_datetime
         )
-        db.session.add(response)
-        db.session.commit()
-
-        # Bonus: Send email if accepted
+        if not created:
+            db.session.rollback()
+            return jsonify({'error': 'You have already responded to this request'}), 400
+        response_id = response.blood_requests_response_id
+        if scheduled_datetime:
+            record_donation_scheduled(db.session(), blood_request)
+        # Queued with the response; the outbox worker delivers them
         if data['response_status'] == 'Accepted':
-            # Email hospital or user (placeholder logic)
             hospital_email = getattr(blood_request.hospital, 'hospital_email_id', None)
-            if hospital_email:
-                send_email_notification(hospital_email, 'Blood Donation Accepted', f"A donor has accepted your blood request (ID: {blood_request_id}).")
+            notify_response_accepted(blood_request, hospital_email)
+        db.session.commit()
 
         return jsonify({
             'message': 'Blood response created successfully',
-            'blood_requests_response_id': response.blood_requests_response_id
+            'blood_requests_response_id': response_id
         }), 201
     except Exception as e:
         db.session.rollback()
@@ -1011,7 +956,7 @@ def create_test_blood_request():
         if not data:
             return jsonify({'error': 'No data provided'}), 400
         
-        print(f"[TEST] Creating test blood request: {data}")
+        logger.debug("Create test blood request: %s", data)
         
         # Use default values for missing required fields
         hospital_id = 1  # Use first hospital from seed data
@@ -1046,7 +991,7 @@ def create_test_blood_request():
         db.session.add(blood_request)
         db.session.commit()
         
-        print(f"[TEST] Successfully created blood request with ID: {blood_request.blood_request_id}")
+        logger.info("Created test blood request %s", blood_request.blood_request_id)
         
         return jsonify({
             'success': True,
@@ -1063,7 +1008,7 @@ def create_test_blood_request():
         
     except Exception as e:
         db.session.rollback()
-        print(f"[TEST] Error creating test blood request: {str(e)}")
+        logger.exception("Error creating test blood request")
         return jsonify({
             'success': False,
             'error': f'Failed to create test blood request: {str(e)}'
@@ -1,4 +1,3 @@
-print("[DEBUG] routes/hospital_routes.py loaded")
 from flask import Blueprint, request, jsonify, session
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from db import db
@@ -11,9 +10,12 @@ import psycopg2
 
 from werkzeug.security import check_password_hash
 from config import Config
+import logging
 
 hospital_bp = Blueprint('hospital', __name__)
 
+logger = logging.getLogger(__name__)
+
 # Initialize schema
 hospital_schema = HospitalSchema()
 
@@ -67,15 +69,12 @@ def register_hospital():
 
 @hospital_bp.route('/list', methods=['GET'])
 def list_hospitals():
-    print("[DEBUG] /hospital/list endpoint called")
     try:
         hospitals = Hospital.query.all()
-        print("[DEBUG] Hospitals type:", type(hospitals))
         result = []
         for i, hospital in enumerate(hospitals):
-            print(f"[DEBUG] Index {i}: type={type(hospital)}, value={hospital}")
             if not hasattr(hospital, 'hospital_id'):
-                print(f"[DEBUG] Skipping non-Hospital object at index {i}: {hospital}")
+                logger.debug("Skipping non-Hospital object at index %d: %r", i, hospital)
                 continue
             try:
                 result.append({
@@ -92,9 +91,9 @@ def list_hospitals():
                     'to_date': hospital.to_date.isoformat() if hospital.to_date else None
                 })
             except Exception as inner_e:
-                print(f"[DEBUG] Error serializing hospital at index {i}: {inner_e}")
+                logger.debug("Error serializing hospital at index %d: %s", i, inner_e)
                 continue
-        print(f"[DEBUG] Returning {len(result)} hospitals")
+        logger.debug("Returning %d hospitals", len(result))
         return jsonify(result), 200
         
     except Exception as e:
@@ -0,0 +1,39 @@
+"""
+Rebuild the daily request/donation rollups from the base tables.
+
+Run once after deploying the rollups table, and after loading data that
+bypassed the application (for example scripts/generate_data.py). Days in
+the range are replaced; days outside it are left alone.
+
+    python scripts/backfill_rollups.py --from 2024-01-01 --to 2024-12-31
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--config', default=os.getenv('FLASK_ENV', 'development'), help='Config name passed to create_app')
+    parser.add_argument('--from', dest='start', type=date.fromisoformat, default=date.today() - timedelta(days=365))
+    parser.add_argument('--to', dest='end', type=date.fromisoformat, default=date.today())
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    from app import create_app
+    from app.controllers.rollups import backfill
+
+    load_dotenv()
+    app = create_app(args.config)
+    with app.app_context():
+        started = time.perf_counter()
+        written = backfill(args.start, args.end)
+        print(f"Wrote {written} rollup rows for {args.start}..{args.end} in {time.perf_counter() - started:.1f}s")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""
+Benchmark the read-heavy blood and hospital APIs in-process.
+
+Seeds a throwaway database (a temporary SQLite file by default, or the
+database given with --database-url), then drives each scenario through
+Flask's test client from a pool of threads and reports latency
+percentiles, throughput and SQL queries per request.
+
+    python scripts/benchmark.py --requests 500 --concurrency 8
+    python scripts/benchmark.py --json results.json
+    python scripts/benchmark.py --baseline results.json --max-regression 0.25
+
+With --baseline the run exits non-zero if any scenario's p95 latency grew
+by more than --max-regression, or it issues more queries per request than
+the baseline did.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.generate_data import generate, donor_email
+
+BENCH_PASSWORD = 'bench-password'
+
+# name -> (method, url template, authenticated, json body)
+SCENARIOS = {
+    'blood_requests': ('GET', '/blood/requests', False, None),
+    'blood_request_detail': ('GET', '/blood/request/{request_id}', True, None),
+    'hospital_list': ('GET', '/hospital/list', False, None),
+    'hospital_availability': ('GET', '/hospital/availability?hospital_id={hospital_id}', False, None),
+    'auth_login': ('POST', '/auth/login', False, {'user_email': '{user_email}', 'password': BENCH_PASSWORD}),
+}
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+class QueryCounter:
+    """Counts SQL statements per thread while a request is in flight"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self._local = threading.local()
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if getattr(self._local, 'active', False):
+            self._local.count += 1
+
+    def start(self):
+        self._local.active = True
+        self._local.count = 0
+
+    def stop(self):
+        self._local.active = False
+        return self._local.count
+
+def seed(db, hospitals=50, donors=500, requests=1000, seed_value=42):
+    """
+    Fill the schema with a deterministic dataset from the bulk generator.
+    Returns the ids scenarios need to build their URLs.
+    """
+    from app.utils.password_hashing import hash_password
+
+    result = generate(
+        db, hospitals, donors, requests, seed_value=seed_value,
+        password_hash=hash_password(BENCH_PASSWORD), as_of=date(2024, 1, 1), log=lambda message: None,
+    )
+    return {
+        'request_ids': list(result['request_ids']),
+        'hospital_ids': list(result['hospital_ids']),
+        'users': [(user_id, donor_email(user_id)) for user_id in result['user_ids']],
+    }
+
+def run_scenario(app, counter, name, fixtures, total_requests, concurrency, seed_value=42):
+    """
+    Issue ``total_requests`` of one scenario across ``concurrency`` threads.
+    Returns a dict of latency percentiles (ms), throughput and queries per request.
+    """
+    from flask_jwt_extended import create_access_token
+
+    method, url_template, authenticated, body_template = SCENARIOS[name]
+    rng = random.Random(seed_value)
+    with app.app_context():
+        token_for = {user_id: create_access_token(identity=str(user_id)) for user_id, _ in fixtures['users'][:50]}
+    plans = []
+    for _ in range(total_requests):
+        user_id, user_email = rng.choice(fixtures['users'][:50])
+        values = {
+            'request_id': rng.choice(fixtures['request_ids']),
+            'hospital_id': rng.choice(fixtures['hospital_ids']),
+            'user_email': user_email,
+        }
+        headers = {'Authorization': f'Bearer {token_for[user_id]}'} if authenticated else {}
+        body = {key: str(value).format(**values) for key, value in body_template.items()} if body_template else None
+        plans.append((url_template.format(**values), headers, body))
+
+    local = threading.local()
+    latencies = []
+    query_counts = []
+    errors = []
+    lock = threading.Lock()
+
+    def issue(plan):
+        url, headers, body = plan
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        counter.start()
+        started = time.perf_counter()
+        response = local.client.open(url, method=method, headers=headers, json=body)
+        elapsed = (time.perf_counter() - started) * 1000
+        queries = counter.stop()
+        with lock:
+            latencies.append(elapsed)
+            query_counts.append(queries)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+
+    wall_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(issue, plans))
+    wall = time.perf_counter() - wall_started
+
+    latencies.sort()
+    return {
+        'requests': total_requests,
+        'concurrency': concurrency,
+        'errors': len(errors),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'throughput_rps': round(total_requests / wall, 1) if wall else 0.0,
+        'queries_per_request': round(sum(query_counts) / len(query_counts), 2) if query_counts else 0.0,
+    }
+
+def compare_to_baseline(results, baseline, max_regression):
+    """List human-readable regressions of ``results`` against a previous run"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if previous['p95_ms'] and current['p95_ms'] > previous['p95_ms'] * (1 + max_regression):
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current['queries_per_request'] > previous['queries_per_request']:
+            regressions.append(
+                f"{name}: queries/request {previous['queries_per_request']} -> {current['queries_per_request']}"
+            )
+    return regressions
+
+def print_report(results):
+    header = f"{'scenario':<24}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'queries':>9}{'errors':>8}"
+    print(header)
+    print('-' * len(header))
+    for name, r in results.items():
+        print(f"{name:<24}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+              f"{r['throughput_rps']:>10.1f}{r['queries_per_request']:>9.2f}{r['errors']:>8}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', help='Database to seed and benchmark against (default: temporary SQLite file)')
+    parser.add_argument('--keep-data', action='store_true', help='Do not drop the seeded tables afterwards')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='Comma-separated scenario names')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=4, help='Client threads per scenario')
+    parser.add_argument('--hospitals', type=int, default=50)
+    parser.add_argument('--donors', type=int, default=500)
+    parser.add_argument('--blood-requests', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for data and request mix')
+    parser.add_argument('--json', dest='json_path', help='Write results to this file')
+    parser.add_argument('--baseline', help='Results file from a previous run to compare against')
+    parser.add_argument('--max-regression', type=float, default=0.25, help='Allowed p95 growth vs baseline (0.25 = 25%%)')
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.scenarios.split(',') if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(unknown)}")
+
+    temp_dir = None
+    if args.database_url:
+        database_url = args.database_url
+    else:
+        temp_dir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(temp_dir.name, 'benchmark.db')}"
+    # TestingConfig reads this at import time
+    os.environ['TEST_DATABASE_URL'] = database_url
+
+    from app import create_app
+    from db import db
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        fixtures = seed(db, args.hospitals, args.donors, args.blood_requests, args.seed)
+        counter = QueryCounter(db.engine)
+
+    try:
+        results = {
+            name: run_scenario(app, counter, name, fixtures, args.requests, args.concurrency, args.seed)
+            for name in args.scenarios.split(',')
+        }
+    finally:
+        if not args.keep_data:
+            with app.app_context():
+                db.session.remove()
+                db.drop_all()
+        if temp_dir:
+            temp_dir.cleanup()
+
+    print_report(results)
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(results, json.load(f), args.max_regression)
+        if regressions:
+            print('\nRegressions against baseline:')
+            for line in regressions:
+                print(f'  {line}')
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+Benchmark response serialization for the large blood request lists.
+
+Builds in-memory BloodRequest rows shaped like GET /blood/requests
+(authenticated) and times turning them into a response body three ways:
+
+    handwritten   per-route dict building with .isoformat(), stdlib encoder
+    serializer    compiled serializer, stdlib encoder
+    fast          compiled serializer, orjson (when installed)
+
+No database is needed. Each path must produce the same JSON document.
+
+    python scripts/benchmark_json.py --rows 5000 --repeat 20
+    python scripts/benchmark_json.py --json json-bench.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.utils import json_provider, serializers
+from models import BloodRequest, Hospital, LookupBloodGroup, User
+
+def make_rows(count):
+    """Transient BloodRequest rows with their user, hospital and blood group attached"""
+    started = datetime(2024, 1, 1, 8, 30, 15, 123456)
+    groups = [LookupBloodGroup(blood_group_id=i, blood_group_name=name) for i, name in enumerate(
+        ['A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-'], start=1)]
+    hospitals = [Hospital(hospital_id=i, hospital_name=f'Hospital {i}', from_date=date(2024, 1, 1)) for i in range(1, 51)]
+    rows = []
+    for i in range(count):
+        user = User(user_name=f'user{i}', password='x', user_email=f'user{i}@example.test',
+                    user_phone_number=f'9{i:09d}', user_role_id=3)
+        user.user_id = i + 1
+        hospital, group = hospitals[i % len(hospitals)], groups[i % len(groups)]
+        req = BloodRequest(
+            user_id=user.user_id, hospital_id=hospital.hospital_id, blood_group_type=group.blood_group_id,
+            no_of_units=1 + i % 4, patient_name=f'Patient {i}',
+            blood_request_id=i + 1,
+            patient_contact_email=f'patient{i}@example.test', patient_contact_phone_number=f'8{i:09d}',
+            required_by_date=date(2024, 2, 1) + timedelta(days=i % 30),
+            description='Needed for scheduled surgery', status='pending',
+            from_date=date(2024, 1, 1), to_date=None,
+            created_at=started + timedelta(minutes=i), updated_at=started + timedelta(minutes=i, seconds=30),
+        )
+        req.user, req.hospital, req.blood_group = user, hospital, group
+        req.responses_count = i % 5
+        rows.append(req)
+    return rows
+
+def handwritten(req):
+    """The per-route dict building serializers.BLOOD_REQUEST_DETAIL replaced"""
+    return {
+        'blood_request_id': req.blood_request_id,
+        'user_id': req.user_id,
+        'user_name': req.user.user_name,
+        'hospital_id': req.hospital_id,
+        'hospital_name': req.hospital.hospital_name,
+        'blood_group_type': req.blood_group_type,
+        'blood_group_name': req.blood_group.blood_group_name,
+        'no_of_units': req.no_of_units,
+        'patient_name': req.patient_name,
+        'patient_contact_email': req.patient_contact_email,
+        'patient_contact_phone_number': req.patient_contact_phone_number,
+        'required_by_date': req.required_by_date.isoformat() if req.required_by_date else None,
+        'description': req.description,
+        'status': req.status,
+        'from_date': req.from_date.isoformat() if req.from_date else None,
+        'to_date': req.to_date.isoformat() if req.to_date else None,
+        'created_at': req.created_at.isoformat() if req.created_at else None,
+        'updated_at': req.updated_at.isoformat() if req.updated_at else None,
+        'responses_count': req.responses_count
+    }
+
+def _path(name, app, provider, build):
+    def run(rows):
+        app.json = provider
+        with app.app_context():
+            return provider.response({'requests': build(rows), 'next_cursor': None, 'limit': len(rows)}).get_data()
+    return name, run
+
+def paths(app):
+    """(name, fn(rows) -> response body bytes) for every available path"""
+    result = [
+        _path('handwritten', app, DefaultJSONProvider(app), lambda rows: [handwritten(r) for r in rows]),
+        _path('serializer', app, _StdlibOnly(app), serializers.BLOOD_REQUEST_DETAIL.many),
+    ]
+    if json_provider.orjson is not None:
+        result.append(_path('fast', app, json_provider.FastJSONProvider(app), serializers.BLOOD_REQUEST_DETAIL.many))
+    return result
+
+class _StdlibOnly(json_provider.FastJSONProvider):
+    """The fast provider's date handling with the stdlib encoder"""
+
+    def response(self, *args, **kwargs):
+        return DefaultJSONProvider.response(self, *args, **kwargs)
+
+def run(rows_count=2000, repeat=10):
+    """Time every path; returns {name: {'bytes', 'seconds', 'mb_per_s', 'rows_per_s'}}"""
+    app = Flask(__name__)
+    rows = make_rows(rows_count)
+    results = {}
+    reference = None
+    for name, fn in paths(app):
+        body = fn(rows)
+        document = json.loads(body)
+        if reference is None:
+            reference = document
+        elif document != reference:
+            raise AssertionError(f'{name} produced a different document than handwritten')
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fn(rows)
+        elapsed = time.perf_counter() - started
+        results[name] = {
+            'bytes': len(body),
+            'seconds': elapsed / repeat,
+            'mb_per_s': len(body) * repeat / elapsed / 1e6,
+            'rows_per_s': rows_count * repeat / elapsed,
+        }
+    return results
+
+def print_report(results):
+    base = results['handwritten']['mb_per_s']
+    print(f"{'path':<12} {'bytes':>10} {'ms/body':>9} {'MB/s':>8} {'rows/s':>10} {'speedup':>8}")
+    for name, r in results.items():
+        print(f"{name:<12} {r['bytes']:>10} {r['seconds'] * 1000:>9.2f} {r['mb_per_s']:>8.1f} "
+              f"{r['rows_per_s']:>10.0f} {r['mb_per_s'] / base:>7.2f}x")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000, help='Rows per response body')
+    parser.add_argument('--repeat', type=int, default=10, help='Bodies built per path')
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args(argv)
+
+    results = run(args.rows, args.repeat)
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
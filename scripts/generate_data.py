@@ -0,0 +1,331 @@
+"""
+Bulk synthetic data generator for capacity testing.
+
+Creates hospitals around major Indian cities, donors with a realistic
+blood group mix, blood requests and their responses. Rows are built in
+memory batch by batch and written with executemany (or COPY on
+PostgreSQL with --copy), so multi-million row datasets take minutes
+rather than hours. The same --seed and --as-of always produce the same data.
+
+    python scripts/generate_data.py --hospitals 2000 --donors 1000000 --requests 200000
+    python scripts/generate_data.py --donors 1000000 --copy --config production
+
+Primary keys are assigned here, continuing after the highest existing id,
+and PostgreSQL sequences are moved past them afterwards.
+"""
+import argparse
+import csv
+import io
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+BLOOD_GROUPS = ['A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-']
+ROLES = [(1, 'super_admin'), (2, 'hospital_admin'), (3, 'donor')]
+DONOR_ROLE_ID = 3
+DEFAULT_PASSWORD = 'password123'
+
+# Approximate share of each blood group in the Indian population
+BLOOD_GROUP_WEIGHTS = {
+    'O+': 36.5, 'B+': 32.1, 'A+': 22.9, 'AB+': 7.1,
+    'O-': 0.7, 'B-': 0.4, 'A-': 0.2, 'AB-': 0.1,
+}
+
+# name, latitude, longitude, PIN prefix, relative population weight
+CITIES = [
+    ('Delhi', 28.6139, 77.2090, '110', 19),
+    ('Mumbai', 19.0760, 72.8777, '400', 18),
+    ('Bengaluru', 12.9716, 77.5946, '560', 12),
+    ('Kolkata', 22.5726, 88.3639, '700', 11),
+    ('Chennai', 13.0827, 80.2707, '600', 9),
+    ('Hyderabad', 17.3850, 78.4867, '500', 9),
+    ('Pune', 18.5204, 73.8567, '411', 6),
+    ('Ahmedabad', 23.0225, 72.5714, '380', 6),
+    ('Jaipur', 26.9124, 75.7873, '302', 4),
+    ('Lucknow', 26.8467, 80.9462, '226', 4),
+    ('Kochi', 9.9312, 76.2673, '682', 2),
+]
+
+HOSPITAL_TYPES = ['government', 'private', 'trust', 'clinic']
+# Only statuses the API writes, so generated requests can be filtered and counted like real ones
+REQUEST_STATUSES = ['pending'] * 5 + ['accepted'] * 2 + ['completed'] * 2 + ['cancelled']
+RESPONSE_STATUSES = ['accepted'] * 3 + ['declined'] * 2
+
+def donor_email(user_id):
+    """Email address the generator gives the donor with this id"""
+    return f'donor{user_id}@example.test'
+
+class _Writer:
+    """Writes batches of row dicts to one table via executemany or COPY"""
+
+    def __init__(self, connection, table, use_copy):
+        self.connection = connection
+        self.table = table
+        self.use_copy = use_copy
+        self.columns = [column.name for column in table.columns]
+
+    def write(self, rows):
+        if not rows:
+            return
+        if self.use_copy:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                writer.writerow(['' if row.get(name) is None else row.get(name) for name in self.columns])
+            buffer.seek(0)
+            cursor = self.connection.connection.cursor()
+            try:
+                cursor.copy_expert(
+                    f"COPY {self.table.name} ({', '.join(self.columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+                )
+            finally:
+                cursor.close()
+        else:
+            self.connection.execute(self.table.insert(), [
+                {name: row.get(name) for name in self.columns} for row in rows
+            ])
+
+def _next_id(connection, column):
+    from sqlalchemy import func, select
+
+    return (connection.execute(select(func.max(column))).scalar() or 0) + 1
+
+def _write_batched(writer, rows, batch_size):
+    batch = []
+    count = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            writer.write(batch)
+            count += len(batch)
+            batch = []
+    writer.write(batch)
+    return count + len(batch)
+
+def _ensure_lookups(connection):
+    """Insert any missing lookup rows; returns {blood group name: id}"""
+    from sqlalchemy import select
+    from models import LookupBloodGroup, LookupRole
+
+    today = date.today()
+    existing_roles = {row[0] for row in connection.execute(select(LookupRole.lookup_role_id))}
+    missing_roles = [
+        {'lookup_role_id': role_id, 'lookup_role_name': name, 'from_date': today}
+        for role_id, name in ROLES if role_id not in existing_roles
+    ]
+    if missing_roles:
+        connection.execute(LookupRole.__table__.insert(), missing_roles)
+
+    blood_group_ids = {
+        name: blood_group_id for blood_group_id, name in
+        connection.execute(select(LookupBloodGroup.blood_group_id, LookupBloodGroup.blood_group_name))
+    }
+    next_id = max(blood_group_ids.values(), default=0) + 1
+    missing_groups = []
+    for name in BLOOD_GROUPS:
+        if name not in blood_group_ids:
+            blood_group_ids[name] = next_id
+            missing_groups.append({'blood_group_id': next_id, 'blood_group_name': name, 'from_date': today})
+            next_id += 1
+    if missing_groups:
+        connection.execute(LookupBloodGroup.__table__.insert(), missing_groups)
+    return blood_group_ids
+
+def _reset_sequences(connection, columns):
+    from sqlalchemy import text
+
+    for column in columns:
+        connection.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{column.table.name}', '{column.name}'), "
+            f"(SELECT COALESCE(MAX({column.name}), 1) FROM {column.table.name}))"
+        ))
+
+def generate(db, hospitals=100, donors=10000, requests=5000, responses_per_request=1.5,
+             seed_value=42, batch_size=10000, use_copy=False, password_hash=None, as_of=None, log=print):
+    """
+    Generate and insert a dataset into the current app's database.
+
+    Timestamps are spread backwards from ``as_of`` (default: today at
+    midnight UTC), so the same seed and as_of reproduce the same rows.
+    Returns the id ranges that were created, keyed by 'hospital_ids',
+    'user_ids' and 'request_ids', plus per-table row counts.
+    """
+    from models import (User, Hospital, HospitalBloodAvailability, BloodRequest, BloodRequestResponse)
+
+    if password_hash is None:
+        from app.utils.password_hashing import hash_password
+        # One hash shared by every donor; hashing a million passwords would dominate the run
+        password_hash = hash_password(DEFAULT_PASSWORD)
+
+    rng = random.Random(seed_value)
+    connection = db.session.connection()
+    use_copy = use_copy and connection.dialect.name == 'postgresql'
+    blood_group_ids = _ensure_lookups(connection)
+    group_names = list(BLOOD_GROUP_WEIGHTS)
+    group_weights = list(BLOOD_GROUP_WEIGHTS.values())
+    city_weights = [city[4] for city in CITIES]
+    today = as_of or datetime.utcnow().date()
+    now = datetime.combine(today, datetime.min.time())
+
+    first_hospital = _next_id(connection, Hospital.hospital_id)
+    first_user = _next_id(connection, User.user_id)
+    first_request = _next_id(connection, BloodRequest.blood_request_id)
+    first_response = _next_id(connection, BloodRequestResponse.blood_requests_response_id)
+    hospital_ids = range(first_hospital, first_hospital + hospitals)
+    user_ids = range(first_user, first_user + donors)
+    request_ids = range(first_request, first_request + requests)
+    hospital_cities = [rng.choices(CITIES, city_weights)[0] for _ in hospital_ids]
+
+    def hospital_rows():
+        for hospital_id, (city, lat, lng, pin_prefix, _) in zip(hospital_ids, hospital_cities):
+            created_at = now - timedelta(days=rng.randrange(3650))
+            yield {
+                'hospital_id': hospital_id,
+                'hospital_name': f'{city} {rng.choice(["City", "General", "Care", "Life", "Sri"])} Hospital {hospital_id}',
+                'hospital_address': f'{rng.randrange(1, 500)} Main Road, {city}',
+                'hospital_address_lat': round(rng.gauss(lat, 0.08), 6),
+                'hospital_address_long': round(rng.gauss(lng, 0.08), 6),
+                'has_blood_bank': rng.random() < 0.4,
+                'hospital_contact_number': f'8{hospital_id:09d}',
+                'hospital_email_id': f'contact{hospital_id}@hospital.example.test',
+                'hospital_pincode': f'{pin_prefix}{rng.randrange(1, 100):03d}',
+                'hospital_type': rng.choice(HOSPITAL_TYPES),
+                'from_date': created_at.date(),
+                'created_at': created_at,
+                'updated_at': created_at,
+            }
+
+    def availability_rows():
+        for hospital_id in hospital_ids:
+            for name in BLOOD_GROUPS:
+                yield {
+                    'hospital_id': hospital_id,
+                    'blood_group_id': blood_group_ids[name],
+                    'no_of_units': rng.randrange(0, 40),
+                    'from_date': today,
+                }
+
+    def user_rows():
+        for user_id in user_ids:
+            city, _, _, pin_prefix, _ = rng.choices(CITIES, city_weights)[0]
+            created_at = now - timedelta(days=rng.randrange(1095))
+            yield {
+                'user_id': user_id,
+                'user_name': f'Donor {user_id}',
+                'blood_group': rng.choices(group_names, group_weights)[0],
+                'address': f'{rng.randrange(1, 999)} Cross Street, {city}',
+                'pincode': f'{pin_prefix}{rng.randrange(1, 100):03d}',
+                'user_email': donor_email(user_id),
+                'user_phone_number': f'9{user_id:09d}',
+                'password': password_hash,
+                'user_role_id': DONOR_ROLE_ID,
+                'from_date': created_at.date(),
+                'created_at': created_at,
+                'updated_at': created_at,
+            }
+
+    def request_rows():
+        for request_id in request_ids:
+            created_at = now - timedelta(minutes=rng.randrange(180 * 24 * 60))
+            yield {
+                'blood_request_id': request_id,
+                'user_id': rng.choice(user_ids) if donors else None,
+                'hospital_id': rng.choice(hospital_ids) if hospitals else None,
+                'blood_group_type': blood_group_ids[rng.choices(group_names, group_weights)[0]],
+                'no_of_units': rng.randrange(1, 6),
+                'patient_name': f'Patient {request_id}',
+                'required_by_date': created_at.date() + timedelta(days=rng.randrange(1, 15)),
+                'status': rng.choice(REQUEST_STATUSES),
+                'from_date': created_at.date(),
+                'created_at': created_at,
+                'updated_at': created_at,
+            }
+
+    def response_rows():
+        next_response_id = first_response
+        for request_id in request_ids:
+            count = min(donors, int(rng.expovariate(1.0 / responses_per_request))) if responses_per_request else 0
+            for responder_index in rng.sample(range(donors), count):
+                responded_at = now - timedelta(minutes=rng.randrange(180 * 24 * 60))
+                yield {
+                    'blood_requests_response_id': next_response_id,
+                    'blood_request_id': request_id,
+                    'user_id': user_ids[responder_index],
+                    'response_status': rng.choice(RESPONSE_STATUSES),
+                    'from_date': responded_at.date(),
+                    'responded_date': responded_at.date(),
+                    'created_at': responded_at,
+                    'updated_at': responded_at,
+                }
+                next_response_id += 1
+
+    if requests and not (donors and hospitals):
+        raise ValueError('Generating requests needs at least one donor and one hospital')
+
+    counts = {}
+    for model, rows in (
+        (Hospital, hospital_rows()),
+        (HospitalBloodAvailability, availability_rows()),
+        (User, user_rows()),
+        (BloodRequest, request_rows()),
+        (BloodRequestResponse, response_rows()),
+    ):
+        table = model.__table__
+        started = time.perf_counter()
+        counts[table.name] = _write_batched(_Writer(connection, table, use_copy), rows, batch_size)
+        elapsed = time.perf_counter() - started
+        log(f"{table.name}: {counts[table.name]} rows in {elapsed:.1f}s")
+
+    if connection.dialect.name == 'postgresql':
+        _reset_sequences(connection, [
+            Hospital.hospital_id, User.user_id, BloodRequest.blood_request_id,
+            BloodRequestResponse.blood_requests_response_id,
+        ])
+    db.session.commit()
+
+    return {
+        'hospital_ids': hospital_ids,
+        'user_ids': user_ids,
+        'request_ids': request_ids,
+        'counts': counts,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--config', default=os.getenv('FLASK_ENV', 'development'), help='Config name passed to create_app')
+    parser.add_argument('--hospitals', type=int, default=100)
+    parser.add_argument('--donors', type=int, default=10000)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--responses-per-request', type=float, default=1.5, help='Mean responses per request')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--as-of', type=date.fromisoformat, help='Date timestamps count back from (default: today)')
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--copy', action='store_true', help='Use COPY instead of executemany (PostgreSQL only)')
+    parser.add_argument('--create-tables', action='store_true', help='Run db.create_all() first')
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    from app import create_app
+    from db import db
+
+    load_dotenv()
+    app = create_app(args.config)
+    with app.app_context():
+        if args.create_tables:
+            db.create_all()
+        started = time.perf_counter()
+        result = generate(
+            db, args.hospitals, args.donors, args.requests, args.responses_per_request,
+            seed_value=args.seed, batch_size=args.batch_size, use_copy=args.copy, as_of=args.as_of,
+        )
+        total = sum(result['counts'].values())
+        print(f"Inserted {total} rows in {time.perf_counter() - started:.1f}s")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Deliver queued email and push notifications from the notification outbox.
+
+Runs alongside the web workers; requests only insert outbox rows, this
+process sends them. Several workers may run against PostgreSQL at once,
+since each claims its batch with FOR UPDATE SKIP LOCKED and leases it
+(OUTBOX_LEASE_SECONDS) before sending outside the claiming transaction.
+
+    python scripts/notification_worker.py
+    python scripts/notification_worker.py --once
+"""
+import argparse
+import os
+import signal
+import sys
+import time
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--config', default=os.getenv('FLASK_ENV', 'development'), help='Config name passed to create_app')
+    parser.add_argument('--once', action='store_true', help='Drain what is due now, then exit')
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    from app import create_app
+    from app.utils.outbox import build_transports, drain_once, drain_options
+    from models import db
+
+    load_dotenv()
+    app = create_app(args.config)
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+
+    with app.app_context():
+        transports = build_transports(app.config)
+        options = drain_options(app.config)
+        poll_seconds = app.config.get('OUTBOX_POLL_SECONDS', 2)
+        while not stopping:
+            try:
+                counts = drain_once(transports, **options)
+            except Exception:
+                db.session.rollback()
+                app.logger.exception("Notification outbox drain failed")
+                counts = None
+            finally:
+                db.session.remove()
+            if counts and any(counts.values()):
+                app.logger.info("Notification outbox: %(sent)d sent, %(retried)d retried, %(failed)d failed", counts)
+            if args.once:
+                break
+            # A full batch means more are probably due; go again straight away
+            if not counts or sum(counts.values()) < options['batch_size']:
+                time.sleep(poll_seconds)
+        for transport in set(transports.values()):
+            transport.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
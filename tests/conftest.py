@@ -0,0 +1,94 @@
+import os
+from contextlib import contextmanager
+
+os.environ.setdefault('TEST_DATABASE_URL', 'sqlite://')
+
+from datetime import date
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from app import create_app
+from app.utils.auth_utils import principal_cache
+from db import db
+from models import LookupBloodGroup, LookupRole, User, Hospital
+
+BLOOD_GROUPS = ['A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-']
+ROLES = [(1, 'super_admin'), (2, 'hospital_admin'), (3, 'donor')]
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    # User ids restart with every database, so roles cached by an earlier test must not carry over
+    principal_cache.clear()
+    with app.app_context():
+        db.create_all()
+        for role_id, role_name in ROLES:
+            db.session.add(LookupRole(lookup_role_id=role_id, lookup_role_name=role_name, from_date=date.today()))
+        for blood_group_id, name in enumerate(BLOOD_GROUPS, start=1):
+            db.session.add(LookupBloodGroup(blood_group_id=blood_group_id, blood_group_name=name, from_date=date.today()))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def make_user(app):
+    counter = {'n': 0}
+
+    def _make_user(role_id=3, blood_group='O+', pincode='560001', **kwargs):
+        counter['n'] += 1
+        n = counter['n']
+        user = User(
+            user_name=kwargs.pop('user_name', f'user{n}'),
+            password=kwargs.pop('password', 'password123'),
+            user_email=kwargs.pop('user_email', f'user{n}@example.com'),
+            user_phone_number=kwargs.pop('user_phone_number', f'90000{n:05d}'),
+            user_role_id=role_id,
+            blood_group=blood_group,
+            pincode=pincode,
+            **kwargs
+        )
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return _make_user
+
+@pytest.fixture
+def make_hospital(app):
+    def _make_hospital(name='General Hospital', **kwargs):
+        hospital = Hospital(hospital_name=name, from_date=date.today(), **kwargs)
+        db.session.add(hospital)
+        db.session.commit()
+        return hospital
+    return _make_hospital
+
+@pytest.fixture
+def auth_headers(app):
+    def _auth_headers(user):
+        user_id = getattr(user, 'user_id', user)
+        token = create_access_token(identity=str(user_id))
+        return {'Authorization': f'Bearer {token}'}
+    return _auth_headers
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager collecting every SQL statement sent to the engine"""
+    @contextmanager
+    def _count_queries():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return _count_queries
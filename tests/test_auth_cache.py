@@ -0,0 +1,87 @@
+import pytest
+from flask import g
+from flask_jwt_extended import create_access_token
+
+from db import db
+from models import UserHospitalAdminLineage
+from app.utils.auth_utils import AuthPrincipal, require_role, get_current_principal, principal_cache, role_claims
+
+@pytest.fixture
+def guarded(app):
+    principal_cache.clear()
+
+    @app.after_request
+    def forget_request_memo(response):
+        # The test app context outlives each request, so drop the g memo by hand
+        g.pop('auth_principal', None)
+        return response
+
+    @app.route('/_test/hospital-admin')
+    @require_role('hospital_admin')
+    def hospital_admin_only():
+        principal = get_current_principal()
+        return {'user_id': principal.user_id, 'hospital_ids': list(principal.hospital_ids)}
+    return '/_test/hospital-admin'
+
+def test_role_lookup_is_cached(client, guarded, make_user, make_hospital, auth_headers, count_queries):
+    admin = make_user(role_id=2)
+    hospital = make_hospital()
+    db.session.add(UserHospitalAdminLineage(user_id=admin.user_id, hospital_id=hospital.hospital_id))
+    db.session.commit()
+    headers = auth_headers(admin)
+
+    with count_queries() as first:
+        response = client.get(guarded, headers=headers)
+    assert response.status_code == 200
+    assert response.json['hospital_ids'] == [hospital.hospital_id]
+    assert len(first) == 2
+
+    with count_queries() as second:
+        assert client.get(guarded, headers=headers).status_code == 200
+    assert second == []
+
+def test_user_change_evicts_cache(client, guarded, make_user, auth_headers):
+    user = make_user(role_id=2)
+    headers = auth_headers(user)
+    assert client.get(guarded, headers=headers).status_code == 200
+
+    user.user_role_id = 3
+    db.session.commit()
+    response = client.get(guarded, headers=headers)
+    assert response.status_code == 403
+    assert response.json['message'] == 'Hospital admin access required'
+
+def test_eviction_waits_for_commit(app, make_user):
+    user = make_user(role_id=2)
+    cached = AuthPrincipal(user.user_id, 2, ())
+
+    principal_cache.put(cached)
+    user.user_role_id = 3
+    db.session.flush()
+    assert principal_cache.get(user.user_id) == cached
+    db.session.rollback()
+    assert principal_cache.get(user.user_id) == cached
+
+    user.user_role_id = 3
+    db.session.flush()
+    # Another request reloading the committed row before this commit lands
+    principal_cache.put(cached)
+    db.session.commit()
+    assert principal_cache.get(user.user_id) is None
+
+def test_role_claims_skip_lookup(app, client, guarded, make_user, count_queries):
+    user = make_user(role_id=2)
+    app.config['AUTH_EMBED_ROLE_CLAIMS'] = True
+    with app.test_request_context():
+        claims = role_claims(user)
+    assert claims == {'role_id': 2, 'hospital_ids': []}
+
+    token = create_access_token(identity=str(user.user_id), additional_claims=claims)
+    with count_queries() as statements:
+        response = client.get(guarded, headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+    assert statements == []
+
+def test_unknown_user(client, guarded, auth_headers):
+    assert client.get(guarded, headers=auth_headers(999)).status_code == 404
+    assert client.get(guarded).status_code == 401
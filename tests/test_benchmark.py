@@ -0,0 +1,21 @@
+from db import db
+from scripts.benchmark import SCENARIOS, QueryCounter, seed, run_scenario, compare_to_baseline, percentile
+
+def test_every_scenario_runs_cleanly(app):
+    fixtures = seed(db, hospitals=3, donors=5, requests=10)
+    counter = QueryCounter(db.engine)
+
+    for name in SCENARIOS:
+        result = run_scenario(app, counter, name, fixtures, total_requests=4, concurrency=1)
+        assert result['errors'] == 0, name
+        assert result['queries_per_request'] >= 1
+        assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+
+def test_percentile_and_baseline_comparison():
+    assert percentile([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 50) == 5
+    assert percentile([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 99) == 10
+
+    baseline = {'hospital_list': {'p95_ms': 10.0, 'queries_per_request': 1.0}}
+    assert compare_to_baseline({'hospital_list': {'p95_ms': 12.0, 'queries_per_request': 1.0}}, baseline, 0.25) == []
+    regressions = compare_to_baseline({'hospital_list': {'p95_ms': 20.0, 'queries_per_request': 2.0}}, baseline, 0.25)
+    assert len(regressions) == 2
@@ -0,0 +1,58 @@
+from datetime import date, datetime, timedelta
+
+from db import db
+from models import BloodRequest
+
+def _seed_requests(make_user, make_hospital, count):
+    requester = make_user()
+    hospital = make_hospital()
+    base = datetime(2025, 1, 1)
+    for i in range(count):
+        db.session.add(BloodRequest(
+            user_id=requester.user_id,
+            hospital_id=hospital.hospital_id,
+            blood_group_type=1 + i % 8,
+            no_of_units=1,
+            patient_name=f'Patient {i}',
+            required_by_date=date.today(),
+            # Pairs of rows share a timestamp so the id tiebreaker is exercised
+            created_at=base + timedelta(minutes=i // 2),
+        ))
+    db.session.commit()
+
+def test_pages_cover_every_row_once(client, make_user, make_hospital):
+    _seed_requests(make_user, make_hospital, 25)
+
+    seen = []
+    cursor = None
+    while True:
+        url = '/blood/requests?limit=10' + (f'&cursor={cursor}' if cursor else '')
+        response = client.get(url)
+        assert response.status_code == 200
+        body = response.json
+        assert len(body['requests']) <= 10
+        seen.extend(r['blood_request_id'] for r in body['requests'])
+        cursor = body['next_cursor']
+        if not cursor:
+            break
+
+    assert len(seen) == 25
+    assert seen == sorted(seen, reverse=True)
+
+def test_filters_apply_to_pages(client, make_user, make_hospital):
+    _seed_requests(make_user, make_hospital, 16)
+    response = client.get('/blood/requests?blood_group_id=3&limit=1')
+    assert len(response.json['requests']) == 1
+    assert response.json['requests'][0]['blood_group_type'] == 3
+    response = client.get(f"/blood/requests?blood_group_id=3&limit=1&cursor={response.json['next_cursor']}")
+    assert response.json['requests'][0]['blood_group_type'] == 3
+    assert response.json['next_cursor'] is None
+
+def test_unpaginated_flag_keeps_legacy_shape(client, make_user, make_hospital):
+    _seed_requests(make_user, make_hospital, 3)
+    response = client.get('/blood/requests?paginate=false')
+    assert isinstance(response.json, list)
+    assert len(response.json) == 3
+
+def test_invalid_cursor(client):
+    assert client.get('/blood/requests?cursor=not-a-cursor').status_code == 400
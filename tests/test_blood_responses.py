@@ -0,0 +1,87 @@
+import pytest
+
+from app.controllers.blood_responses import upsert_response
+from db import db
+from models import BloodRequest, BloodRequestResponse
+
+@pytest.fixture
+def blood_request(make_user, make_hospital):
+    requester = make_user()
+    hospital = make_hospital()
+    blood_request = BloodRequest(requester.user_id, hospital.hospital_id, 1, 2, 'Patient')
+    db.session.add(blood_request)
+    db.session.commit()
+    return blood_request.blood_request_id
+
+def _responses(request_id):
+    return BloodRequestResponse.query.filter_by(blood_request_id=request_id).all()
+
+def test_upsert_reports_created_only_once(blood_request, make_user):
+    donor = make_user()
+    first, created = upsert_response(blood_request, donor.user_id, response_status='accepted')
+    assert created
+    again, created_again = upsert_response(blood_request, donor.user_id, response_status='declined')
+    assert not created_again
+    assert again.blood_requests_response_id == first.blood_requests_response_id
+    assert again.response_status == 'accepted'
+
+def test_created_does_not_depend_on_the_clock(blood_request, make_user, monkeypatch):
+    from datetime import datetime
+    from app.controllers import blood_responses
+
+    class FrozenClock(datetime):
+        @classmethod
+        def utcnow(cls):
+            return datetime(2030, 1, 1, 12, 0)
+
+    # Both calls write the same created_at, so only the statement can tell them apart
+    monkeypatch.setattr(blood_responses, 'datetime', FrozenClock)
+    donor = make_user()
+    assert upsert_response(blood_request, donor.user_id, update=('message',), response_status='accepted', message='first')[1]
+    assert not upsert_response(blood_request, donor.user_id, update=('message',), response_status='accepted', message='second')[1]
+
+def test_upsert_updates_named_columns(blood_request, make_user):
+    donor = make_user()
+    upsert_response(blood_request, donor.user_id, response_status='accepted', message='first')
+    response, created = upsert_response(
+        blood_request, donor.user_id, update=('message',), response_status='declined', message='second'
+    )
+    assert not created
+    assert (response.response_status, response.message) == ('accepted', 'second')
+
+def test_respond_inserts_in_one_statement(client, blood_request, make_user, auth_headers, count_queries):
+    donor = make_user()
+    url = f'/blood/request/{blood_request}/respond'
+    body = {'blood_request_id': blood_request, 'user_id': donor.user_id}
+    with count_queries() as statements:
+        first = client.post(url, json={**body, 'response_status': 'declined'}, headers=auth_headers(donor))
+    assert first.status_code == 201
+    assert sum(s.lstrip().upper().startswith('INSERT') for s in statements) == 1
+    assert not any('FROM blood_requests_responses' in s for s in statements if s.lstrip().upper().startswith('SELECT'))
+
+    second = client.post(url, json={**body, 'response_status': 'accepted'}, headers=auth_headers(donor))
+    assert second.status_code == 400
+    assert [r.response_status for r in _responses(blood_request)] == ['declined']
+
+def test_schedule_creates_then_reschedules(client, blood_request, make_user, auth_headers):
+    donor = make_user()
+    body = {'request_id': blood_request, 'scheduled_datetime': '2030-01-02T10:00:00'}
+    created = client.post('/blood/donation/schedule', json=body, headers=auth_headers(donor))
+    assert created.status_code == 201
+
+    body['scheduled_datetime'] = '2030-01-03T09:30:00Z'
+    updated = client.post('/blood/donation/schedule', json=body, headers=auth_headers(donor))
+    assert updated.status_code == 200
+    assert updated.get_json()['response_id'] == created.get_json()['response_id']
+
+    db.session.expire_all()
+    (response,) = _responses(blood_request)
+    assert response.response_status == 'scheduled'
+    assert response.scheduled_datetime.day == 3
+
+def test_blood_response_rejects_duplicates(client, blood_request, make_user, auth_headers):
+    donor = make_user()
+    body = {'blood_request_id': blood_request, 'response_status': 'Pending', 'from_date': '2030-01-01'}
+    assert client.post('/blood/blood-response', json=body, headers=auth_headers(donor)).status_code == 201
+    assert client.post('/blood/blood-response', json=body, headers=auth_headers(donor)).status_code == 400
+    assert len(_responses(blood_request)) == 1
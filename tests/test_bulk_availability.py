@@ -0,0 +1,91 @@
+from datetime import date
+
+from flask import g
+
+from db import db
+from models import HospitalBloodAvailability, UserHospitalAdminLineage
+
+URL = '/hospital/availability/bulk'
+
+def _units(hospital_id):
+    db.session.expire_all()
+    rows = HospitalBloodAvailability.query.filter_by(hospital_id=hospital_id).all()
+    return {row.blood_group_id: row.no_of_units for row in rows}
+
+def _admin_of(make_user, *hospitals):
+    admin = make_user(role_id=2)
+    for hospital in hospitals:
+        db.session.add(UserHospitalAdminLineage(user_id=admin.user_id, hospital_id=hospital.hospital_id))
+    db.session.commit()
+    return admin
+
+def test_bulk_update_creates_and_updates_in_one_upsert(client, make_user, make_hospital, auth_headers, count_queries):
+    first, second = make_hospital('First'), make_hospital('Second')
+    user = _admin_of(make_user, first, second)
+    db.session.add(HospitalBloodAvailability(first.hospital_id, 1, 3, date.today(), to_date=date.today()))
+    db.session.commit()
+    rows = [{'hospital_id': first.hospital_id, 'blood_group_id': group, 'no_of_units': group * 2}
+            for group in range(1, 9)]
+    rows.append({'hospital_id': second.hospital_id, 'blood_group': 'o-', 'no_of_units': 0})
+
+    with count_queries() as statements:
+        response = client.post(URL, json={'rows': rows}, headers=auth_headers(user))
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body['applied'], body['failed']) == (9, 0)
+    assert [r['status'] for r in body['results']] == ['updated'] + ['created'] * 8
+    assert sum(s.lstrip().upper().startswith('INSERT') for s in statements) == 1
+    assert sum('FROM hospitals' in s for s in statements) == 1
+    assert _units(first.hospital_id) == {group: group * 2 for group in range(1, 9)}
+    assert _units(second.hospital_id) == {8: 0}
+    assert HospitalBloodAvailability.query.get((first.hospital_id, 1)).to_date is None
+
+def test_bulk_update_reports_invalid_rows(client, make_user, make_hospital, auth_headers):
+    # A super admin, so the unknown hospital is reported per row rather than refused
+    user = make_user(role_id=1)
+    hospital = make_hospital()
+    rows = [
+        {'blood_group_id': 1, 'no_of_units': 4},
+        {'hospital_id': 999, 'blood_group_id': 1, 'no_of_units': 4},
+        {'blood_group_id': 42, 'no_of_units': 4},
+        {'blood_group_id': 2, 'no_of_units': -1},
+        {'blood_group_id': 1, 'no_of_units': 6},
+    ]
+    response = client.post(URL, json={'hospital_id': hospital.hospital_id, 'rows': rows}, headers=auth_headers(user))
+
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [r['status'] for r in results] == ['error', 'error', 'error', 'error', 'created']
+    assert results[0]['error'].startswith('Superseded')
+    assert results[1]['error'] == 'Hospital not found'
+    assert results[2]['error'] == 'Blood group not found'
+    assert _units(hospital.hospital_id) == {1: 6}
+
+def test_bulk_update_rejects_empty_and_oversized_payloads(app, client, make_user, auth_headers):
+    headers = auth_headers(make_user(role_id=1))
+    assert client.post(URL, json={'rows': []}, headers=headers).status_code == 400
+    app.config['AVAILABILITY_BULK_MAX_ROWS'] = 2
+    rows = [{'hospital_id': 1, 'blood_group_id': 1, 'no_of_units': 1}] * 3
+    assert client.post(URL, json=rows, headers=headers).status_code == 413
+
+def test_bulk_update_is_limited_to_administered_hospitals(client, make_user, make_hospital, auth_headers):
+    own, other = make_hospital('Own'), make_hospital('Other')
+    admin = _admin_of(make_user, own)
+    row = {'blood_group_id': 1, 'no_of_units': 4}
+
+    def post(body, user):
+        # The test app context outlives each request, so drop the g memo by hand
+        g.pop('auth_principal', None)
+        return client.post(URL, json=body, headers=auth_headers(user))
+
+    assert post({'hospital_id': own.hospital_id, 'rows': [row]}, make_user()).status_code == 403
+    # The top-level hospital_id counts for rows that omit theirs
+    mixed = [{**row, 'hospital_id': own.hospital_id}, row]
+    response = post({'hospital_id': other.hospital_id, 'rows': mixed}, admin)
+    assert response.status_code == 403
+    assert response.get_json()['hospital_ids'] == [other.hospital_id]
+    assert _units(own.hospital_id) == {} and _units(other.hospital_id) == {}
+
+    assert post({'hospital_id': own.hospital_id, 'rows': [row]}, admin).status_code == 200
+    assert _units(own.hospital_id) == {1: 4}
@@ -0,0 +1,83 @@
+from datetime import date
+
+import pytest
+
+from db import db
+from models import BloodRequest, Hospital, HospitalBloodAvailability
+
+@pytest.fixture
+def setting(make_user, make_hospital, auth_headers):
+    requester = make_user()
+    donor = make_user()
+    hospital = make_hospital()
+    db.session.add(HospitalBloodAvailability(hospital.hospital_id, 1, 10, date.today()))
+    blood_request = BloodRequest(requester.user_id, hospital.hospital_id, 1, 1, 'Patient')
+    db.session.add(blood_request)
+    db.session.commit()
+    return {'hospital_id': hospital.hospital_id, 'blood_request_id': blood_request.blood_request_id,
+            'headers': auth_headers(donor), 'donor': donor.user_id}
+
+def _revalidate(client, url, headers):
+    first = client.get(url, headers=headers)
+    assert first.status_code == 200 and first.headers['ETag'].startswith('W/')
+    assert 'no-cache' in first.headers['Cache-Control']
+    again = client.get(url, headers={**headers, 'If-None-Match': first.headers['ETag']})
+    return first, again
+
+@pytest.mark.parametrize('url,auth', [
+    ('/hospital/list', False),
+    ('/hospital/{hospital_id}', False),
+    ('/hospital/availability?hospital_id={hospital_id}', False),
+    ('/blood/request/{blood_request_id}', True),
+])
+def test_unchanged_resources_are_not_resent(client, setting, count_queries, url, auth):
+    url = url.format(**setting)
+    headers = setting['headers'] if auth else {}
+    first, _ = _revalidate(client, url, headers)
+    with count_queries() as statements:
+        again = client.get(url, headers={**headers, 'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304 and again.get_data() == b''
+    assert again.headers['ETag'] == first.headers['ETag']
+    # Only the validator ran
+    assert len([s for s in statements if s.lstrip().upper().startswith('SELECT')]) == 1
+
+def test_hospital_changes_invalidate(client, setting, make_hospital):
+    first, _ = _revalidate(client, '/hospital/list', {})
+    detail, _ = _revalidate(client, f"/hospital/{setting['hospital_id']}", {})
+    db.session.get(Hospital, setting['hospital_id']).hospital_name = 'Renamed'
+    db.session.commit()
+    for url, previous in (('/hospital/list', first), (f"/hospital/{setting['hospital_id']}", detail)):
+        response = client.get(url, headers={'If-None-Match': previous.headers['ETag']})
+        assert response.status_code == 200 and 'Renamed' in response.get_data(as_text=True)
+
+    # A new row changes the list's validator too
+    listed, _ = _revalidate(client, '/hospital/list', {})
+    make_hospital('Another')
+    assert client.get('/hospital/list', headers={'If-None-Match': listed.headers['ETag']}).status_code == 200
+
+def test_last_modified_on_hospital_detail(client, setting):
+    first = client.get(f"/hospital/{setting['hospital_id']}")
+    response = client.get(f"/hospital/{setting['hospital_id']}",
+                          headers={'If-Modified-Since': first.headers['Last-Modified']})
+    assert response.status_code == 304
+
+def test_availability_bulk_update_invalidates(client, setting, auth_headers, make_user):
+    url = f"/hospital/availability?hospital_id={setting['hospital_id']}"
+    first, _ = _revalidate(client, url, {})
+    admin = make_user(role_id=1)
+    rows = [{'hospital_id': setting['hospital_id'], 'blood_group_id': 1, 'no_of_units': 4}]
+    assert client.post('/hospital/availability/bulk', json={'rows': rows}, headers=auth_headers(admin)).status_code == 200
+    response = client.get(url, headers={'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 200 and response.json[0]['no_of_units'] == 4
+
+def test_new_response_invalidates_request_detail(client, setting):
+    url = f"/blood/request/{setting['blood_request_id']}"
+    first, _ = _revalidate(client, url, setting['headers'])
+    body = {'blood_request_id': setting['blood_request_id'], 'response_status': 'Pending', 'from_date': '2030-01-01'}
+    assert client.post('/blood/blood-response', json=body, headers=setting['headers']).status_code == 201
+    response = client.get(url, headers={**setting['headers'], 'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 200 and len(response.json['responses']) == 1
+
+def test_missing_entities_still_404(client, setting):
+    assert client.get('/hospital/9999', headers={'If-None-Match': '*'}).status_code == 404
+    assert client.get('/hospital/availability?hospital_id=9999').status_code == 404
@@ -0,0 +1,37 @@
+from config import engine_options
+
+def test_engine_options_for_postgres(monkeypatch):
+    monkeypatch.setenv('DB_POOL_SIZE', '7')
+    monkeypatch.setenv('DB_STATEMENT_TIMEOUT_MS', '2500')
+    options = engine_options('postgresql://user@localhost/db')
+
+    assert options['pool_size'] == 7
+    assert options['pool_pre_ping'] is True
+    assert options['pool_recycle'] == 1800
+    assert '-c statement_timeout=2500' in options['connect_args']['options']
+
+def test_engine_options_for_sqlite_skip_pool_sizing():
+    assert engine_options('sqlite://') == {'pool_pre_ping': True}
+
+def test_prefix_selects_separate_settings(monkeypatch):
+    monkeypatch.setenv('DB_REPLICA_POOL_SIZE', '3')
+    assert engine_options('postgresql://user@localhost/db', prefix='DB_REPLICA_')['pool_size'] == 3
+
+def test_health_and_pool_stats(client):
+    assert client.get('/health').json == {'status': 'ok', 'database': 'ok'}
+
+    response = client.get('/health/pool')
+    assert response.status_code == 200
+    assert response.json['pools']['default']['pool_class']
+
+def test_queue_pool_stats(tmp_path):
+    from sqlalchemy import create_engine
+    from app.utils.db_pool import pool_stats
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", pool_size=2, max_overflow=1)
+    with engine.connect():
+        stats = pool_stats(engine)
+    assert stats['pool_class'] == 'QueuePool'
+    assert stats['checked_out'] == 1
+    assert stats['size'] == 2 and stats['max_overflow'] == 1
+    engine.dispose()
@@ -0,0 +1,76 @@
+from datetime import date
+
+from db import db
+from models import BloodRequest, BloodRequestResponse
+from app.controllers.donor_matching import DonorBuckets, normalize_blood_group
+
+def test_normalize_blood_group():
+    assert normalize_blood_group('o +ve') == 'O+'
+    assert normalize_blood_group('AB Negative') == 'AB-'
+    assert normalize_blood_group('b-') == 'B-'
+    assert normalize_blood_group('unknown') is None
+    assert normalize_blood_group(None) is None
+
+def test_buckets_rank_by_pincode_then_group():
+    buckets = DonorBuckets()
+    buckets.build([
+        (1, 'O-', '560001'),
+        (2, 'A+', '560001'),
+        (3, 'A+', '560095'),
+        (4, 'B+', '560001'),   # incompatible with A+
+        (5, 'A-', '110001'),
+        (6, 'O+', '560001'),
+    ])
+    ranked = buckets.candidates('A+', '560001', limit=10)
+    assert [user_id for user_id, _, _ in ranked] == [2, 6, 1, 3, 5]
+    assert ranked[0][2] == 6 and ranked[3][2] == 3 and ranked[4][2] == 0
+
+    assert [u for u, _, _ in buckets.candidates('A+', '560001', exclude={2, 6}, limit=2)] == [1, 3]
+    assert [u for u, _, _ in buckets.candidates('O-', '560001')] == [1]
+
+    buckets.remove(1)
+    buckets.add(7, 'O-', '560002')
+    assert [u for u, _, _ in buckets.candidates('O-', '560001')] == [7]
+
+def test_candidates_endpoint(client, make_user, make_hospital, auth_headers):
+    requester = make_user(role_id=3, blood_group='B+')
+    hospital = make_hospital(hospital_pincode='560001')
+    near = make_user(blood_group='A+', pincode='560001')
+    far = make_user(blood_group='o-', pincode='110001')
+    responded = make_user(blood_group='A+', pincode='560001')
+    make_user(blood_group='B+', pincode='560001')
+    make_user(role_id=2, blood_group='A+', pincode='560001')
+
+    blood_request = BloodRequest(
+        user_id=requester.user_id,
+        hospital_id=hospital.hospital_id,
+        blood_group_type=1,  # A+
+        no_of_units=1,
+        patient_name='Patient',
+        required_by_date=date.today(),
+    )
+    db.session.add(blood_request)
+    db.session.flush()
+    db.session.add(BloodRequestResponse(blood_request.blood_request_id, responded.user_id, 'accepted', date.today()))
+    db.session.commit()
+
+    # Donors registering after the buckets are built are picked up
+    client.get(f'/blood/request/{blood_request.blood_request_id}/candidates', headers=auth_headers(requester))
+    response = client.post('/auth/register', json={
+        'fullname': 'New Donor', 'password': 'secret123', 'emailaddress': 'new@example.com',
+        'phonenumber': '7777777777', 'bloodgroup': 'A-', 'address': 'x', 'pincode': '560001',
+    })
+    assert response.status_code == 201
+
+    response = client.get(f'/blood/request/{blood_request.blood_request_id}/candidates', headers=auth_headers(requester))
+    assert response.status_code == 200
+    candidates = response.json['candidates']
+    assert candidates[0]['user_id'] == near.user_id and candidates[0]['match'] == 'exact'
+    assert candidates[1]['user_name'] == 'New Donor' and candidates[1]['match'] == 'compatible'
+    assert candidates[-1]['user_id'] == far.user_id and candidates[-1]['proximity'] == 'other'
+    assert responded.user_id not in [c['user_id'] for c in candidates]
+    assert len(candidates) == 3
+
+    stranger = make_user()
+    response = client.get(f'/blood/request/{blood_request.blood_request_id}/candidates', headers=auth_headers(stranger))
+    assert response.status_code == 403
@@ -0,0 +1,46 @@
+from datetime import date
+
+from db import db
+from models import User, Hospital, HospitalBloodAvailability, BloodRequest, BloodRequestResponse
+from scripts.generate_data import generate, donor_email
+
+GENERATED = [BloodRequestResponse, BloodRequest, HospitalBloodAvailability, User, Hospital]
+
+def _snapshot():
+    return {
+        model.__tablename__: [tuple(row) for row in db.session.execute(db.select(*model.__table__.columns)).all()]
+        for model in GENERATED
+    }
+
+def _generate(**kwargs):
+    return generate(db, hospitals=5, donors=40, requests=30, seed_value=7, batch_size=8,
+                    password_hash='x', as_of=date(2024, 6, 1), log=lambda message: None, **kwargs)
+
+def test_generator_is_deterministic(app):
+    result = _generate()
+    assert result['counts']['hospitals'] == 5
+    assert result['counts']['hospital_blood_availability'] == 5 * 8
+    assert result['counts']['users'] == 40
+    assert result['counts']['blood_requests'] == 30
+    first = _snapshot()
+
+    for model in GENERATED:
+        db.session.execute(model.__table__.delete())
+    db.session.commit()
+    _generate()
+    assert _snapshot() == first
+
+def test_generator_continues_after_existing_rows(app, make_user):
+    existing = make_user()
+    result = _generate()
+
+    assert result['user_ids'][0] == existing.user_id + 1
+    user = db.session.get(User, result['user_ids'][0])
+    assert user.user_email == donor_email(user.user_id)
+    assert db.session.query(BloodRequest).filter(BloodRequest.user_id.in_(list(result['user_ids']))).count() == 30
+
+def test_generated_requests_use_statuses_the_api_accepts(app):
+    _generate()
+    statuses = {status for (status,) in db.session.query(BloodRequest.status).distinct()}
+    assert statuses <= {'pending', 'accepted', 'cancelled', 'completed'}
+    assert {'pending', 'completed'} <= statuses
@@ -0,0 +1,56 @@
+import random
+
+from app.utils.geo_index import HospitalGeoIndex, haversine_km
+
+def test_index_matches_brute_force():
+    rng = random.Random(7)
+    points = [(i, rng.uniform(8.0, 30.0), rng.uniform(70.0, 90.0)) for i in range(2000)]
+    index = HospitalGeoIndex(cell_size_deg=0.25)
+    index.build(points)
+
+    for _ in range(25):
+        lat, lng = rng.uniform(8.0, 30.0), rng.uniform(70.0, 90.0)
+        expected = sorted((haversine_km(lat, lng, p_lat, p_lng), i) for i, p_lat, p_lng in points)[:5]
+        assert [i for i, _ in index.nearest(lat, lng, limit=5)] == [i for _, i in expected]
+
+        within = {i for d, i in expected if d <= 40}
+        got = index.nearest(lat, lng, limit=5, radius_km=40)
+        assert {i for i, _ in got} == within
+
+def test_index_add_and_remove():
+    index = HospitalGeoIndex()
+    index.build([(1, 12.97, 77.59)])
+    index.add(2, 12.98, 77.60)
+    assert [i for i, _ in index.nearest(12.98, 77.60, limit=2)] == [2, 1]
+    index.add(2, 28.61, 77.20)
+    assert [i for i, _ in index.nearest(12.98, 77.60, limit=1)] == [1]
+    index.remove(1)
+    assert [i for i, _ in index.nearest(12.98, 77.60, limit=5)] == [2]
+
+def test_nearby_endpoint(client, make_hospital, make_user, auth_headers):
+    make_hospital('Bangalore Central', hospital_address_lat=12.97, hospital_address_long=77.59)
+    make_hospital('Delhi General', hospital_address_lat=28.61, hospital_address_long=77.20)
+    make_hospital('No Coordinates')
+
+    response = client.get('/hospital/nearby?lat=12.9&lng=77.6&limit=5')
+    assert response.status_code == 200
+    assert [h['hospital_name'] for h in response.json] == ['Bangalore Central', 'Delhi General']
+    assert response.json[0]['distance_km'] < 10
+
+    response = client.get('/hospital/nearby?lat=12.9&lng=77.6&radius_km=50')
+    assert [h['hospital_name'] for h in response.json] == ['Bangalore Central']
+
+    # Newly registered hospitals are searchable without a rebuild
+    admin = make_user(role_id=2)
+    response = client.post('/hospital/register', headers=auth_headers(admin), json={
+        'hospital_name': 'Koramangala Clinic',
+        'hospital_address_lat': 12.93,
+        'hospital_address_long': 77.62,
+    })
+    assert response.status_code == 201
+    response = client.get('/hospital/nearby?lat=12.93&lng=77.62&limit=1')
+    assert response.json[0]['hospital_name'] == 'Koramangala Clinic'
+
+def test_nearby_requires_coordinates(client):
+    assert client.get('/hospital/nearby?lat=12.9').status_code == 400
+    assert client.get('/hospital/nearby?lat=abc&lng=1').status_code == 400
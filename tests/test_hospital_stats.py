@@ -0,0 +1,81 @@
+from datetime import date
+
+import pytest
+
+from app.utils.hospital_stats import get_hospital_stats_cache
+from db import db
+from models import BloodRequest, HospitalBloodAvailability, UserHospitalAdminLineage
+
+@pytest.fixture
+def dashboard(make_user, make_hospital, auth_headers):
+    admin = make_user(role_id=2)
+    requester = make_user()
+    hospital = make_hospital()
+    db.session.add(UserHospitalAdminLineage(user_id=admin.user_id, hospital_id=hospital.hospital_id))
+    db.session.add(HospitalBloodAvailability(hospital.hospital_id, 1, 10, date.today()))
+    db.session.add(HospitalBloodAvailability(hospital.hospital_id, 2, 3, date.today()))
+    db.session.add(HospitalBloodAvailability(hospital.hospital_id, 3, 50, date.today(), to_date=date.today()))
+    for status in ('pending', 'pending', 'completed', 'cancelled'):
+        db.session.add(BloodRequest(requester.user_id, hospital.hospital_id, 1, 1, 'Patient', status=status))
+    db.session.commit()
+    return {'hospital_id': hospital.hospital_id, 'requester': requester.user_id, 'headers': auth_headers(admin)}
+
+def _stats(client, dashboard):
+    response = client.get('/hospital/stats', headers=dashboard['headers'])
+    assert response.status_code == 200
+    return response.get_json()
+
+def test_stats_are_aggregated_from_inventory_and_requests(client, dashboard, count_queries):
+    with count_queries() as statements:
+        stats = _stats(client, dashboard)
+    assert stats == {'unitsAvailable': 13, 'activeRequests': 2, 'fulfilled': 1, 'critical': 1}
+    assert sum('UNION ALL' in s for s in statements) == 1
+
+    with count_queries() as statements:
+        _stats(client, dashboard)
+    assert not any('UNION ALL' in s for s in statements)
+
+def test_committed_changes_update_the_cached_entry(client, dashboard, count_queries):
+    _stats(client, dashboard)
+    hospital_id = dashboard['hospital_id']
+
+    db.session.get(HospitalBloodAvailability, (hospital_id, 2)).no_of_units = 30
+    db.session.add(HospitalBloodAvailability(hospital_id, 4, 1, date.today()))
+    pending = BloodRequest.query.filter_by(hospital_id=hospital_id, status='pending').first()
+    pending.status = 'completed'
+    db.session.add(BloodRequest(dashboard['requester'], hospital_id, 2, 1, 'Another', status='pending'))
+    db.session.commit()
+
+    with count_queries() as statements:
+        stats = _stats(client, dashboard)
+    assert not any('UNION ALL' in s for s in statements)
+    assert stats == {'unitsAvailable': 41, 'activeRequests': 2, 'fulfilled': 2, 'critical': 1}
+
+def test_status_set_without_loading_reloads_the_entry(client, dashboard):
+    _stats(client, dashboard)
+    pending = BloodRequest.query.filter_by(hospital_id=dashboard['hospital_id'], status='pending').first()
+    db.session.commit()
+    pending.status = 'completed'
+    db.session.commit()
+    assert _stats(client, dashboard)['fulfilled'] == 2
+
+def test_rolled_back_changes_are_ignored(client, dashboard):
+    _stats(client, dashboard)
+    db.session.get(HospitalBloodAvailability, (dashboard['hospital_id'], 1)).no_of_units = 0
+    db.session.flush()
+    db.session.rollback()
+    assert _stats(client, dashboard)['unitsAvailable'] == 13
+
+def test_bulk_availability_updates_the_cached_entry(client, dashboard):
+    _stats(client, dashboard)
+    rows = [{'hospital_id': dashboard['hospital_id'], 'blood_group_id': 1, 'no_of_units': 2}]
+    assert client.post('/hospital/availability/bulk', json=rows, headers=dashboard['headers']).status_code == 200
+    assert _stats(client, dashboard) == {'unitsAvailable': 5, 'activeRequests': 2, 'fulfilled': 1, 'critical': 2}
+
+def test_expired_entries_reload(app, client, dashboard, count_queries):
+    cache = get_hospital_stats_cache()
+    cache.ttl_seconds = 0.000001
+    _stats(client, dashboard)
+    with count_queries() as statements:
+        _stats(client, dashboard)
+    assert sum('UNION ALL' in s for s in statements) == 1
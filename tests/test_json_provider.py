@@ -0,0 +1,68 @@
+import json
+from datetime import date, datetime
+
+import pytest
+
+from app.utils import json_provider
+from app.utils.serializers import BLOOD_REQUEST_DETAIL, DONATION_LIST
+from db import db
+from models import BloodRequest, BloodRequestResponse
+from scripts.benchmark_json import handwritten, make_rows, run
+
+PAYLOAD = {'b': date(2024, 1, 2), 'a': datetime(2024, 1, 2, 3, 4, 5, 6), 'n': None}
+EXPECTED = {'a': '2024-01-02T03:04:05.000006', 'b': '2024-01-02', 'n': None}
+
+@pytest.mark.parametrize('fast', [True, False], ids=['orjson', 'stdlib'])
+def test_dates_are_iso_8601_with_either_encoder(app, monkeypatch, fast):
+    if fast and json_provider.orjson is None:
+        pytest.skip('orjson is not installed')
+    if not fast:
+        monkeypatch.setattr(json_provider, 'orjson', None)
+    body = app.json.response(PAYLOAD).get_data(as_text=True)
+    assert json.loads(body) == EXPECTED
+    assert body.index('"a"') < body.index('"b"')
+    assert json.loads(app.json.dumps(PAYLOAD)) == EXPECTED
+
+def test_provider_can_be_turned_off(monkeypatch):
+    from app import create_app
+    from config import TestingConfig
+    monkeypatch.setattr(TestingConfig, 'JSON_FAST_ENCODER', False)
+    assert not isinstance(create_app('testing').json, json_provider.FastJSONProvider)
+
+def test_turning_the_provider_off_keeps_iso_dates(app, monkeypatch, make_user, make_hospital, auth_headers):
+    monkeypatch.setitem(app.config, 'JSON_FAST_ENCODER', False)
+    json_provider.init_app(app)
+    assert type(app.json) is json_provider.ISOJSONProvider
+
+    user = make_user()
+    db.session.add(BloodRequest(user.user_id, make_hospital().hospital_id, 1, 1, 'Patient'))
+    db.session.commit()
+    response = app.test_client().get('/blood/requests', headers=auth_headers(user))
+    created_at = response.json['requests'][0]['created_at']
+    assert datetime.fromisoformat(created_at)
+    assert 'GMT' not in response.get_data(as_text=True)
+
+def test_serializer_matches_handwritten_dicts(app):
+    (row,) = make_rows(1)
+    assert json.loads(app.json.dumps(BLOOD_REQUEST_DETAIL(row))) == handwritten(row)
+
+def test_serializer_loads_what_is_not_loaded(app, make_user, make_hospital):
+    donor = make_user()
+    email = donor.user_email
+    blood_request = BloodRequest(donor.user_id, make_hospital().hospital_id, 1, 1, 'Patient')
+    db.session.add(blood_request)
+    db.session.flush()
+    db.session.add(BloodRequestResponse(blood_request.blood_request_id, donor.user_id, 'accepted', date.today(),
+                                        scheduled_datetime=datetime(2030, 1, 1, 9, 0)))
+    db.session.commit()
+    db.session.expunge_all()
+
+    (serialized,) = DONATION_LIST.many(BloodRequestResponse.query.all())
+    assert serialized['hospital_name'] == 'General Hospital'
+    assert serialized['donor_email'] == email
+    assert serialized['scheduled_datetime'] == datetime(2030, 1, 1, 9, 0)
+
+def test_json_benchmark_paths_agree():
+    results = run(rows_count=20, repeat=1)
+    assert 'handwritten' in results and 'serializer' in results
+    assert len({r['bytes'] for r in results.values()}) == 1
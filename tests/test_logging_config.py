@@ -0,0 +1,46 @@
+import json
+import logging
+
+from flask import g
+
+from app.utils.logging_config import RequestContextFilter, JsonFormatter, _parse_levels
+
+def _record(level=logging.INFO, **extra):
+    record = logging.LogRecord('app.test', level, __file__, 1, 'hello %s', ('world',), None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+def test_request_id_is_echoed_or_generated(client):
+    response = client.get('/blood/blood-groups', headers={'X-Request-ID': 'abc123'})
+    assert response.headers['X-Request-ID'] == 'abc123'
+
+    generated = client.get('/blood/blood-groups').headers['X-Request-ID']
+    assert len(generated) == 32 and generated != 'abc123'
+
+def test_filter_stamps_request_id_and_drops_unsampled_debug(app):
+    log_filter = RequestContextFilter()
+    with app.test_request_context('/'):
+        g.request_id = 'req-1'
+        g.log_debug_sampled = False
+        info = _record()
+        assert log_filter.filter(info) and info.request_id == 'req-1'
+        assert not log_filter.filter(_record(logging.DEBUG))
+
+        g.log_debug_sampled = True
+        assert log_filter.filter(_record(logging.DEBUG))
+
+    outside = _record(logging.DEBUG)
+    assert log_filter.filter(outside) and outside.request_id == '-'
+
+def test_json_formatter_includes_extras():
+    record = _record(request_id='req-2', queries=3)
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry['message'] == 'hello world'
+    assert entry['request_id'] == 'req-2'
+    assert entry['queries'] == 3
+    assert entry['logger'] == 'app.test'
+
+def test_parse_levels():
+    assert _parse_levels('app.sql=debug, werkzeug=WARNING') == {'app.sql': 'DEBUG', 'werkzeug': 'WARNING'}
+    assert _parse_levels('') == {}
@@ -0,0 +1,69 @@
+from datetime import date
+
+from db import db
+from models import LookupBloodGroup, BloodRequest
+from app.utils import lookup_cache
+from app.utils.lookup_cache import get_lookup_cache
+
+def test_resolves_by_name_or_id(app):
+    lookups = get_lookup_cache()
+    assert lookups.blood_group('ab-')['blood_group_id'] == 6
+    assert lookups.blood_group(7)['blood_group_name'] == 'O+'
+    assert lookups.blood_group('7')['blood_group_name'] == 'O+'
+    assert lookups.blood_group('Z+') is None
+    assert lookups.role('DONOR')['lookup_role_id'] == 3
+
+def test_cache_serves_without_queries_and_reloads_on_write(app, count_queries):
+    lookups = get_lookup_cache()
+    lookups.blood_groups()
+    with count_queries() as statements:
+        lookups.blood_group('A+')
+        lookups.blood_groups_json()
+    assert statements == []
+
+    db.session.add(LookupBloodGroup(blood_group_name='Bombay', from_date=date.today()))
+    db.session.commit()
+    assert lookups.blood_group('bombay')['blood_group_id'] == 9
+
+def test_generation_moves_only_when_a_lookup_write_commits(app):
+    before = lookup_cache._generation
+    db.session.add(LookupBloodGroup(blood_group_name='Bombay', from_date=date.today()))
+    db.session.flush()
+    assert lookup_cache._generation == before
+    db.session.rollback()
+    assert lookup_cache._generation == before
+
+    db.session.add(LookupBloodGroup(blood_group_name='Bombay', from_date=date.today()))
+    db.session.flush()
+    assert lookup_cache._generation == before
+    db.session.commit()
+    assert lookup_cache._generation == before + 1
+
+def test_blood_groups_etag(client):
+    response = client.get('/blood/blood-groups')
+    assert response.status_code == 200
+    assert [bg['blood_group_name'] for bg in response.json][:2] == ['A+', 'A-']
+    etag = response.headers['ETag']
+
+    response = client.get('/blood/blood-groups', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+def test_create_request_resolves_blood_group_from_cache(client, make_user, make_hospital, auth_headers):
+    user = make_user()
+    hospital = make_hospital()
+    payload = {
+        'user_id': user.user_id,
+        'hospital_id': hospital.hospital_id,
+        'blood_group_type': 8,
+        'no_of_units': 2,
+        'patient_name': 'Patient',
+        'required_by_date': date.today().isoformat(),
+    }
+    response = client.post('/blood/request', json=payload, headers=auth_headers(user))
+    assert response.status_code == 201
+    assert db.session.get(BloodRequest, response.json['blood_request_id']).blood_group_type == 8
+
+    payload['blood_group_type'] = 42
+    response = client.post('/blood/request', json=payload, headers=auth_headers(user))
+    assert response.status_code == 404
+    assert 'Available blood groups: A+, A-' in response.json['error']
@@ -0,0 +1,37 @@
+from prometheus_client.parser import text_string_to_metric_families
+
+def _samples(client):
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.headers['Content-Type'].startswith('text/plain')
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(response.get_data(as_text=True))
+        for sample in family.samples
+    }
+
+def _value(samples, name, **labels):
+    return samples.get((name, tuple(sorted(labels.items()))), 0.0)
+
+def test_requests_are_counted_per_endpoint(client, make_hospital):
+    make_hospital()
+    labels = {'blueprint': 'hospital', 'endpoint': 'hospital.list_hospitals', 'method': 'GET'}
+    before = _samples(client)
+
+    client.get('/hospital/list')
+    client.get('/hospital/list')
+    client.get('/hospital/999999')
+    after = _samples(client)
+
+    assert _value(after, 'http_requests_total', status='200', **labels) - \
+        _value(before, 'http_requests_total', status='200', **labels) == 2
+    assert _value(after, 'http_request_duration_seconds_count', **labels) - \
+        _value(before, 'http_request_duration_seconds_count', **labels) == 2
+    assert _value(after, 'http_requests_in_progress', blueprint='hospital', endpoint='hospital.list_hospitals') == 0
+    assert _value(after, 'http_requests_total', blueprint='hospital', endpoint='hospital.get_hospital',
+                  method='GET', status='404') >= 1
+
+def test_pool_checkout_wait_is_recorded(client):
+    before = _value(_samples(client), 'db_pool_checkout_wait_seconds_count', engine='default')
+    client.get('/hospital/list')
+    assert _value(_samples(client), 'db_pool_checkout_wait_seconds_count', engine='default') > before
@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.utils import outbox
+from db import db
+from models import BloodRequest, Notification, NotificationOutbox, UserDeviceToken
+
+@pytest.fixture
+def transports():
+    return {'email': outbox.FakeTransport(), 'push': outbox.FakeTransport()}
+
+@pytest.fixture
+def setting(make_user, make_hospital, auth_headers):
+    requester = make_user(user_email='requester@example.com')
+    donor = make_user()
+    hospital = make_hospital(hospital_email_id='blood-bank@example.com')
+    blood_request = BloodRequest(requester.user_id, hospital.hospital_id, 1, 1, 'Patient')
+    db.session.add(blood_request)
+    db.session.commit()
+    return {'requester': requester.user_id, 'blood_request_id': blood_request.blood_request_id,
+            'headers': auth_headers(donor)}
+
+def _outbox():
+    db.session.expire_all()
+    return NotificationOutbox.query.order_by(NotificationOutbox.id).all()
+
+def test_enqueue_commits_and_rolls_back_with_the_transaction(setting):
+    outbox.enqueue('email', 'Kept', 'body', user_id=setting['requester'])
+    db.session.commit()
+    outbox.enqueue('email', 'Dropped', 'body', user_id=setting['requester'])
+    db.session.flush()
+    db.session.rollback()
+    assert [row.subject for row in _outbox()] == ['Kept']
+
+def test_accepting_a_response_queues_notifications(client, setting):
+    body = {'blood_request_id': setting['blood_request_id'], 'response_status': 'Accepted',
+            'from_date': '2030-01-01'}
+    response = client.post('/blood/blood-response', json=body, headers=setting['headers'])
+    assert response.status_code == 201
+
+    rows = _outbox()
+    assert {(row.channel, row.user_id, row.recipient) for row in rows} == {
+        ('email', setting['requester'], None),
+        ('push', setting['requester'], None),
+        ('email', None, 'blood-bank@example.com'),
+    }
+    assert all(row.status == 'pending' for row in rows)
+    assert Notification.query.filter_by(user_id=setting['requester']).count() == 1
+
+def test_drain_resolves_addresses_and_marks_sent(setting, transports):
+    db.session.add(UserDeviceToken(setting['requester'], 'token-1', 'android'))
+    db.session.add(UserDeviceToken(setting['requester'], 'token-2', 'ios'))
+    outbox.enqueue('email', 'Hello', 'body', user_id=setting['requester'])
+    outbox.enqueue('push', 'Hello', 'body', user_id=setting['requester'])
+    outbox.enqueue('email', 'Hello', 'body', recipient='blood-bank@example.com')
+    db.session.commit()
+
+    assert outbox.drain_once(transports) == {'sent': 3, 'retried': 0, 'failed': 0}
+    assert sorted(m.to[0] for m in transports['email'].sent) == ['blood-bank@example.com', 'requester@example.com']
+    assert sorted(transports['push'].sent[0].to) == ['token-1', 'token-2']
+    assert all(row.status == 'sent' and row.sent_at for row in _outbox())
+    # Nothing is left to send
+    assert outbox.drain_once(transports) == {'sent': 0, 'retried': 0, 'failed': 0}
+
+def test_failed_sends_back_off_then_give_up(setting, transports):
+    outbox.enqueue('email', 'Hello', 'body', user_id=setting['requester'])
+    db.session.commit()
+    transports['email'].failures = 3
+
+    started = datetime.utcnow()
+    assert outbox.drain_once(transports, max_attempts=2, backoff_seconds=60)['retried'] == 1
+    row = _outbox()[0]
+    assert (row.status, row.attempts, row.last_error) == ('pending', 1, 'simulated failure')
+    assert started + timedelta(seconds=29) <= row.next_attempt_at <= started + timedelta(seconds=61)
+    # Not due yet
+    assert outbox.drain_once(transports, max_attempts=2)['retried'] == 0
+
+    row.next_attempt_at = started
+    db.session.commit()
+    assert outbox.drain_once(transports, max_attempts=2)['failed'] == 1
+    assert (_outbox()[0].status, transports['email'].sent) == ('failed', [])
+
+def test_missing_address_is_an_error(setting, transports):
+    outbox.enqueue('push', 'Hello', 'body', user_id=setting['requester'])
+    db.session.commit()
+    assert outbox.drain_once(transports, max_attempts=1)['failed'] == 1
+    assert _outbox()[0].last_error == 'No address for recipient'
+
+def test_rows_are_leased_and_committed_before_sending(setting):
+    outbox.enqueue('email', 'Hello', 'body', user_id=setting['requester'])
+    db.session.commit()
+    seen = {}
+
+    class Probe(outbox.FakeTransport):
+        def send(self, messages):
+            seen['in_transaction'] = db.session().in_transaction()
+            # Another worker draining now finds nothing due
+            seen['due'] = NotificationOutbox.query.filter(NotificationOutbox.next_attempt_at <= datetime.utcnow()).count()
+            db.session.rollback()
+            return super().send(messages)
+
+    assert outbox.drain_once({'email': Probe()}, lease_seconds=60)['sent'] == 1
+    assert seen == {'in_transaction': False, 'due': 0}
+    assert _outbox()[0].status == 'sent'
+
+def test_an_expired_lease_is_claimed_again(setting, transports):
+    outbox.enqueue('email', 'Hello', 'body', user_id=setting['requester'])
+    db.session.commit()
+
+    class Crash(outbox.FakeTransport):
+        def send(self, messages):
+            raise SystemExit
+
+    with pytest.raises(SystemExit):
+        outbox.drain_once({'email': Crash()})
+    row = _outbox()[0]
+    assert (row.status, row.attempts) == ('pending', 0) and row.next_attempt_at > datetime.utcnow()
+
+    row.next_attempt_at = datetime.utcnow()
+    db.session.commit()
+    assert outbox.drain_once(transports)['sent'] == 1
@@ -0,0 +1,81 @@
+import threading
+import time
+
+import bcrypt
+import pytest
+
+from db import db
+from models import User
+from app.utils.password_hashing import password_hasher, hash_password, verify_password
+
+def _login(client, email, password):
+    return client.post('/auth/login', json={'user_email': email, 'password': password})
+
+def test_register_stores_hash_and_login_works(client):
+    response = client.post('/auth/register', json={
+        'fullname': 'Asha', 'emailaddress': 'asha@example.com', 'phonenumber': '9811111111',
+        'bloodgroup': 'O+', 'address': 'MG Road', 'pincode': '560001', 'password': 's3cret!',
+    })
+    assert response.status_code == 201
+
+    user = User.query.filter_by(user_email='asha@example.com').one()
+    assert user.password.startswith(password_hasher.method_prefix)
+
+    assert _login(client, 'asha@example.com', 's3cret!').status_code == 200
+    assert _login(client, 'asha@example.com', 'wrong').status_code == 401
+
+@pytest.mark.parametrize('legacy_hash', [
+    lambda password: password,
+    lambda password: bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(4)).decode('utf-8'),
+], ids=['plaintext', 'bcrypt'])
+def test_legacy_hash_is_upgraded_on_login(client, make_user, legacy_hash):
+    user = make_user(password=legacy_hash('password123'))
+
+    assert _login(client, user.user_email, 'password123').status_code == 200
+
+    db.session.refresh(user)
+    assert user.password.startswith(password_hasher.method_prefix)
+    assert verify_password(user.password, 'password123') == (True, False)
+
+def test_full_queue_returns_503(app, client, make_user):
+    user = make_user(password=hash_password('password123'))
+    password_hasher.configure(method='scrypt', max_workers=1, max_queue=1, timeout=5)
+    release = threading.Event()
+    blocker = threading.Thread(target=password_hasher._run, args=(release.wait,))
+    blocker.start()
+    try:
+        deadline = time.monotonic() + 5
+        while password_hasher.stats()['queue_depth'] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        response = _login(client, user.user_email, 'password123')
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+        assert password_hasher.stats()['rejected'] == 1
+    finally:
+        release.set()
+        blocker.join()
+
+    assert password_hasher.stats()['queue_depth'] == 0
+    assert _login(client, user.user_email, 'password123').status_code == 200
+
+def test_legacy_auth_routes_return_503_when_hashing_is_busy(app, make_user, monkeypatch):
+    from app.utils.password_hashing import HashingBusy
+    from routes import auth_routes as legacy_auth
+
+    app.register_blueprint(legacy_auth.auth_bp, url_prefix='/legacy-auth', name='legacy_auth')
+    client = app.test_client()
+    user = make_user(password=hash_password('password123'))
+
+    def busy(*args):
+        raise HashingBusy('Password hashing queue is full')
+    monkeypatch.setattr(legacy_auth, 'verify_password', busy)
+    monkeypatch.setattr(legacy_auth, 'hash_password', busy)
+
+    login = client.post('/legacy-auth/login', json={'user_email': user.user_email, 'password': 'password123'})
+    register = client.post('/legacy-auth/register', json={
+        'fullname': 'Meera', 'emailaddress': 'meera@example.com', 'phonenumber': '9833333333', 'password': 's3cret!',
+    })
+    for response in (login, register):
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
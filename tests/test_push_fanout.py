@@ -0,0 +1,90 @@
+from datetime import date, datetime
+
+import pytest
+
+from app.utils import outbox
+from app.utils.push_fanout import FakePushClient, PushTransport
+from db import db
+from models import BloodRequest, NotificationOutbox, UserDeviceToken
+
+@pytest.fixture
+def push(app):
+    client = FakePushClient()
+    transport = PushTransport({'PUSH_MULTICAST_SIZE': 2, 'PUSH_FANOUT_WORKERS': 2}, client=client)
+    yield client, {'push': transport, outbox.DONOR_ALERT: transport}
+    transport.close()
+
+@pytest.fixture
+def setting(client, make_user, make_hospital, auth_headers):
+    requester = make_user(blood_group='O+', pincode='560001')
+    donors = [make_user(blood_group='O-', pincode='560002'), make_user(blood_group='O+', pincode='560001'),
+              make_user(blood_group='A+', pincode='560001')]
+    hospital = make_hospital(hospital_pincode='560001')
+    for n, donor in enumerate(donors):
+        db.session.add(UserDeviceToken(donor.user_id, f'token-{n}a', 'android'))
+        db.session.add(UserDeviceToken(donor.user_id, f'token-{n}b', 'ios'))
+    db.session.add(UserDeviceToken(requester.user_id, 'requester-token', 'android'))
+    db.session.commit()
+
+    payload = {'user_id': requester.user_id, 'hospital_id': hospital.hospital_id, 'blood_group_type': 7, 'no_of_units': 2,
+               'patient_name': 'Patient', 'required_by_date': date.today().isoformat()}
+    response = client.post('/blood/request', json=payload, headers=auth_headers(requester))
+    assert response.status_code == 201
+    return response.json['blood_request_id']
+
+def test_new_request_queues_one_alert(setting):
+    rows = NotificationOutbox.query.all()
+    assert [(row.channel, row.payload['blood_request_id']) for row in rows] == [(outbox.DONOR_ALERT, setting)]
+
+def test_alert_fans_out_to_compatible_donors_in_batches(setting, push, count_queries):
+    client, transports = push
+    with count_queries() as statements:
+        assert outbox.drain_once(transports)['sent'] == 1
+
+    # O+ recipient: the O+ and O- donors' devices, not the A+ donor's or the requester's
+    assert sorted(token for batch in client.batches for token in batch) == ['token-0a', 'token-0b', 'token-1a', 'token-1b']
+    assert all(len(batch) <= 2 for batch in client.batches)
+    # Delivered tokens are touched with a single UPDATE, not one per token
+    assert len([s for s in statements if s.lstrip().upper().startswith('UPDATE USER_DEVICE_TOKENS')]) == 1
+    seen = {token.firebase_device_token: token.last_seen_date for token in UserDeviceToken.query}
+    assert seen['token-0a'] and seen['token-1b'] and not seen['token-2a'] and not seen['requester-token']
+
+def test_invalid_tokens_are_pruned_in_bulk(setting, push):
+    client, transports = push
+    client.invalid = {'token-0a', 'token-1b'}
+    assert outbox.drain_once(transports)['sent'] == 1
+    remaining = {token.firebase_device_token for token in UserDeviceToken.query}
+    assert not remaining & client.invalid
+    assert {'token-0b', 'token-1a'} <= remaining
+
+def test_provider_outage_retries_the_alert(setting, push):
+    client, transports = push
+    client.failures = 1
+    assert outbox.drain_once(transports)['retried'] == 1
+    row = NotificationOutbox.query.one()
+    assert row.status == 'pending' and 'outage' in row.last_error
+
+def test_retry_resends_only_the_failed_batch(setting, push):
+    client, transports = push
+    donor = UserDeviceToken.query.filter_by(firebase_device_token='token-1a').one().user_id
+    db.session.add(UserDeviceToken(donor, 'token-1c', 'android'))
+    db.session.commit()
+
+    # Five tokens in batches of two: the batch holding token-1a fails, the other two go out
+    client.unreachable = {'token-1a'}
+    assert outbox.drain_once(transports)['retried'] == 1
+    assert len(client.batches) == 2
+    first = {token for batch in client.batches for token in batch}
+    row = NotificationOutbox.query.one()
+    assert set(row.payload[outbox.DELIVERED_KEY]) == first
+    assert 'token-1a' not in first
+
+    client.unreachable = set()
+    row.next_attempt_at = datetime.utcnow()
+    db.session.commit()
+    assert outbox.drain_once(transports)['sent'] == 1
+    retried = client.batches[2:]
+    assert len(retried) == 1 and 'token-1a' in retried[0]
+    assert not first & set(retried[0])
+    assert sorted(token for batch in client.batches for token in batch) == [
+        'token-0a', 'token-0b', 'token-1a', 'token-1b', 'token-1c']
@@ -0,0 +1,86 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from db import db
+from models import BloodRequest, BloodRequestResponse, HospitalBloodAvailability, UserHospitalAdminLineage
+
+@pytest.fixture
+def world(make_user, make_hospital):
+    donor = make_user()
+    admin = make_user(role_id=2)
+    hospital = make_hospital()
+    db.session.add(UserHospitalAdminLineage(user_id=admin.user_id, hospital_id=hospital.hospital_id))
+    db.session.commit()
+    ids = {'donor': donor.user_id, 'admin': admin.user_id, 'hospital_id': hospital.hospital_id}
+
+    def add_rows(n):
+        for i in range(n):
+            # A distinct requester and hospital per row, so any lazy load would show up
+            requester = make_user()
+            own_hospital = make_hospital(f'Hospital {requester.user_id}')
+            blood_request = BloodRequest(
+                user_id=requester.user_id,
+                hospital_id=ids['hospital_id'] if i % 2 else own_hospital.hospital_id,
+                blood_group_type=1 + i % 8,
+                no_of_units=1,
+                patient_name=f'Patient {requester.user_id}',
+                required_by_date=date.today(),
+            )
+            db.session.add(blood_request)
+            db.session.flush()
+            db.session.add(BloodRequestResponse(
+                blood_request_id=blood_request.blood_request_id,
+                user_id=ids['donor'],
+                response_status='accepted',
+                from_date=date.today(),
+                scheduled_datetime=datetime.utcnow() + timedelta(days=1),
+            ))
+            if blood_request.blood_request_id != 1:
+                db.session.add(BloodRequestResponse(
+                    blood_request_id=1,
+                    user_id=requester.user_id,
+                    response_status='declined',
+                    from_date=date.today(),
+                ))
+        db.session.commit()
+        db.session.expunge_all()
+
+    ids['add_rows'] = add_rows
+    return ids
+
+ENDPOINTS = [
+    (None, '/blood/requests'),
+    (None, '/blood/requests?paginate=false'),
+    ('donor', '/blood/my-responses'),
+    ('donor', '/blood/donations/my'),
+    (None, '/blood/donations'),
+    ('admin', '/blood/requests/my'),
+    (None, '/blood/request/1/responses'),
+    ('donor', '/blood/request/1'),
+    (None, '/hospital/availability?hospital_id={hospital_id}'),
+]
+
+@pytest.mark.parametrize('who,url', ENDPOINTS)
+def test_query_count_does_not_grow_with_rows(client, world, auth_headers, count_queries, who, url):
+    headers = auth_headers(world[who]) if who else {}
+    url = url.format(hospital_id=world['hospital_id'])
+
+    def run():
+        with count_queries() as statements:
+            response = client.get(url, headers=headers)
+        assert response.status_code == 200, response.json
+        return len(statements)
+
+    world['add_rows'](3)
+    for blood_group_id in range(1, 9):
+        db.session.add(HospitalBloodAvailability(world['hospital_id'], blood_group_id, 5, date.today()))
+    db.session.commit()
+    db.session.expunge_all()
+    small = run()
+
+    world['add_rows'](20)
+    large = run()
+
+    assert large == small
+    assert small <= 3
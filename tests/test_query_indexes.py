@@ -0,0 +1,74 @@
+import os
+from datetime import date
+
+import pytest
+from flask_migrate import upgrade
+from sqlalchemy import inspect, text
+
+from db import db
+from models import BloodRequest, BloodRequestResponse, User
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+def _plan(query):
+    """Query plan text for an ORM query, with sequential scans discouraged on PostgreSQL"""
+    statement = query.statement.compile(db.engine, compile_kwargs={'literal_binds': True})
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(text('SET LOCAL enable_seqscan = off'))
+        rows = db.session.execute(text(f'EXPLAIN {statement}')).all()
+    else:
+        rows = db.session.execute(text(f'EXPLAIN QUERY PLAN {statement}')).all()
+    return '\n'.join(str(row[-1]) for row in rows)
+
+PLANS = [
+    (lambda: BloodRequest.query.order_by(BloodRequest.created_at.desc(), BloodRequest.blood_request_id.desc()).limit(21),
+     'ix_blood_requests_created_at_id'),
+    (lambda: BloodRequest.query.filter(BloodRequest.status == 'pending')
+        .order_by(BloodRequest.created_at.desc(), BloodRequest.blood_request_id.desc()).limit(21),
+     'ix_blood_requests_status_created_at'),
+    (lambda: BloodRequest.query.filter_by(hospital_id=1, status='pending').with_entities(db.func.count()),
+     'ix_blood_requests_hospital_id_status'),
+    (lambda: BloodRequest.query.filter(BloodRequest.user_id == 1), 'ix_blood_requests_user_id_created_at'),
+    (lambda: BloodRequest.query.filter(BloodRequest.blood_group_type == 1), 'ix_blood_requests_blood_group_type_status'),
+    (lambda: BloodRequest.query.filter(BloodRequest.updated_at > date(2024, 1, 1))
+        .order_by(BloodRequest.updated_at, BloodRequest.blood_request_id).limit(501),
+     'ix_blood_requests_updated_at_id'),
+    (lambda: BloodRequestResponse.query.filter_by(blood_request_id=1, user_id=1),
+     'uq_blood_requests_responses_request_user'),
+    (lambda: BloodRequestResponse.query.filter_by(user_id=1), 'ix_blood_requests_responses_user_id'),
+    (lambda: BloodRequestResponse.query.filter(
+        BloodRequestResponse.user_id == 1, BloodRequestResponse.scheduled_datetime != None),
+     'ix_blood_requests_responses_scheduled'),
+]
+
+@pytest.mark.parametrize('build_query,index_name', PLANS, ids=[name for _, name in PLANS])
+def test_route_predicates_use_an_index(app, build_query, index_name):
+    assert index_name in _plan(build_query())
+
+def test_login_lookup_uses_an_index(app):
+    assert 'INDEX' in _plan(User.query.filter_by(user_email='a@example.com')).upper()
+
+def test_migration_adds_indexes_and_drops_duplicate_responses(app, make_user, make_hospital):
+    # Start from a DDL-style schema: primary keys only
+    inspector = inspect(db.engine)
+    for table in ('blood_requests', 'blood_requests_responses'):
+        for index in inspector.get_indexes(table):
+            db.session.execute(text(f'DROP INDEX {index["name"]}'))
+    db.session.commit()
+
+    donor = make_user()
+    hospital = make_hospital()
+    blood_request = BloodRequest(donor.user_id, hospital.hospital_id, 1, 1, 'Patient')
+    db.session.add(blood_request)
+    db.session.flush()
+    for status in ('accepted', 'declined'):
+        db.session.add(BloodRequestResponse(blood_request.blood_request_id, donor.user_id, status, date.today()))
+    db.session.commit()
+
+    upgrade(directory=MIGRATIONS)
+
+    names = {index['name'] for index in inspect(db.engine).get_indexes('blood_requests_responses')}
+    assert 'uq_blood_requests_responses_request_user' in names
+    assert 'ix_blood_requests_updated_at_id' in {index['name'] for index in inspect(db.engine).get_indexes('blood_requests')}
+    remaining = db.session.execute(text('SELECT response_status FROM blood_requests_responses')).scalars().all()
+    assert remaining == ['accepted']
@@ -0,0 +1,39 @@
+import logging
+import re
+
+from app.utils.query_stats import RequestQueryStats
+
+def _server_timing(response):
+    return dict(
+        (entry.split(';', 1)[0], entry) for entry in response.headers.getlist('Server-Timing')
+    )
+
+def test_server_timing_reports_query_count(client, make_hospital, count_queries):
+    make_hospital()
+    with count_queries() as statements:
+        response = client.get('/hospital/list')
+    assert response.status_code == 200
+
+    timings = _server_timing(response)
+    assert re.fullmatch(rf'db;dur=[\d.]+;desc="{len(statements)} queries"', timings['db'])
+    assert re.fullmatch(r'app;dur=[\d.]+', timings['app'])
+
+def test_slow_queries_are_logged(app, client, caplog):
+    with caplog.at_level(logging.WARNING, logger='app.sql'):
+        client.get('/hospital/list')
+        assert not caplog.records
+
+        app.config['SLOW_QUERY_MS'] = 0
+        client.get('/hospital/list')
+    slow = [record for record in caplog.records if record.msg.startswith('slow_query')]
+    assert slow
+    assert slow[0].endpoint == 'hospital.list_hospitals'
+    assert 'FROM hospitals' in slow[0].statement
+
+def test_keeps_only_the_slowest_statements():
+    stats = RequestQueryStats(top_n=2)
+    for duration, statement in [(5, 'a'), (1, 'b'), (9, 'c'), (3, 'd')]:
+        stats.record(statement, duration)
+    assert stats.count == 4
+    assert stats.total_ms == 18
+    assert stats.slowest == [(9, 'c'), (5, 'a')]
@@ -0,0 +1,72 @@
+from datetime import date
+
+import pytest
+
+import config as config_module
+from app import create_app
+from db import db
+from models import Hospital, LookupBloodGroup, LookupRole
+from app.utils.db_routing import STICKY_COOKIE
+
+@pytest.fixture
+def replica_app(tmp_path, monkeypatch):
+    primary_url = f"sqlite:///{tmp_path / 'primary.db'}"
+    replica_url = f"sqlite:///{tmp_path / 'replica.db'}"
+
+    class ReplicaTestingConfig(config_module.TestingConfig):
+        SQLALCHEMY_DATABASE_URI = primary_url
+        SQLALCHEMY_ENGINE_OPTIONS = config_module.engine_options(primary_url)
+        SQLALCHEMY_BINDS = config_module.replica_binds(replica_url)
+
+    monkeypatch.setitem(config_module.config, 'replica_testing', ReplicaTestingConfig)
+    app = create_app('replica_testing')
+    with app.app_context():
+        for engine in (db.engines[None], db.engines['replica']):
+            db.metadatas[None].create_all(bind=engine)
+            with engine.begin() as connection:
+                connection.execute(LookupRole.__table__.insert(), [
+                    {'lookup_role_id': 3, 'lookup_role_name': 'donor', 'from_date': date.today()}
+                ])
+                connection.execute(LookupBloodGroup.__table__.insert(), [
+                    {'blood_group_id': 1, 'blood_group_name': 'O+', 'from_date': date.today()}
+                ])
+        yield app
+        db.session.remove()
+    # init_app registered a metadata for the bind on the shared db object;
+    # later apps without a replica would otherwise try to create_all() on it
+    db.metadatas.pop('replica', None)
+
+def _add_hospital(engine_key, name):
+    with db.engines[engine_key].begin() as connection:
+        connection.execute(Hospital.__table__.insert(), [{'hospital_name': name, 'from_date': date.today()}])
+
+def test_read_only_endpoints_use_the_replica(replica_app):
+    client = replica_app.test_client()
+    _add_hospital(None, 'Primary Hospital')
+    _add_hospital('replica', 'Replica Hospital')
+
+    names = [h['hospital_name'] for h in client.get('/hospital/list').json]
+    assert names == ['Replica Hospital']
+    assert client.get('/blood/blood-groups').status_code == 200
+
+    # Endpoints without @read_only stay on the primary
+    assert client.get('/hospital/1').json['hospital_name'] == 'Primary Hospital'
+
+def test_writers_read_their_own_writes_from_the_primary(replica_app):
+    client = replica_app.test_client()
+    _add_hospital(None, 'Primary Hospital')
+    _add_hospital('replica', 'Replica Hospital')
+
+    response = client.post('/auth/register', json={
+        'fullname': 'Asha', 'emailaddress': 'asha@example.com', 'phonenumber': '9811111111',
+        'bloodgroup': 'O+', 'address': 'MG Road', 'pincode': '560001', 'password': 's3cret!',
+    })
+    assert response.status_code == 201
+    assert STICKY_COOKIE in response.headers.get('Set-Cookie', '')
+
+    names = [h['hospital_name'] for h in client.get('/hospital/list').json]
+    assert names == ['Primary Hospital']
+
+    client.delete_cookie(STICKY_COOKIE)
+    names = [h['hospital_name'] for h in client.get('/hospital/list').json]
+    assert names == ['Replica Hospital']
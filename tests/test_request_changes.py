@@ -0,0 +1,70 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.utils.pagination import decode_cursor
+from db import db
+from models import BloodRequest
+
+@pytest.fixture
+def setting(app, make_user, make_hospital, auth_headers):
+    app.config['DELTA_SYNC_SETTLE_SECONDS'] = 0
+    requester = make_user()
+    donor = make_user()
+    hospital = make_hospital()
+    return {'requester': requester.user_id, 'hospital_id': hospital.hospital_id, 'headers': auth_headers(donor)}
+
+def _add_request(setting, **kwargs):
+    blood_request = BloodRequest(setting['requester'], setting['hospital_id'], 1, 1, 'Patient', **kwargs)
+    db.session.add(blood_request)
+    db.session.commit()
+    return blood_request.blood_request_id
+
+def _sync(client, setting, since=None, **params):
+    if since:
+        params['since'] = since
+    response = client.get('/blood/requests/changes', query_string=params, headers=setting['headers'])
+    assert response.status_code == 200
+    return response.json
+
+def test_full_sync_pages_open_requests(client, setting):
+    ids = [_add_request(setting) for _ in range(3)]
+    _add_request(setting, status='cancelled')
+
+    first = _sync(client, setting, limit=2)
+    assert [row['blood_request_id'] for row in first['changes']] == ids[:2]
+    assert first['has_more'] and first['deleted'] == []
+    second = _sync(client, setting, first['watermark'], limit=2)
+    assert [row['blood_request_id'] for row in second['changes']] == ids[2:]
+    assert not second['has_more']
+    # Nothing new: an empty page, and the watermark does not go backwards
+    third = _sync(client, setting, second['watermark'])
+    assert (third['changes'], third['deleted']) == ([], [])
+    assert decode_cursor(third['watermark']) >= decode_cursor(second['watermark'])
+
+def test_delta_returns_only_changes_and_tombstones(client, setting, make_user, auth_headers):
+    kept, cancelled, closed, untouched = (_add_request(setting) for _ in range(4))
+    watermark = _sync(client, setting)['watermark']
+
+    db.session.get(BloodRequest, cancelled).status = 'cancelled'
+    db.session.get(BloodRequest, closed).to_date = date.today()
+    new = _add_request(setting)
+    db.session.commit()
+    body = {'blood_request_id': kept, 'response_status': 'Accepted', 'from_date': '2030-01-01'}
+    assert client.post('/blood/blood-response', json=body, headers=setting['headers']).status_code == 201
+
+    delta = _sync(client, setting, watermark)
+    assert sorted(row['blood_request_id'] for row in delta['changes']) == sorted([kept, new])
+    assert {row['blood_request_id']: row['responses_count'] for row in delta['changes']}[kept] == 1
+    assert sorted(row['blood_request_id'] for row in delta['deleted']) == sorted([cancelled, closed])
+    assert untouched not in [row['blood_request_id'] for row in delta['changes'] + delta['deleted']]
+
+def test_settle_window_holds_back_the_newest_changes(app, client, setting):
+    app.config['DELTA_SYNC_SETTLE_SECONDS'] = 60
+    older = _add_request(setting, updated_at=datetime.utcnow() - timedelta(minutes=5))
+    _add_request(setting)
+    assert [row['blood_request_id'] for row in _sync(client, setting)['changes']] == [older]
+
+def test_invalid_watermark_is_rejected(client, setting):
+    response = client.get('/blood/requests/changes?since=not-a-watermark', headers=setting['headers'])
+    assert response.status_code == 400
@@ -0,0 +1,113 @@
+import json
+import os
+import runpy
+from pathlib import Path
+
+import pytest
+
+from app.utils.request_events import RequestEventBroker, get_request_event_broker
+from db import db
+from models import BloodRequest
+
+@pytest.fixture
+def setting(app, make_user, make_hospital, auth_headers):
+    app.config.update(SSE_MAX_STREAM_SECONDS=0.2, SSE_HEARTBEAT_SECONDS=0.05)
+    requester = make_user()
+    donor = make_user()
+    hospital = make_hospital()
+    return {'requester': requester.user_id, 'hospital_id': hospital.hospital_id, 'headers': auth_headers(donor)}
+
+def _add_request(setting, blood_group=1):
+    blood_request = BloodRequest(setting['requester'], setting['hospital_id'], blood_group, 1, 'Patient')
+    db.session.add(blood_request)
+    db.session.commit()
+    return blood_request
+
+def _read(client, url, last_event_id=None):
+    headers = {'Last-Event-ID': last_event_id} if last_event_id else {}
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    return _parse(response.get_data(as_text=True))
+
+def _parse(text):
+    events = []
+    for block in text.split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':'))
+        if 'event' in fields:
+            events.append((fields['event'], json.loads(fields['data']), fields['id']))
+    return events
+
+def test_committed_writes_are_streamed_in_order(client, setting):
+    start = get_request_event_broker().event_id(0)
+    first = _add_request(setting)
+    first_id = first.blood_request_id
+    first.status = 'accepted'
+    db.session.commit()
+    body = {'request_id': first_id, 'scheduled_datetime': '2030-01-02T10:00:00'}
+    assert client.post('/blood/donation/schedule', json=body, headers=setting['headers']).status_code == 201
+
+    events = _read(client, '/blood/requests/stream', start)
+    assert [(kind, payload['blood_request_id']) for kind, payload, _ in events] == [
+        ('created', first_id), ('status', first_id), ('response', first_id)
+    ]
+    assert events[1][1]['previous_status'] == 'pending'
+    assert events[2][1]['response_status'] == 'scheduled'
+
+    # Resuming after the second event only replays the third
+    assert [kind for kind, _, _ in _read(client, '/blood/requests/stream', events[1][2])] == ['response']
+
+def test_rolled_back_writes_are_not_streamed(client, setting):
+    start = get_request_event_broker().event_id(0)
+    db.session.add(BloodRequest(setting['requester'], setting['hospital_id'], 1, 1, 'Patient'))
+    db.session.flush()
+    db.session.rollback()
+    assert _read(client, '/blood/requests/stream', start) == []
+
+def test_stream_applies_list_filters(client, setting):
+    start = get_request_event_broker().event_id(0)
+    _add_request(setting, blood_group=1)
+    wanted = _add_request(setting, blood_group=2)
+    events = _read(client, '/blood/requests/stream?blood_group_id=2&status=pending', start)
+    assert [payload['blood_request_id'] for _, payload, _ in events] == [wanted.blood_request_id]
+
+def test_unknown_last_event_id_resets(client, setting):
+    events = _read(client, '/blood/requests/stream', 'from-another-worker-7')
+    assert [kind for kind, _, _ in events] == ['reset']
+
+def test_writes_handled_by_other_workers_are_polled(app, client, setting, monkeypatch):
+    app.config.update(SSE_DB_POLL_SECONDS=0.02, DELTA_SYNC_SETTLE_SECONDS=0, SSE_MAX_STREAM_SECONDS=0.3)
+    response = client.get('/blood/requests/stream?hospital_id=%d' % setting['hospital_id'])
+    chunks = (chunk.decode() if isinstance(chunk, bytes) else chunk for chunk in response.response)
+    assert next(chunks).startswith('retry:')
+
+    # Committed in "another worker": published to a broker this stream does not listen to
+    monkeypatch.setitem(app.extensions, 'request_events', RequestEventBroker())
+    elsewhere = _add_request(setting).blood_request_id
+    monkeypatch.undo()
+
+    events = _parse(''.join(chunks))
+    assert [(kind, payload['blood_request_id']) for kind, payload, _ in events] == [('changed', elsewhere)]
+
+    # Resuming from that event does not report the same write again
+    assert _read(client, '/blood/requests/stream', events[0][2]) == []
+
+def test_broker_reports_gaps_beyond_history():
+    broker = RequestEventBroker(history_size=2)
+    broker.publish([{'n': 1}, {'n': 2}, {'n': 3}])
+    assert broker.position(broker.event_id(0)) is None
+    assert broker.position(broker.event_id(1)) == 1
+    assert [payload['n'] for _, payload in broker.wait(1, timeout=0)] == [2, 3]
+    assert broker.wait(3, timeout=0.01) == []
+
+@pytest.mark.parametrize('threads, requested, expected', [(None, None, '16'), ('8', '100', '7'), ('1', None, '0')])
+def test_gunicorn_config_keeps_threads_free_of_streams(monkeypatch, threads, requested, expected):
+    environ = {name: value for name, value in (('GUNICORN_THREADS', threads), ('SSE_MAX_CLIENTS', requested)) if value}
+    monkeypatch.setattr(os, 'environ', environ)
+    settings = runpy.run_path(str(Path(__file__).parents[1] / 'gunicorn.conf.py'))
+    assert settings['worker_class'] == 'gthread'
+    assert environ['SSE_MAX_CLIENTS'] == expected
+
+def test_streaming_can_be_turned_off(app, client, setting):
+    app.config['SSE_MAX_CLIENTS'] = 0
+    assert client.get('/blood/requests/stream').status_code == 503
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+
+import pytest
+from flask import g
+
+from app.controllers.rollups import COUNTERS, backfill
+from db import db
+from models import BloodRequest, DailyRequestRollup, UserHospitalAdminLineage
+
+@pytest.fixture
+def setting(make_user, make_hospital, auth_headers):
+    requester = make_user()
+    donor = make_user()
+    super_admin = make_user(role_id=1)
+    hospital = make_hospital()
+    return {'requester': requester.user_id, 'donor': donor.user_id, 'hospital_id': hospital.hospital_id,
+            'headers': auth_headers(donor), 'admin_headers': auth_headers(super_admin)}
+
+def _add_request(setting, blood_group=1, **kwargs):
+    blood_request = BloodRequest(setting['requester'], setting['hospital_id'], blood_group, 1, 'Patient', **kwargs)
+    db.session.add(blood_request)
+    db.session.commit()
+    return blood_request
+
+def _counters():
+    db.session.expire_all()
+    return {
+        (row.day, row.blood_group_id): {counter: getattr(row, counter) for counter in COUNTERS if getattr(row, counter)}
+        for row in DailyRequestRollup.query.all()
+    }
+
+def test_write_paths_maintain_rollups(client, setting):
+    today = datetime.utcnow().date()
+    first = _add_request(setting)
+    second = _add_request(setting)
+    _add_request(setting, blood_group=2)
+    first.status = 'accepted'
+    second.status = 'cancelled'
+    db.session.commit()
+    body = {'request_id': first.blood_request_id, 'scheduled_datetime': '2030-01-02T10:00:00'}
+    assert client.post('/blood/donation/schedule', json=body, headers=setting['headers']).status_code == 201
+
+    assert _counters() == {
+        (today, 1): {'requests_created': 2, 'requests_accepted': 1, 'requests_cancelled': 1, 'donations_scheduled': 1},
+        (today, 2): {'requests_created': 1},
+    }
+
+def test_rolled_back_writes_are_not_counted(setting):
+    db.session.add(BloodRequest(setting['requester'], setting['hospital_id'], 1, 1, 'Patient'))
+    db.session.flush()
+    db.session.rollback()
+    assert _counters() == {}
+
+def test_backfill_rebuilds_from_base_tables(setting):
+    today = datetime.utcnow().date()
+    yesterday = datetime.utcnow() - timedelta(days=1)
+    _add_request(setting, created_at=yesterday, updated_at=yesterday)
+    _add_request(setting, status='completed')
+    DailyRequestRollup.query.delete()
+    db.session.commit()
+
+    assert backfill(today - timedelta(days=7), today) == 2
+    assert _counters() == {
+        (yesterday.date(), 1): {'requests_created': 1},
+        (today, 1): {'requests_created': 1, 'requests_completed': 1},
+    }
+
+def test_rollups_endpoint_filters_by_range_and_hospital(client, setting, make_hospital):
+    other = make_hospital('Other')
+    _add_request(setting)
+    db.session.add(BloodRequest(setting['requester'], other.hospital_id, 1, 1, 'Patient'))
+    db.session.commit()
+    today = datetime.utcnow().date().isoformat()
+
+    response = client.get(f'/analytics/rollups?from={today}&to={today}&hospital_id={setting["hospital_id"]}',
+                          headers=setting['admin_headers'])
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [row['hospital_id'] for row in body['rows']] == [setting['hospital_id']]
+    assert body['totals']['requests_created'] == 1
+
+    everything = client.get('/analytics/rollups', headers=setting['admin_headers']).get_json()
+    assert everything['totals']['requests_created'] == 2
+
+def test_rollups_endpoint_is_limited_to_administered_hospitals(client, setting, make_user, make_hospital, auth_headers):
+    other = make_hospital('Other')
+    _add_request(setting)
+    db.session.add(BloodRequest(setting['requester'], other.hospital_id, 1, 1, 'Patient'))
+    admin = make_user(role_id=2)
+    db.session.add(UserHospitalAdminLineage(user_id=admin.user_id, hospital_id=setting['hospital_id']))
+    db.session.commit()
+
+    def get(url, user_headers):
+        # The test app context outlives each request, so drop the g memo by hand
+        g.pop('auth_principal', None)
+        return client.get(url, headers=user_headers)
+
+    assert get('/analytics/rollups', setting['headers']).status_code == 403
+    assert get('/analytics/rollups', auth_headers(make_user(role_id=2))).status_code == 403
+    own = get('/analytics/rollups', auth_headers(admin)).get_json()
+    assert {row['hospital_id'] for row in own['rows']} == {setting['hospital_id']}
+    assert get(f'/analytics/rollups?hospital_id={other.hospital_id}', auth_headers(admin)).status_code == 403
+
+def test_rollups_endpoint_validates_range(client, setting):
+    headers = setting['admin_headers']
+    assert client.get('/analytics/rollups?from=2024-02-01&to=2024-01-01', headers=headers).status_code == 400
+    assert client.get('/analytics/rollups?from=2020-01-01&to=2024-01-01', headers=headers).status_code == 400
+    assert client.get('/analytics/rollups?from=yesterday', headers=headers).status_code == 400
+
+def test_rescheduling_counts_one_donation(client, setting):
+    today = datetime.utcnow().date()
+    blood_request = _add_request(setting)
+    body = {'request_id': blood_request.blood_request_id, 'scheduled_datetime': '2030-01-02T10:00:00'}
+    assert client.post('/blood/donation/schedule', json=body, headers=setting['headers']).status_code == 201
+    body['scheduled_datetime'] = '2030-01-03T10:00:00'
+    assert client.post('/blood/donation/schedule', json=body, headers=setting['headers']).status_code == 200
+    assert _counters()[(today, 1)]['donations_scheduled'] == 1
@@ -1,10 +1,13 @@
+import logging
 from flask_jwt_extended import JWTManager
 
+logger = logging.getLogger(__name__)
+
 jwt = JWTManager()
 
 @jwt.expired_token_loader
 def expired_token_callback(jwt_header, jwt_payload):
-    print("[JWT] Token expired")
+    logger.info("Token expired for user %s", jwt_payload.get('sub'))
     return {
         'status': 'error',
         'message': 'Token has expired'
@@ -12,7 +15,7 @@ def expired_token_callback(jwt_header, jwt_payload):
 
 @jwt.invalid_token_loader
 def invalid_token_callback(error):
-    print(f"[JWT] Invalid token: {error}")
+    logger.info("Invalid token: %s", error)
     # 🔧 Better error messaging for debugging
     if "Subject must be a string" in str(error):
         return {
@@ -26,7 +29,7 @@ def invalid_token_callback(error):
 
 @jwt.unauthorized_loader
 def missing_token_callback(error):
-    print(f"[JWT] Unauthorized: {error}")
+    logger.debug("Unauthorized: %s", error)
     return {
         'status': 'error',
         'message': 'Authorization token is missing'
@@ -35,7 +38,7 @@ def missing_token_callback(error):
 # 🔧 Add additional error handlers for better debugging
 @jwt.token_verification_failed_loader
 def token_verification_failed_callback(jwt_header, jwt_payload):
-    print(f"[JWT] Token verification failed")
+    logger.info("Token verification failed for user %s", jwt_payload.get('sub'))
     return {
         'status': 'error',
         'message': 'Token verification failed'
@@ -43,6 +46,6 @@ def token_verification_failed_callback(jwt_header, jwt_payload):
 
 @jwt.token_verification_loader
 def check_if_token_revoked(jwt_header, jwt_payload):
-    print(f"[JWT] Token verification check: user_id={jwt_payload.get('sub')}")
+    logger.debug("Token verification check: user_id=%s", jwt_payload.get('sub'))
     # You can add token blacklist checking here if needed
     return False  # Token is not revoked